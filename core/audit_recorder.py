@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from core.memory_engine import MemoryEngine
+from core.observability import StructuredLogger
+from core.session import SessionEntry, SessionLayer
+
+
+@dataclass(frozen=True)
+class AuditRecord:
+    entry: SessionEntry | None
+    created_at: str
+    log_payload: dict[str, Any]
+
+
+class WriteBehindAuditRecorder:
+    def __init__(
+        self,
+        session_layer: SessionLayer,
+        memory_engine: MemoryEngine,
+        logger: StructuredLogger,
+        batch_size: int = 64,
+        flush_interval_seconds: float = 0.25,
+        max_attempts: int = 4,
+        retry_backoff_seconds: float = 0.05,
+    ) -> None:
+        self.session_layer = session_layer
+        self.memory_engine = memory_engine
+        self.logger = logger
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = max(0.01, flush_interval_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = max(0.0, retry_backoff_seconds)
+        self._condition = threading.Condition()
+        self._write_lock = threading.RLock()
+        self._pending: list[AuditRecord] = []
+        self._worker: threading.Thread | None = None
+        self._closed = False
+        self._oldest_pending_at = 0.0
+        self._flush_count = 0
+        self._written = 0
+        self._failed = 0
+        self._retries = 0
+        self.last_error: str | None = None
+
+    def submit(
+        self,
+        command: str,
+        message: str,
+        status: str,
+        level: str,
+        metadata: dict[str, Any],
+    ) -> None:
+        record = AuditRecord(
+            entry=self.session_layer.build_entry(command=command, message=message, status=status),
+            created_at=datetime.now(UTC).isoformat(timespec="seconds"),
+            log_payload=self.logger.build_payload(level=level, event="command", message=message, metadata=metadata),
+        )
+        self._enqueue(record)
+
+    def submit_log(self, payload: dict[str, Any]) -> None:
+        self._enqueue(AuditRecord(entry=None, created_at=payload["timestamp"], log_payload=payload))
+
+    def flush(self) -> int:
+        with self._write_lock:
+            with self._condition:
+                batch = self._pending
+                self._pending = []
+            if batch:
+                self._write(batch)
+            return len(batch)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout=5.0)
+        self.flush()
+
+    def stats(self) -> dict[str, int | str | None]:
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "flushes": self._flush_count,
+            "written": self._written,
+            "failed": self._failed,
+            "retries": self._retries,
+            "last_error": self.last_error,
+        }
+
+    def _enqueue(self, record: AuditRecord) -> None:
+        if self._closed:
+            with self._write_lock:
+                self._write([record])
+            return
+        with self._condition:
+            if not self._pending:
+                self._oldest_pending_at = time.monotonic()
+            self._pending.append(record)
+            self._ensure_worker()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(target=self._run, name="oriondesk-audit-writer", daemon=True)
+        self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and self._pending and not self._flush_due():
+                    self._condition.wait(timeout=self._wait_timeout())
+                if self._closed or not self._pending:
+                    self._worker = None
+                    return
+            self.flush()
+
+    def _flush_due(self) -> bool:
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.batch_size:
+            return True
+        return time.monotonic() - self._oldest_pending_at >= self.flush_interval_seconds
+
+    def _wait_timeout(self) -> float | None:
+        if not self._pending:
+            return None
+        elapsed = time.monotonic() - self._oldest_pending_at
+        return max(0.0, self.flush_interval_seconds - elapsed)
+
+    def _write(self, batch: list[AuditRecord]) -> None:
+        commands = [item for item in batch if item.entry is not None]
+        stages = (
+            lambda: self.session_layer.record_many([item.entry for item in commands]),
+            lambda: self.memory_engine.record_commands(
+                [(item.entry.command, item.entry.status, item.created_at) for item in commands]
+            ),
+            lambda: self.logger.write_many([item.log_payload for item in batch]),
+        )
+        completed = 0
+        for attempt in range(self.max_attempts):
+            try:
+                # Resume at the store that failed so a retry never duplicates rows already committed.
+                while completed < len(stages):
+                    stages[completed]()
+                    completed += 1
+            except (sqlite3.Error, OSError) as error:
+                self.last_error = str(error)
+                if attempt + 1 < self.max_attempts:
+                    self._retries += 1
+                    time.sleep(self.retry_backoff_seconds * (2**attempt))
+                continue
+            self._flush_count += 1
+            self._written += len(batch)
+            return
+        self._failed += len(batch)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+import hashlib
+import sys
+import threading
+import unicodedata
+from typing import Sequence
+
+from core.embedding_provider import EmbeddingProvider
+from core.storage import EmbeddingCacheRepository, SQLiteStorageEngine
+
+
+def normalize_embedding_text(text: str) -> str:
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+def embedding_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def encode_vector(values: Sequence[float]) -> bytes:
+    packed = array("f", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def decode_vector(blob: bytes) -> tuple[float, ...]:
+    packed = array("f")
+    packed.frombytes(blob)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return tuple(packed)
+
+
+class EmbeddingCache:
+    def __init__(self, storage_engine: SQLiteStorageEngine, memory_size: int = 512) -> None:
+        self.repository = EmbeddingCacheRepository(storage_engine)
+        self.memory_size = max(0, memory_size)
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[bytes, tuple[float, ...]] = OrderedDict()
+        self._model: str | None = None
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "invalidations": 0}
+
+    def embed_many(self, provider: EmbeddingProvider, texts: Sequence[str]) -> list[list[float]]:
+        model = provider.config().model
+        self._ensure_model(model)
+
+        normalized = [normalize_embedding_text(text) for text in texts]
+        keys = [embedding_key(text) if text else None for text in normalized]
+        text_by_key = {key: text for key, text in zip(keys, normalized) if key is not None}
+        resolved: dict[bytes, tuple[float, ...]] = {}
+        pending: list[bytes] = []
+        with self._lock:
+            for key in text_by_key:
+                vector = self._memory.get(key)
+                if vector is None:
+                    pending.append(key)
+                    continue
+                self._memory.move_to_end(key)
+                resolved[key] = vector
+            self._counters["memory_hits"] += len(resolved)
+
+        if pending:
+            stored = self.repository.get_many(model, pending)
+            loaded = {key: decode_vector(stored[key]) for key in pending if key in stored}
+            resolved.update(loaded)
+            self._remember(loaded, disk_hits=len(loaded))
+            pending = [key for key in pending if key not in loaded]
+
+        if pending:
+            vectors = provider.embed_many([text_by_key[key] for key in pending])
+            rows: list[tuple[bytes, int, bytes]] = []
+            fresh: dict[bytes, tuple[float, ...]] = {}
+            for key, vector in zip(pending, vectors):
+                if not vector:
+                    continue
+                blob = encode_vector(vector)
+                rows.append((key, len(vector), blob))
+                # Hand out the stored float32 values so a later cache hit returns the exact same vector.
+                fresh[key] = decode_vector(blob)
+            if rows:
+                self.repository.put_many(model, rows)
+            resolved.update(fresh)
+            self._remember(fresh, misses=len(pending), writes=len(rows))
+
+        return [list(resolved[key]) if key in resolved else [] for key in keys]
+
+    def stats(self) -> dict[str, int | float | str | None]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._memory)
+            model = self._model
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            **counters,
+            "model": model,
+            "memory_entries": entries,
+            "memory_size": self.memory_size,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        self.repository.clear()
+
+    def _ensure_model(self, model: str) -> None:
+        with self._lock:
+            if self._model == model:
+                return
+            if self._model is not None:
+                self._counters["invalidations"] += 1
+            self._model = model
+            self._memory.clear()
+        # Vectors from another embedding model are not comparable; drop them instead of keeping dead rows.
+        self.repository.purge_other_models(model)
+
+    def _remember(
+        self,
+        vectors: dict[bytes, tuple[float, ...]],
+        disk_hits: int = 0,
+        misses: int = 0,
+        writes: int = 0,
+    ) -> None:
+        with self._lock:
+            self._counters["disk_hits"] += disk_hits
+            self._counters["misses"] += misses
+            self._counters["writes"] += writes
+            if not self.memory_size:
+                return
+            for key, vector in vectors.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import json
-import urllib.error
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable
+import json
+import time
+from typing import Callable, Sequence
+
+from core.http_pool import HttpConnectionPool, HttpStatusError, shared_http_pool
 
 
 @dataclass(frozen=True)
@@ -30,15 +32,25 @@ class EmbeddingProvider:
     def embed(self, text: str) -> list[float]:
         raise NotImplementedError()
 
+    def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        return [self.embed(text) for text in texts]
+
 
 class OllamaEmbeddingProvider(EmbeddingProvider):
     def __init__(
         self,
         config: EmbeddingConfig,
         request_json: Callable[[str, dict | None, float], dict] | None = None,
+        http_pool: HttpConnectionPool | None = None,
+        max_parallel_requests: int = 4,
+        batch_retry_seconds: float = 300.0,
     ) -> None:
         self._config = config
+        self._http_pool = http_pool or shared_http_pool()
         self._request_json = request_json or self._default_request_json
+        self.max_parallel_requests = max(1, max_parallel_requests)
+        self.batch_retry_seconds = max(0.0, batch_retry_seconds)
+        self._batch_disabled_until = 0.0
 
     def config(self) -> EmbeddingConfig:
         return self._config
@@ -71,15 +83,53 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
             return []
         return [float(item) for item in values]
 
+    def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        cleaned = [text.strip() for text in texts]
+        unique = list(dict.fromkeys(text for text in cleaned if text))
+        if not unique:
+            return [[] for _ in cleaned]
+
+        vectors = self._embed_batch(unique) if time.monotonic() >= self._batch_disabled_until else None
+        if vectors is None:
+            vectors = self._embed_concurrently(unique)
+        by_text = dict(zip(unique, vectors))
+        return [list(by_text[text]) if text else [] for text in cleaned]
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]] | None:
+        try:
+            payload = self._request_json(
+                f"{self._config.host}/api/embed",
+                {"model": self._config.model, "input": texts},
+                self._config.timeout_seconds,
+            )
+        except HttpStatusError as error:
+            # Ollama releases before /api/embed answer a plain-text 404; a JSON error body is about the
+            # request itself (e.g. a model that is not pulled yet) and must not switch batching off.
+            if error.status == 404 and not _is_json_error(error.body):
+                self._batch_disabled_until = time.monotonic() + self.batch_retry_seconds
+            return None
+        except ValueError:
+            return None
+        values = payload.get("embeddings") if isinstance(payload, dict) else None
+        if not isinstance(values, list) or len(values) != len(texts):
+            return None
+        if not all(isinstance(item, list) for item in values):
+            return None
+        return [[float(number) for number in item] for item in values]
+
+    def _embed_concurrently(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 1:
+            return [self.embed(texts[0])]
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel_requests, len(texts))) as pool:
+            return list(pool.map(self.embed, texts))
+
     def _default_request_json(self, url: str, payload: dict | None, timeout_seconds: float) -> dict:
-        data = None
-        headers = {"Content-Type": "application/json"}
-        method = "GET"
-        if payload is not None:
-            data = json.dumps(payload).encode("utf-8")
-            method = "POST"
-
-        request = urllib.request.Request(url=url, data=data, headers=headers, method=method)
-        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
-            body = response.read().decode("utf-8")
-        return json.loads(body)
+        return self._http_pool.request_json(url, payload, timeout_seconds)
+
+
+def _is_json_error(body: str) -> bool:
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and "error" in payload
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import StrEnum
+from typing import Any
 
 
 class ErrorCode(StrEnum):
@@ -21,9 +23,43 @@ class ExecutionContext:
     user: str
     profile_policy: str
     session_id: str
-    timestamp: str
     risk_level: str
     dry_run: bool
+    monotonic: float = field(default_factory=time.monotonic)
+    wall_offset: float = field(default_factory=lambda: time.time() - time.monotonic(), repr=False, compare=False)
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.monotonic + self.wall_offset, UTC).isoformat(timespec="seconds")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "user": self.user,
+            "profile_policy": self.profile_policy,
+            "session_id": self.session_id,
+            "timestamp": self.timestamp,
+            "risk_level": self.risk_level,
+            "dry_run": self.dry_run,
+        }
+
+
+@dataclass(frozen=True)
+class ExecutionContextBase:
+    user: str
+    profile_policy: str
+    session_id: str
+    wall_offset: float = field(default_factory=lambda: time.time() - time.monotonic())
+
+    def stamp(self, risk_level: str, dry_run: bool) -> ExecutionContext:
+        return ExecutionContext(
+            self.user,
+            self.profile_policy,
+            self.session_id,
+            risk_level,
+            dry_run,
+            time.monotonic(),
+            self.wall_offset,
+        )
 
 
 @dataclass(frozen=True)
@@ -38,8 +74,8 @@ class ResponseEnvelope:
 
 
 class UnifiedCommandExecutor:
-    def run(self, router, command: str, context: ExecutionContext) -> ResponseEnvelope:
-        parsed = router.parse(command)
+    def run(self, router, command, context: ExecutionContext) -> ResponseEnvelope:
+        parsed = router.parse(command) if isinstance(command, str) else command
         if parsed is None:
             return self._result(False, "invalid", "Perintah kosong. Silakan isi command terlebih dahulu.", ErrorCode.EMPTY_COMMAND, context)
 
@@ -49,14 +85,15 @@ class UnifiedCommandExecutor:
         if not router.security_guard.is_command_allowed(parsed.keyword):
             return self._result(False, "blocked", "Perintah ditolak oleh command whitelist policy.", ErrorCode.COMMAND_BLOCKED, context)
 
-        usage_error = self._validate_contract(router.contracts, parsed.keyword, parsed.args)
+        table = router.command_table
+        usage_error = self._validate_contract(table.contracts, parsed.keyword, parsed.args)
         if usage_error is not None:
             return self._result(False, "invalid", usage_error, ErrorCode.CONTRACT_INVALID, context)
 
-        if parsed.keyword in router.dangerous_keywords:
+        if parsed.keyword in table.dangerous:
             return self._run_dangerous(router, parsed, context)
 
-        handler = router.handlers.get(parsed.keyword)
+        handler = table.handlers.get(parsed.keyword)
         if handler is None:
             return self._result(False, "invalid", "Perintah tidak dikenali. Gunakan: open, search file, atau sys info.", ErrorCode.UNKNOWN_HANDLER, context)
         return self._result(True, "success", handler(parsed), ErrorCode.NONE, context)
@@ -131,6 +168,3 @@ class UnifiedCommandExecutor:
             context=context,
         )
 
-
-def build_execution_timestamp() -> str:
-    return datetime.now(UTC).isoformat(timespec="seconds")
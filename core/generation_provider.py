@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import json
 import re
-import urllib.request
+import threading
 from dataclasses import dataclass
-from typing import Callable
+from typing import IO, Callable, Iterator
+
+from core.http_pool import HttpConnectionPool, RequestCancelledError, shared_http_pool
 
 
 @dataclass(frozen=True)
@@ -40,6 +42,19 @@ class GenerationProvider:
     def generate(self, prompt: str, system_prompt: str | None = None) -> str:
         raise NotImplementedError()
 
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> Iterator[str]:
+        # Providers without native streaming deliver the whole completion as a single chunk.
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        text = self.generate(prompt=prompt, system_prompt=system_prompt)
+        if text:
+            yield text
+
     def list_models(self) -> list[GenerationModelInfo]:
         raise NotImplementedError()
 
@@ -49,9 +64,13 @@ class OllamaGenerationProvider(GenerationProvider):
         self,
         config: GenerationConfig,
         request_json: Callable[[str, dict | None, float], dict] | None = None,
+        open_stream: Callable[[str, dict, float, threading.Event | None], IO[bytes]] | None = None,
+        http_pool: HttpConnectionPool | None = None,
     ) -> None:
         self._config = config
+        self._http_pool = http_pool or shared_http_pool()
         self._request_json = request_json or self._default_request_json
+        self._open_stream = open_stream or self._default_open_stream
 
     def config(self) -> GenerationConfig:
         return self._config
@@ -73,18 +92,7 @@ class OllamaGenerationProvider(GenerationProvider):
         if not clean:
             return ""
 
-        payload = {
-            "model": self._config.model,
-            "prompt": clean,
-            "stream": False,
-            "options": {
-                "temperature": self._config.temperature,
-                "num_predict": self._config.token_budget,
-            },
-        }
-        if system_prompt:
-            payload["system"] = system_prompt.strip()
-
+        payload = self._generate_payload(clean, system_prompt, stream=False)
         response = self._request_json(
             f"{self._config.host}/api/generate",
             payload,
@@ -93,6 +101,51 @@ class OllamaGenerationProvider(GenerationProvider):
         text = response.get("response", "") if isinstance(response, dict) else ""
         return text.strip() if isinstance(text, str) else ""
 
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> Iterator[str]:
+        clean = prompt.strip()
+        if not clean or (cancel_event is not None and cancel_event.is_set()):
+            return
+
+        payload = self._generate_payload(clean, system_prompt, stream=True)
+        url = f"{self._config.host}/api/generate"
+        try:
+            response = self._open_stream(url, payload, self._config.timeout_seconds, cancel_event)
+        except RequestCancelledError:
+            return
+        try:
+            # Ollama streams one JSON object per line; closing the response drops the connection,
+            # which also stops the generation on the server side. Setting a CancelEvent closes it
+            # from the cancelling thread, so even a read still waiting for the first token returns.
+            for line in response:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if not isinstance(chunk, dict):
+                    continue
+                if chunk.get("error"):
+                    raise ValueError(str(chunk["error"]))
+                text = chunk.get("response", "")
+                if isinstance(text, str) and text:
+                    yield text
+                if chunk.get("done"):
+                    # Reading the tail of the body lets a keep-alive connection go back to the pool.
+                    for _remaining in response:
+                        pass
+                    return
+        except OSError:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            raise
+        finally:
+            response.close()
+
     def list_models(self) -> list[GenerationModelInfo]:
         payload = self._request_json(f"{self._config.host}/api/tags", None, self._config.timeout_seconds)
         models = payload.get("models", []) if isinstance(payload, dict) else []
@@ -139,15 +192,28 @@ class OllamaGenerationProvider(GenerationProvider):
             return None
         return float(match.group(1))
 
+    def _generate_payload(self, prompt: str, system_prompt: str | None, stream: bool) -> dict:
+        payload = {
+            "model": self._config.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": self._config.temperature,
+                "num_predict": self._config.token_budget,
+            },
+        }
+        if system_prompt:
+            payload["system"] = system_prompt.strip()
+        return payload
+
+    def _default_open_stream(
+        self,
+        url: str,
+        payload: dict,
+        timeout_seconds: float,
+        cancel_event: threading.Event | None = None,
+    ) -> IO[bytes]:
+        return self._http_pool.open(url, payload, timeout_seconds, cancel_event)
+
     def _default_request_json(self, url: str, payload: dict | None, timeout_seconds: float) -> dict:
-        data = None
-        headers = {"Content-Type": "application/json"}
-        method = "GET"
-        if payload is not None:
-            data = json.dumps(payload).encode("utf-8")
-            method = "POST"
-
-        request = urllib.request.Request(url=url, data=data, headers=headers, method=method)
-        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
-            body = response.read().decode("utf-8")
-        return json.loads(body)
+        return self._http_pool.request_json(url, payload, timeout_seconds)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import threading
+import time
+from typing import Callable
+from urllib.parse import urlsplit
+
+# A keep-alive connection may have been closed by the server while idle; these surface on first use.
+_STALE_ERRORS = (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, http.client.BadStatusLine)
+_SHARED_POOL_LOCK = threading.Lock()
+_SHARED_POOL: HttpConnectionPool | None = None
+
+
+class HttpStatusError(OSError):
+    def __init__(self, status: int, reason: str, url: str, body: str = "") -> None:
+        super().__init__(f"HTTP {status} {reason}: {url}")
+        self.status = status
+        self.reason = reason
+        self.url = url
+        self.body = body
+
+
+class RequestCancelledError(OSError):
+    def __init__(self, url: str) -> None:
+        super().__init__(f"HTTP request cancelled: {url}")
+        self.url = url
+
+
+class CancelEvent(threading.Event):
+    """An Event that also runs registered callbacks when set, so a blocked read can be aborted."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._callbacks_lock = threading.Lock()
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next_token = 0
+
+    def set(self) -> None:
+        with self._callbacks_lock:
+            super().set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        with self._callbacks_lock:
+            if not self.is_set():
+                token = self._next_token
+                self._next_token += 1
+                self._callbacks[token] = callback
+                return lambda: self._remove_callback(token)
+        callback()
+        return _noop
+
+    def _remove_callback(self, token: int) -> None:
+        with self._callbacks_lock:
+            self._callbacks.pop(token, None)
+
+
+class PooledResponse:
+    def __init__(
+        self,
+        pool: HttpConnectionPool,
+        key: tuple[str, str, int],
+        connection: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ) -> None:
+        self.status = response.status
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self._lock = threading.Lock()
+        self._reading = False
+        self._aborted = False
+        self._released = False
+        self._detach_cancel: Callable[[], None] = _noop
+
+    def __iter__(self):
+        while True:
+            with self._lock:
+                if self._released:
+                    return
+                self._reading = True
+            try:
+                line = self._response.readline()
+            except (OSError, ValueError, http.client.HTTPException):
+                if not self._aborted:
+                    raise
+                line = b""
+            finally:
+                with self._lock:
+                    self._reading = False
+            if self._aborted:
+                self._finish(reusable=False)
+                return
+            if not line:
+                return
+            yield line
+
+    def __enter__(self) -> PooledResponse:
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def read(self) -> bytes:
+        return self._response.read()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._released or self._aborted:
+                return
+            if self._reading:
+                # Another thread is blocked in readline(): wake it up and let it release the connection.
+                self._aborted = True
+                _shutdown(self._connection)
+                return
+        # Only a fully drained response leaves the connection usable; anything else drops the socket.
+        self._finish(reusable=self._response.isclosed() and not self._response.will_close)
+
+    def _finish(self, reusable: bool) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._detach_cancel()
+        self._pool._release(self._key, self._connection, reusable)
+
+
+class HttpConnectionPool:
+    def __init__(self, max_per_host: int = 4, idle_timeout: float = 30.0) -> None:
+        self.max_per_host = max(1, max_per_host)
+        self.idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        self._idle: dict[tuple[str, str, int], list[tuple[http.client.HTTPConnection, float]]] = {}
+        self._in_use: dict[tuple[str, str, int], int] = {}
+        self._counters = {"requests": 0, "created": 0, "reused": 0, "discarded": 0, "retries": 0}
+
+    def request_json(self, url: str, payload: dict | None, timeout_seconds: float) -> dict:
+        with self.open(url, payload, timeout_seconds) as response:
+            body = response.read()
+        return json.loads(body.decode("utf-8"))
+
+    def open(
+        self,
+        url: str,
+        payload: dict | None,
+        timeout_seconds: float,
+        cancel_event: threading.Event | None = None,
+    ) -> PooledResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname or "localhost", port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        body = None
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        method = "GET"
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            method = "POST"
+
+        with self._condition:
+            self._counters["requests"] += 1
+        for attempt in range(2):
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelledError(url)
+            connection, reused = self._acquire(key, timeout_seconds)
+            # Until headers arrive there is no response to close, so a cancel shuts the socket down directly.
+            detach = _on_cancel(cancel_event, lambda connection=connection: _shutdown(connection))
+            try:
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout_seconds)
+                connection.request(method, target, body=body, headers=headers)
+                response = connection.getresponse()
+            except BaseException as error:
+                self._release(key, connection, reusable=False)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise RequestCancelledError(url) from error
+                if isinstance(error, _STALE_ERRORS) and reused and attempt == 0:
+                    with self._condition:
+                        self._counters["retries"] += 1
+                    continue
+                raise
+            finally:
+                detach()
+            pooled = PooledResponse(self, key, connection, response)
+            if response.status >= 400:
+                error_body = pooled.read()
+                pooled.close()
+                raise HttpStatusError(response.status, response.reason, url, error_body[:1024].decode("utf-8", "replace"))
+            pooled._detach_cancel = _on_cancel(cancel_event, pooled.close)
+            return pooled
+        raise ConnectionError(f"HTTP connection unavailable: {url}")
+
+    def stats(self) -> dict[str, int | float]:
+        with self._condition:
+            counters = dict(self._counters)
+            idle = sum(len(items) for items in self._idle.values())
+            in_use = sum(self._in_use.values())
+        opened = counters["created"] + counters["reused"]
+        return {
+            **counters,
+            "idle": idle,
+            "in_use": in_use,
+            "max_per_host": self.max_per_host,
+            "reuse_ratio": round(counters["reused"] / opened, 3) if opened else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._condition:
+            idle = [connection for items in self._idle.values() for connection, _ in items]
+            self._idle.clear()
+        for connection in idle:
+            _discard(connection)
+
+    def _acquire(self, key: tuple[str, str, int], timeout_seconds: float) -> tuple[http.client.HTTPConnection, bool]:
+        deadline = time.monotonic() + max(0.0, timeout_seconds)
+        expired: list[http.client.HTTPConnection] = []
+        try:
+            with self._condition:
+                while self._in_use.get(key, 0) >= self.max_per_host:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"HTTP pool exhausted for {key[1]}:{key[2]}")
+                    self._condition.wait(remaining)
+                self._in_use[key] = self._in_use.get(key, 0) + 1
+                idle = self._idle.get(key, [])
+                now = time.monotonic()
+                while idle:
+                    connection, idle_since = idle.pop()
+                    if now - idle_since <= self.idle_timeout:
+                        self._counters["reused"] += 1
+                        return connection, True
+                    expired.append(connection)
+                    self._counters["discarded"] += 1
+                self._counters["created"] += 1
+        finally:
+            for connection in expired:
+                connection.close()
+
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, port, timeout=timeout_seconds), False
+
+    def _release(self, key: tuple[str, str, int], connection: http.client.HTTPConnection, reusable: bool) -> None:
+        if not reusable:
+            _discard(connection)
+        with self._condition:
+            self._in_use[key] = max(0, self._in_use.get(key, 0) - 1)
+            if reusable:
+                self._idle.setdefault(key, []).append((connection, time.monotonic()))
+            else:
+                self._counters["discarded"] += 1
+            self._condition.notify()
+
+
+def _noop() -> None:
+    return
+
+
+def _on_cancel(cancel_event: threading.Event | None, callback: Callable[[], None]) -> Callable[[], None]:
+    # A plain Event can only be polled; a CancelEvent lets the pool abort the request as soon as it is set.
+    if isinstance(cancel_event, CancelEvent):
+        return cancel_event.add_callback(callback)
+    return _noop
+
+
+def _shutdown(connection: http.client.HTTPConnection) -> None:
+    # Shutting the socket down wakes up a read blocked in another thread.
+    sock = connection.sock
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _discard(connection: http.client.HTTPConnection) -> None:
+    _shutdown(connection)
+    connection.close()
+
+
+def shared_http_pool() -> HttpConnectionPool:
+    global _SHARED_POOL
+    with _SHARED_POOL_LOCK:
+        if _SHARED_POOL is None:
+            _SHARED_POOL = HttpConnectionPool()
+        return _SHARED_POOL
@@ -1,7 +1,43 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
 import re
+import threading
+from typing import Iterable
+
+_WORD_PATTERN = re.compile(r"[a-z0-9_.-]+")
+_FILE_PATTERN = re.compile(r"([a-z0-9_\-]+\.[a-z0-9]{2,8})")
+
+DEFAULT_INTENT_RULES: tuple[dict, ...] = (
+    {
+        "keyword": "open",
+        "markers": ["open", "buka", "bukakan", "launch", "jalankan"],
+        "targets": ["vscode", "chrome", "notepad"],
+        "template": "open {target}",
+        "confidence": 0.78,
+        "reason": "semantic_open",
+    },
+    {
+        "keyword": "search",
+        "markers": ["search", "cari", "find", "temukan"],
+        "query": True,
+        "noise": ["tolong", "dong", "berkas", "file", "carikan", "ya", "please"],
+        "template": "search file {query}",
+        "confidence": 0.76,
+        "reason": "semantic_search",
+    },
+    {
+        "keyword": "sys",
+        "markers": ["sys", "status", "info"],
+        "marker_pairs": [["system", "status"], ["system", "info"]],
+        "template": "sys info",
+        "confidence": 0.72,
+        "reason": "semantic_sys",
+    },
+)
 
 
 @dataclass(frozen=True)
@@ -12,90 +48,166 @@ class IntentResolution:
     reason: str
 
 
-class LocalIntentEngine:
-    def __init__(self) -> None:
-        self.open_markers = {"open", "buka", "bukakan", "launch", "jalankan"}
-        self.search_markers = {"search", "cari", "find", "temukan"}
-        self.sys_markers = {"sys", "status", "info"}
+@dataclass
+class IntentScope:
+    allowed_keywords: frozenset[str]
+    resolutions: dict[str, IntentResolution] = field(default_factory=dict)
+    engine_calls: int = 0
 
-    def resolve(self, raw: str, allowed_keywords: set[str]) -> IntentResolution:
-        clean = raw.strip()
-        if not clean:
-            return IntentResolution(raw, clean, 1.0, "empty")
 
-        strict = self._strict_match(clean, allowed_keywords)
-        if strict is not None:
-            return strict
+@dataclass(frozen=True)
+class IntentRule:
+    keyword: str
+    markers: frozenset[str]
+    template: str
+    confidence: float
+    reason: str
+    targets: tuple[str, ...] = ()
+    query: bool = False
+    noise: frozenset[str] = frozenset()
+    marker_pairs: tuple[frozenset[str], ...] = ()
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> IntentRule:
+        keyword = str(payload["keyword"]).lower()
+        return cls(
+            keyword=keyword,
+            markers=frozenset(str(item).lower() for item in payload.get("markers", [])),
+            template=str(payload["template"]),
+            confidence=float(payload.get("confidence", 0.70)),
+            reason=str(payload.get("reason", f"semantic_{keyword}")),
+            targets=tuple(str(item).lower() for item in payload.get("targets", [])),
+            query=bool(payload.get("query", False)),
+            noise=frozenset(str(item).lower() for item in payload.get("noise", [])),
+            marker_pairs=tuple(
+                frozenset(str(item).lower() for item in pair) for pair in payload.get("marker_pairs", [])
+            ),
+        )
 
-        semantic = self._semantic_match(clean, allowed_keywords)
-        if semantic is not None:
-            return semantic
 
-        return IntentResolution(raw, clean, 0.0, "unresolved")
+class LocalIntentEngine:
+    def __init__(
+        self,
+        rules_path: Path | None = None,
+        cache_size: int = 256,
+    ) -> None:
+        self.cache_size = max(0, cache_size)
+        self.rules_path = rules_path or (Path(".oriondesk") / "intent" / "rules.json")
+        self.rules_error: str | None = None
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple[str, frozenset[str]], IntentResolution] = OrderedDict()
+        self._rules: tuple[IntentRule, ...] = ()
+        self._trigger_index: dict[str, tuple[int, ...]] = {}
+        self._compile(IntentRule.from_payload(item) for item in DEFAULT_INTENT_RULES)
+        if self.rules_path.exists():
+            try:
+                self.load_rules_from_file(self.rules_path)
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                self.rules_error = f"{self.rules_path}: {error}"
+
+    @property
+    def rules(self) -> tuple[IntentRule, ...]:
+        return self._rules
+
+    def load_rules_from_file(self, path: Path) -> int:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        raw_rules = payload.get("rules", []) if isinstance(payload, dict) else payload
+        extra = [IntentRule.from_payload(item) for item in raw_rules]
+        self._compile([*self._rules, *extra])
+        return len(extra)
+
+    def resolve(self, raw: str, allowed_keywords: Iterable[str]) -> IntentResolution:
+        clean = raw.strip()
+        if not clean:
+            return IntentResolution(raw, clean, 1.0, "empty")
 
-    def _strict_match(self, clean: str, allowed_keywords: set[str]) -> IntentResolution | None:
+        allowed = allowed_keywords if isinstance(allowed_keywords, frozenset) else frozenset(allowed_keywords)
+        key = (raw, allowed)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        resolution = self._strict_match(clean, allowed) or self._semantic_match(clean, allowed)
+        if resolution is None:
+            resolution = IntentResolution(raw, clean, 0.0, "unresolved")
+
+        if self.cache_size:
+            with self._lock:
+                self._cache[key] = resolution
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return resolution
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def cache_info(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._cache), "max_size": self.cache_size, "rules": len(self._rules)}
+
+    def _compile(self, rules: Iterable[IntentRule]) -> None:
+        compiled = tuple(rules)
+        index: dict[str, list[int]] = {}
+        for position, rule in enumerate(compiled):
+            triggers = set(rule.markers)
+            for pair in rule.marker_pairs:
+                triggers.update(pair)
+            for token in triggers:
+                index.setdefault(token, []).append(position)
+        with self._lock:
+            self._rules = compiled
+            self._trigger_index = {token: tuple(items) for token, items in index.items()}
+            self._cache.clear()
+
+    def _strict_match(self, clean: str, allowed_keywords: frozenset[str]) -> IntentResolution | None:
         first = clean.split(maxsplit=1)[0].lower()
         if first in allowed_keywords:
             return IntentResolution(clean, clean, 1.0, "strict_keyword")
         return None
 
-    def _semantic_match(self, clean: str, allowed_keywords: set[str]) -> IntentResolution | None:
+    def _semantic_match(self, clean: str, allowed_keywords: frozenset[str]) -> IntentResolution | None:
         lowered = clean.lower()
-        words = self._words(lowered)
-
-        open_candidate = self._resolve_open(words, allowed_keywords)
-        if open_candidate is not None:
-            return IntentResolution(clean, open_candidate, 0.78, "semantic_open")
-
-        search_candidate = self._resolve_search(words, lowered, allowed_keywords)
-        if search_candidate is not None:
-            return IntentResolution(clean, search_candidate, 0.76, "semantic_search")
-
-        has_sys_hint = self._contains(words, self.sys_markers)
-        has_system_pair = "system" in words and ("status" in words or "info" in words)
-        if (has_sys_hint or has_system_pair) and "sys" in allowed_keywords:
-            return IntentResolution(clean, "sys info", 0.72, "semantic_sys")
-
-        return None
-
-    def _resolve_open(self, words: list[str], allowed_keywords: set[str]) -> str | None:
-        if "open" not in allowed_keywords:
-            return None
-        if not self._contains(words, self.open_markers):
+        words = _WORD_PATTERN.findall(lowered)
+        word_set = set(words)
+        index = self._trigger_index
+        hits = [index[word] for word in word_set if word in index]
+        if not hits:
             return None
 
-        app_aliases = ["vscode", "chrome", "notepad"]
-        for alias in app_aliases:
-            if alias in words:
-                return f"open {alias}"
+        rules = self._rules
+        candidates = hits[0] if len(hits) == 1 else sorted(set().union(*hits))
+        for position in candidates:
+            rule = rules[position]
+            if rule.keyword not in allowed_keywords:
+                continue
+            if word_set.isdisjoint(rule.markers) and not any(pair <= word_set for pair in rule.marker_pairs):
+                continue
+            resolved = self._apply(rule, words, word_set, lowered)
+            if resolved is not None:
+                return IntentResolution(clean, resolved, rule.confidence, rule.reason)
         return None
 
-    def _resolve_search(self, words: list[str], lowered: str, allowed_keywords: set[str]) -> str | None:
-        if "search" not in allowed_keywords:
-            return None
-        if not self._contains(words, self.search_markers):
-            return None
-
-        marker = "file"
-        query = self._extract_query(lowered)
-        if not query:
-            return None
-        return f"search {marker} {query}"
-
-    def _extract_query(self, lowered: str) -> str:
-        match = re.search(r"([a-z0-9_\-]+\.[a-z0-9]{2,8})", lowered)
+    def _apply(self, rule: IntentRule, words: list[str], word_set: set[str], lowered: str) -> str | None:
+        values: dict[str, str] = {}
+        if rule.targets:
+            target = next((item for item in rule.targets if item in word_set), None)
+            if target is None:
+                return None
+            values["target"] = target
+        if rule.query:
+            query = self._extract_query(rule, words, lowered)
+            if not query:
+                return None
+            values["query"] = query
+        return rule.template.format(**values)
+
+    def _extract_query(self, rule: IntentRule, words: list[str], lowered: str) -> str:
+        match = _FILE_PATTERN.search(lowered)
         if match:
             return match.group(1)
 
-        words = [item for item in self._words(lowered) if item not in self.search_markers]
-        noise = {"tolong", "dong", "berkas", "file", "carikan", "ya", "please"}
-        filtered = [item for item in words if item not in noise]
-        if not filtered:
-            return ""
+        filtered = [item for item in words if item not in rule.markers and item not in rule.noise]
         return " ".join(filtered[:4])
-
-    def _words(self, lowered: str) -> list[str]:
-        return re.findall(r"[a-z0-9_.-]+", lowered)
-
-    def _contains(self, words: list[str], markers: set[str]) -> bool:
-        return any(item in markers for item in words)
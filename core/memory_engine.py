@@ -4,15 +4,29 @@ import json
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from typing import Callable, Iterator
 
-from core.storage import CommandHistoryRepository, NoteRepository, PreferenceRepository, SQLiteStorageEngine
+from core.storage import (
+    CommandHistoryRepository,
+    NoteRepository,
+    NoteRow,
+    PreferenceRepository,
+    SQLiteStorageEngine,
+    write_json_document,
+    write_json_lines,
+)
+
+TOP_COMMAND_WINDOWS = {"hour": 1, "day": 24, "week": 24 * 7}
+
+
+MemoryNote = NoteRow
 
 
 @dataclass(frozen=True)
-class MemoryNote:
-    tag: str
-    text: str
-    created_at: str
+class NoteSearchHit:
+    note: MemoryNote
+    snippet: str
+    score: float
 
 
 @dataclass
@@ -20,14 +34,19 @@ class MemoryEngine:
     storage_dir: Path = field(default_factory=lambda: Path(".oriondesk") / "memory")
     retention_days: int = 30
     db_path: Path | None = None
+    pooled_storage: bool = False
+    read_barrier: Callable[[], object] | None = None
+    storage_engine: SQLiteStorageEngine | None = None
+    note_listener: Callable[[MemoryNote], None] | None = None
 
     def __post_init__(self) -> None:
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.preferences_file = self.storage_dir / "preferences.json"
         self.notes_file = self.storage_dir / "notes.json"
         self.commands_file = self.storage_dir / "commands.json"
-        database_path = self.db_path or (self.storage_dir / "memory.db")
-        self.storage_engine = SQLiteStorageEngine(db_path=database_path)
+        if self.storage_engine is None:
+            database_path = self.db_path or (self.storage_dir / "memory.db")
+            self.storage_engine = SQLiteStorageEngine(db_path=database_path, pooled=self.pooled_storage)
         self.preference_repo = PreferenceRepository(self.storage_engine)
         self.note_repo = NoteRepository(self.storage_engine)
         self.command_repo = CommandHistoryRepository(self.storage_engine)
@@ -42,67 +61,151 @@ class MemoryEngine:
     def add_note(self, tag: str, text: str) -> MemoryNote:
         note = MemoryNote(tag=tag, text=text, created_at=self._now_iso())
         self.note_repo.add(tag=tag, text=text, created_at=note.created_at)
+        if self.note_listener is not None:
+            self.note_listener(note)
         return note
 
     def recent_notes(self, limit: int = 10) -> list[MemoryNote]:
-        rows = self.note_repo.recent(limit=limit)
-        return [MemoryNote(**item) for item in rows]
+        return self.note_repo.recent(limit=limit)
+
+    def iter_notes(self, page_size: int = 1000) -> Iterator[MemoryNote]:
+        return self.note_repo.iter_all(page_size=page_size)
+
+    def search_notes(self, query: str, limit: int = 10) -> list[NoteSearchHit]:
+        rows = self.note_repo.search(query, limit=limit)
+        return [
+            NoteSearchHit(
+                note=MemoryNote(item.tag, item.text, item.created_at),
+                snippet=item.snippet,
+                score=item.score,
+            )
+            for item in rows
+        ]
 
     def record_command(self, command: str, status: str) -> None:
         self.command_repo.add(command=command, status=status, created_at=self._now_iso())
 
-    def top_commands(self, limit: int = 5) -> list[tuple[str, int]]:
-        return self.command_repo.top_commands(limit=limit)
-
-    def export_memory(self, output_path: Path) -> Path:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        payload = {
-            "preferences": self.preference_repo.all(),
-            "notes": self.note_repo.all(),
-            "commands": self.command_repo.all(),
-        }
-        output_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    def record_commands(self, items: list[tuple[str, str, str]]) -> int:
+        return self.command_repo.add_many(items)
+
+    def top_commands(self, limit: int = 5, window: str | None = None) -> list[tuple[str, int]]:
+        self._sync()
+        if window is None:
+            return self.command_repo.top_commands(limit=limit)
+        hours = TOP_COMMAND_WINDOWS.get(window)
+        if hours is None:
+            raise ValueError(f"Unknown top command window: {window}")
+        threshold = datetime.now(UTC) - timedelta(hours=hours)
+        return self.command_repo.top_commands_since(threshold.isoformat(timespec="seconds"), limit=limit)
+
+    def top_successful_commands(self, limit: int = 5) -> list[tuple[str, int]]:
+        self._sync()
+        return self.command_repo.top_commands_with_status("success", limit=limit)
+
+    def export_memory(self, output_path: Path, page_size: int = 1000) -> Path:
+        self._sync()
+        write_json_document(
+            output_path,
+            {"preferences": self.preference_repo.all()},
+            {
+                "notes": (item._asdict() for item in self.note_repo.iter_all(page_size=page_size)),
+                "commands": (item._asdict() for item in self.command_repo.iter_all(page_size=page_size)),
+            },
+        )
+        return output_path
+
+    def export_memory_jsonl(self, output_path: Path, page_size: int = 1000) -> Path:
+        self._sync()
+        write_json_lines(output_path, self._iter_export_records(page_size))
         return output_path
 
-    def purge_older_than(self, days: int | None = None) -> int:
+    def purge_older_than(
+        self,
+        days: int | None = None,
+        chunk_size: int = 500,
+        on_chunk: Callable[[str, int], None] | None = None,
+    ) -> int:
+        self._sync()
         cutoff_days = days if days is not None else self.retention_days
         threshold = datetime.now(UTC) - timedelta(days=cutoff_days)
 
         threshold_iso = threshold.isoformat(timespec="seconds")
-        removed_notes = self.note_repo.purge_older_than(threshold_iso)
-        removed_commands = self.command_repo.purge_older_than(threshold_iso)
+        removed_notes = self.note_repo.purge_older_than(
+            threshold_iso, chunk_size, self._chunk_reporter("notes", on_chunk)
+        )
+        removed_commands = self.command_repo.purge_older_than(
+            threshold_iso, chunk_size, self._chunk_reporter("commands", on_chunk)
+        )
         return removed_notes + removed_commands
 
     def purge_all(self) -> None:
+        self._sync()
         self.preference_repo.clear()
         self.note_repo.clear()
         self.command_repo.clear()
 
+    def close(self) -> None:
+        self.storage_engine.close()
+
     def _migrate_legacy_json_if_present(self) -> None:
-        if self.storage_engine.table_count("preferences") > 0:
-            return
-        if self.storage_engine.table_count("notes") > 0:
+        legacy_files = (self.preferences_file, self.notes_file, self.commands_file)
+        if not any(path.exists() for path in legacy_files):
             return
-        if self.storage_engine.table_count("commands") > 0:
+        populated = self.storage_engine.fetch_one(
+            """
+            SELECT EXISTS(SELECT 1 FROM preferences)
+                OR EXISTS(SELECT 1 FROM notes)
+                OR EXISTS(SELECT 1 FROM commands)
+            """
+        )
+        if populated is not None and populated[0]:
             return
 
         preferences = self._read_json(self.preferences_file, {})
-        for key, value in preferences.items():
-            self.preference_repo.set(str(key), str(value))
-
         notes = self._read_json(self.notes_file, [])
-        for item in notes:
-            tag = str(item.get("tag", ""))
-            text = str(item.get("text", ""))
-            created_at = str(item.get("created_at", self._now_iso()))
-            self.note_repo.add(tag=tag, text=text, created_at=created_at)
-
         commands = self._read_json(self.commands_file, [])
-        for item in commands:
-            command = str(item.get("command", ""))
-            status = str(item.get("status", ""))
-            created_at = str(item.get("created_at", self._now_iso()))
-            self.command_repo.add(command=command, status=status, created_at=created_at)
+        with self.storage_engine.transaction():
+            self._import_legacy_rows(preferences, notes, commands)
+
+    def _import_legacy_rows(self, preferences: dict, notes: list, commands: list) -> None:
+        self.preference_repo.set_many((str(key), str(value)) for key, value in preferences.items())
+        self.note_repo.add_many(
+            (
+                str(item.get("tag", "")),
+                str(item.get("text", "")),
+                str(item.get("created_at", self._now_iso())),
+            )
+            for item in notes
+        )
+        self.command_repo.add_many(
+            (
+                str(item.get("command", "")),
+                str(item.get("status", "")),
+                str(item.get("created_at", self._now_iso())),
+            )
+            for item in commands
+        )
+
+    def _iter_export_records(self, page_size: int) -> Iterator[dict[str, str]]:
+        for key, value in self.preference_repo.all().items():
+            yield {"type": "preference", "key": key, "value": value}
+        for item in self.note_repo.iter_all(page_size=page_size):
+            yield {"type": "note", **item._asdict()}
+        for item in self.command_repo.iter_all(page_size=page_size):
+            yield {"type": "command", **item._asdict()}
+
+    def _chunk_reporter(
+        self,
+        table_name: str,
+        on_chunk: Callable[[str, int], None] | None,
+    ) -> Callable[[int], None] | None:
+        if on_chunk is None:
+            return None
+        return lambda removed: on_chunk(table_name, removed)
+
+    def _sync(self) -> None:
+        if self.read_barrier is not None:
+            self.read_barrier()
 
     def _read_json(self, path: Path, fallback):
         if not path.exists():
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Callable
 
+PARALLEL_MODE = "parallel-eligible"
+
 
 @dataclass(frozen=True)
 class MultiCommandItem:
@@ -19,7 +22,30 @@ class MultiCommandItem:
         }
 
 
+@dataclass(frozen=True)
+class MultiCommandRun:
+    reports: list[dict]
+    wall_ms: float
+    summed_ms: float
+    parallel_groups: int
+
+    @property
+    def speedup(self) -> float:
+        return round(self.summed_ms / self.wall_ms, 2) if self.wall_ms > 0 else 1.0
+
+    def timing(self) -> dict:
+        return {
+            "wall_ms": self.wall_ms,
+            "summed_ms": self.summed_ms,
+            "speedup": self.speedup,
+            "parallel_groups": self.parallel_groups,
+        }
+
+
 class MultiCommandExecutor:
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max(1, max_workers)
+
     def bundle(self, commands: list[str], risk_level: Callable[[str], str]) -> list[dict]:
         bundles: list[dict] = []
         for command in commands:
@@ -34,26 +60,60 @@ class MultiCommandExecutor:
         bundles: list[dict],
         run_command: Callable[[str], tuple[str, str]],
     ) -> list[dict]:
+        return self.run(bundles, run_command).reports
+
+    def run(
+        self,
+        bundles: list[dict],
+        run_command: Callable[[str], tuple[str, str]],
+    ) -> MultiCommandRun:
+        started = time.perf_counter()
         reports: list[dict] = []
+        parallel_groups = 0
+        pool: ThreadPoolExecutor | None = None
+        try:
+            for group in self._groups(bundles):
+                if len(group) == 1 or self.max_workers == 1:
+                    reports.extend(self._run_step(item, run_command) for item in group)
+                    continue
+                if pool is None:
+                    pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="oriondesk-multi")
+                parallel_groups += 1
+                futures = [pool.submit(self._run_step, item, run_command) for item in group]
+                reports.extend(future.result() for future in futures)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        wall_ms = round((time.perf_counter() - started) * 1000.0, 2)
+        summed_ms = round(sum(item["duration_ms"] for item in reports), 2)
+        return MultiCommandRun(reports, wall_ms, summed_ms, parallel_groups)
+
+    def _groups(self, bundles: list[dict]) -> list[list[dict]]:
+        # Contiguous parallel-eligible steps share a group; chain and guarded steps always run alone, in order.
+        groups: list[list[dict]] = []
         for item in bundles:
-            start = time.perf_counter()
-            status, message = run_command(item["command"])
-            duration_ms = (time.perf_counter() - start) * 1000.0
-            reports.append(
-                {
-                    "command": item["command"],
-                    "risk_level": item["risk_level"],
-                    "execution_mode": item["execution_mode"],
-                    "status": status,
-                    "duration_ms": round(duration_ms, 2),
-                    "message": message,
-                }
-            )
-        return reports
+            if item["execution_mode"] == PARALLEL_MODE and groups and groups[-1][0]["execution_mode"] == PARALLEL_MODE:
+                groups[-1].append(item)
+            else:
+                groups.append([item])
+        return groups
+
+    def _run_step(self, item: dict, run_command: Callable[[str], tuple[str, str]]) -> dict:
+        start = time.perf_counter()
+        status, message = run_command(item["command"])
+        duration_ms = (time.perf_counter() - start) * 1000.0
+        return {
+            "command": item["command"],
+            "risk_level": item["risk_level"],
+            "execution_mode": item["execution_mode"],
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "message": message,
+        }
 
     def _execution_mode(self, keyword: str, risk_level: str) -> str:
         if risk_level in {"high", "critical"}:
             return "guarded"
         if keyword in {"search", "sys", "capability", "net"}:
-            return "parallel-eligible"
+            return PARALLEL_MODE
         return "chain"
@@ -4,7 +4,9 @@ import json
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable
+
+from core.storage import write_json_document
 
 
 @dataclass(frozen=True)
@@ -14,41 +16,73 @@ class HealthCheckResult:
     detail: str
 
 
+def _json_default(value: Any) -> Any:
+    to_dict = getattr(value, "to_dict", None)
+    if callable(to_dict):
+        return to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 class StructuredLogger:
     def __init__(self, log_dir: Path | None = None) -> None:
         self.log_dir = log_dir or (Path(".oriondesk") / "logs")
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.log_file = self.log_dir / "events.jsonl"
-
-    def log(self, level: str, event: str, message: str, metadata: dict[str, Any] | None = None) -> None:
-        payload = {
+        self.read_barrier: Callable[[], object] | None = None
+        self.write_behind: Callable[[dict[str, Any]], object] | None = None
+
+    def build_payload(
+        self,
+        level: str,
+        event: str,
+        message: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        return {
             "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
             "level": level,
             "event": event,
             "message": message,
             "metadata": metadata or {},
         }
+
+    def log(self, level: str, event: str, message: str, metadata: dict[str, Any] | None = None) -> None:
+        payload = self.build_payload(level, event, message, metadata)
+        if self.write_behind is not None:
+            # Queue behind pending command records instead of flushing them, so the file keeps event order.
+            self.write_behind(payload)
+            return
+        self.write_many([payload])
+
+    def write_many(self, payloads: list[dict[str, Any]]) -> None:
+        if not payloads:
+            return
+        lines = "".join(json.dumps(item, default=_json_default) + "\n" for item in payloads)
         with self.log_file.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload) + "\n")
+            handle.write(lines)
 
     def tail(self, limit: int = 20) -> list[dict[str, Any]]:
+        self._sync()
         if not self.log_file.exists():
             return []
         lines = self.log_file.read_text(encoding="utf-8").splitlines()
         selected = lines[-limit:] if limit > 0 else []
         return [json.loads(item) for item in selected]
 
+    def _sync(self) -> None:
+        if self.read_barrier is not None:
+            self.read_barrier()
+
 
 class RecoveryManager:
     def __init__(self, snapshot_dir: Path | None = None) -> None:
         self.snapshot_dir = snapshot_dir or (Path(".oriondesk") / "recovery")
         self.snapshot_dir.mkdir(parents=True, exist_ok=True)
 
-    def save_snapshot(self, session_name: str, entries: list[dict[str, Any]]) -> Path:
+    def save_snapshot(self, session_name: str, entries: Iterable[dict[str, Any]]) -> Path:
         timestamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
         target = self.snapshot_dir / f"{session_name}-{timestamp}.json"
-        payload = {"session_name": session_name, "entries": entries}
-        target.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        write_json_document(target, {"session_name": session_name}, {"entries": entries})
         return target
 
     def load_latest_snapshot(self) -> dict[str, Any] | None:
@@ -97,13 +131,19 @@ class DiagnosticReporter:
         self.output_dir = output_dir or (Path(".oriondesk") / "diagnostics")
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def generate(self, checks: list[HealthCheckResult], recent_logs: list[dict[str, Any]]) -> Path:
+    def generate(
+        self,
+        checks: list[HealthCheckResult],
+        recent_logs: list[dict[str, Any]],
+        metrics: dict[str, Any] | None = None,
+    ) -> Path:
         timestamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
         target = self.output_dir / f"diagnostic-{timestamp}.json"
         payload = {
             "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
             "checks": [asdict(item) for item in checks],
             "recent_logs": recent_logs,
+            "metrics": metrics or {},
         }
         target.write_text(json.dumps(payload, indent=2), encoding="utf-8")
         return target
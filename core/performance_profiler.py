@@ -1,11 +1,45 @@
 from __future__ import annotations
 
+import json
+import os
+import subprocess
+import sys
 import tempfile
+import tracemalloc
 from dataclasses import dataclass
 from pathlib import Path
 from time import perf_counter
 from typing import Callable
 
+from core.storage import CommandHistoryRepository, SessionLogRepository, SQLiteStorageEngine
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_COLD_START_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from core.router import CommandRouter
+imported = time.perf_counter()
+router = CommandRouter()
+constructed = time.perf_counter()
+router.execute(sys.argv[1])
+finished = time.perf_counter()
+router.shutdown()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000.0,
+    "construct_ms": (constructed - imported) * 1000.0,
+    "first_command_ms": (finished - constructed) * 1000.0,
+    "time_to_first_command_ms": (finished - started) * 1000.0,
+}))
+"""
+
+_RECENT_QUERY = """
+SELECT timestamp, command, message, status
+FROM session_logs
+WHERE session_name = ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
 
 @dataclass(frozen=True)
 class BenchmarkResult:
@@ -14,18 +48,55 @@ class BenchmarkResult:
     iterations: int
 
 
+@dataclass(frozen=True)
+class _DictSessionEntry:
+    timestamp: str
+    command: str
+    message: str
+    status: str
+
+
 @dataclass
 class PerformanceProfiler:
-    def measure_startup(self, builder: Callable[[], object], iterations: int = 3) -> BenchmarkResult:
+    def measure_startup(
+        self,
+        builder: Callable[[], object],
+        iterations: int = 3,
+        teardown: Callable[[object], None] | None = None,
+    ) -> BenchmarkResult:
         runs = max(1, iterations)
         samples: list[float] = []
         for _ in range(runs):
             started = perf_counter()
-            _ = builder()
+            built = builder()
             elapsed = (perf_counter() - started) * 1000.0
             samples.append(elapsed)
+            if teardown is not None:
+                teardown(built)
         return BenchmarkResult(metric="startup_ms", average_ms=self._avg(samples), iterations=runs)
 
+    def measure_cold_start(self, command: str = "sys info", iterations: int = 3) -> dict[str, float]:
+        runs = max(1, iterations)
+        samples: list[dict[str, float]] = []
+        environment = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(_PROJECT_ROOT), os.getenv("PYTHONPATH")])),
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for index in range(runs + 1):
+                completed = subprocess.run(
+                    [sys.executable, "-c", _COLD_START_SCRIPT, command],
+                    cwd=temp_dir,
+                    env=environment,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=60,
+                )
+                if index > 0:
+                    samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        return {key: self._avg([sample[key] for sample in samples]) for key in samples[0]}
+
     def measure_command_latency(
         self,
         executor: Callable[[str], object],
@@ -41,6 +112,22 @@ class PerformanceProfiler:
             samples.append(elapsed)
         return BenchmarkResult(metric="command_latency_ms", average_ms=self._avg(samples), iterations=runs)
 
+    def measure_command_dispatch(
+        self,
+        executor: Callable[[str], object],
+        commands: tuple[str, ...],
+        iterations: int = 200,
+    ) -> dict[str, float]:
+        runs = max(1, iterations)
+        report: dict[str, float] = {}
+        for command in commands:
+            executor(command)
+            started = perf_counter()
+            for _ in range(runs):
+                executor(command)
+            report[command] = round((perf_counter() - started) * 1_000_000.0 / runs, 2)
+        return report
+
     def measure_storage_io(self, iterations: int = 20) -> BenchmarkResult:
         runs = max(1, iterations)
         samples: list[float] = []
@@ -55,6 +142,145 @@ class PerformanceProfiler:
                 samples.append(elapsed)
         return BenchmarkResult(metric="storage_io_ms", average_ms=self._avg(samples), iterations=runs)
 
+    def measure_sqlite_storage_io(self, pooled: bool, iterations: int = 20) -> BenchmarkResult:
+        runs = max(1, iterations)
+        samples: list[float] = []
+        mode = "pooled" if pooled else "unpooled"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            engine = SQLiteStorageEngine(db_path=Path(temp_dir) / "bench.db", pooled=pooled)
+            try:
+                for index in range(runs):
+                    started = perf_counter()
+                    engine.execute(
+                        "INSERT INTO commands(command, status, created_at) VALUES (?, ?, ?)",
+                        ("sys info", "success", f"bench-{index}"),
+                    )
+                    _ = engine.fetch_one("SELECT COUNT(*) FROM commands")
+                    elapsed = (perf_counter() - started) * 1000.0
+                    samples.append(elapsed)
+            finally:
+                engine.close()
+        return BenchmarkResult(metric=f"sqlite_{mode}_io_ms", average_ms=self._avg(samples), iterations=runs)
+
+    def compare_sqlite_pooling(self, iterations: int = 20) -> dict[str, float]:
+        unpooled = self.measure_sqlite_storage_io(pooled=False, iterations=iterations)
+        pooled = self.measure_sqlite_storage_io(pooled=True, iterations=iterations)
+        speedup = unpooled.average_ms / pooled.average_ms if pooled.average_ms > 0 else 0.0
+        return {
+            "unpooled_ms": unpooled.average_ms,
+            "pooled_ms": pooled.average_ms,
+            "speedup": round(speedup, 2),
+        }
+
+    def measure_bulk_import(self, rows: int, pooled: bool = True) -> BenchmarkResult:
+        total = max(1, rows)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            engine = SQLiteStorageEngine(db_path=Path(temp_dir) / "bulk.db", pooled=pooled)
+            repository = CommandHistoryRepository(engine)
+            payload = (("sys info", "success", f"2026-02-18T10:00:{index % 60:02d}+00:00") for index in range(total))
+            try:
+                started = perf_counter()
+                repository.add_many(payload)
+                elapsed = (perf_counter() - started) * 1000.0
+            finally:
+                engine.close()
+        return BenchmarkResult(metric=f"bulk_import_{total}_ms", average_ms=round(elapsed, 3), iterations=total)
+
+    def benchmark_bulk_imports(
+        self,
+        row_counts: tuple[int, ...] = (10_000, 100_000, 1_000_000),
+    ) -> dict[int, dict[str, float]]:
+        report: dict[int, dict[str, float]] = {}
+        for rows in row_counts:
+            result = self.measure_bulk_import(rows)
+            seconds = result.average_ms / 1000.0
+            rows_per_second = result.iterations / seconds if seconds > 0 else 0.0
+            report[result.iterations] = {"total_ms": result.average_ms, "rows_per_second": round(rows_per_second, 1)}
+        return report
+
+    def measure_recent_rows(self, limit: int = 40, iterations: int = 200) -> dict[str, float]:
+        size = max(1, limit)
+        runs = max(1, iterations)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            engine = SQLiteStorageEngine(db_path=Path(temp_dir) / "recent.db", pooled=True)
+            repository = SessionLogRepository(engine)
+            repository.add_many(
+                "bench",
+                (
+                    (f"2026-02-18T10:{index // 60 % 60:02d}:{index % 60:02d}+00:00", "sys info", f"ok {index}", "success")
+                    for index in range(size * 4)
+                ),
+            )
+
+            def dict_rows() -> list:
+                rows = engine.fetch_all(_RECENT_QUERY, ("bench", size))
+                items = [
+                    {"timestamp": str(timestamp), "command": str(command), "message": str(message), "status": str(status)}
+                    for timestamp, command, message, status in reversed(rows)
+                ]
+                return [_DictSessionEntry(**item) for item in items]
+
+            try:
+                report: dict[str, float] = {}
+                for name, reader in (("dict", dict_rows), ("row_factory", lambda: repository.recent("bench", size))):
+                    average_ms, bytes_per_row = self._measure_reader(reader, runs, size)
+                    report[f"{name}_ms"] = average_ms
+                    report[f"{name}_bytes_per_row"] = bytes_per_row
+            finally:
+                engine.close()
+        return report
+
+    def measure_statement_cache(
+        self,
+        cache_sizes: tuple[int, ...] = (64, 128, 256),
+        statements: int = 200,
+        iterations: int = 5,
+    ) -> dict[int, float]:
+        # Cycles through a working set of distinct statements on one pooled connection. Once the working set
+        # exceeds the LRU cache every execute re-prepares, which is what the cache size has to prevent.
+        queries = [
+            f"SELECT id, command, status FROM commands WHERE id > ? AND length(command) >= {index} LIMIT 1"
+            for index in range(max(1, statements))
+        ]
+        runs = max(1, iterations)
+        report: dict[int, float] = {}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for size in cache_sizes:
+                engine = SQLiteStorageEngine(
+                    db_path=Path(temp_dir) / f"statements_{size}.db",
+                    pooled=True,
+                    pool_size=1,
+                    statement_cache_size=size,
+                )
+                try:
+                    CommandHistoryRepository(engine).add("sys info", "success", "2026-02-18T10:00:00+00:00")
+                    for query in queries:
+                        engine.fetch_one(query, (0,))
+                    started = perf_counter()
+                    for _ in range(runs):
+                        for query in queries:
+                            engine.fetch_one(query, (0,))
+                    report[size] = round((perf_counter() - started) * 1000.0 / (runs * len(queries)), 4)
+                finally:
+                    engine.close()
+        return report
+
+    def _measure_reader(self, reader: Callable[[], list], iterations: int, rows: int) -> tuple[float, float]:
+        reader()
+        started = perf_counter()
+        for _ in range(iterations):
+            reader()
+        average_ms = round((perf_counter() - started) * 1000.0 / iterations, 4)
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            reader()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return average_ms, round((peak - baseline) / max(1, rows), 1)
+
     def _avg(self, values: list[float]) -> float:
         if not values:
             return 0.0
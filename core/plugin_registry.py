@@ -1,8 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import importlib
+import importlib.util
+import json
+import os
 import pkgutil
+import threading
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+_MANIFEST_LOCK = threading.Lock()
+_MANIFEST_CACHE: dict[str, tuple[tuple, tuple[PluginCommandDefinition, ...]]] = {}
 
 
 @dataclass(frozen=True)
@@ -17,10 +26,36 @@ class PluginCommandDefinition:
 
 
 class PluginRegistry:
-    def __init__(self, package_name: str = "plugins") -> None:
+    def __init__(self, package_name: str = "plugins", cache_dir: Path | None = None) -> None:
         self.package_name = package_name
+        self.cache_dir = cache_dir or (Path(".oriondesk") / "cache")
+        self.manifest_file = self.cache_dir / f"{package_name}_manifest.json"
+        self.last_source = "scan"
 
     def discover(self) -> list[PluginCommandDefinition]:
+        fingerprint = self._fingerprint()
+        if fingerprint is None:
+            self.last_source = "scan"
+            return self._scan()
+
+        with _MANIFEST_LOCK:
+            cached = _MANIFEST_CACHE.get(self.package_name)
+        if cached is not None and cached[0] == fingerprint:
+            self.last_source = "memory"
+            return list(cached[1])
+
+        definitions = self._read_manifest(fingerprint)
+        if definitions is not None:
+            self.last_source = "manifest"
+        else:
+            self.last_source = "scan"
+            definitions = self._scan()
+            self._write_manifest(fingerprint, definitions)
+        with _MANIFEST_LOCK:
+            _MANIFEST_CACHE[self.package_name] = (fingerprint, tuple(definitions))
+        return list(definitions)
+
+    def _scan(self) -> list[PluginCommandDefinition]:
         package = importlib.import_module(self.package_name)
         definitions: list[PluginCommandDefinition] = []
         seen_keywords: set[str] = set()
@@ -47,3 +82,52 @@ class PluginRegistry:
                 definitions.append(definition)
 
         return definitions
+
+    def _fingerprint(self) -> tuple | None:
+        try:
+            spec = importlib.util.find_spec(self.package_name)
+        except (ImportError, ValueError):
+            return None
+        if spec is None or not spec.submodule_search_locations:
+            return None
+
+        entries: list[tuple[str, str, int, int]] = []
+        for location in spec.submodule_search_locations:
+            try:
+                with os.scandir(location) as iterator:
+                    for entry in iterator:
+                        if entry.name.endswith("_plugin.py") or entry.name == "__init__.py":
+                            stat = entry.stat()
+                            entries.append((location, entry.name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                return None
+        return tuple(sorted(entries))
+
+    def _read_manifest(self, fingerprint: tuple) -> list[PluginCommandDefinition] | None:
+        try:
+            payload = json.loads(self.manifest_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != MANIFEST_VERSION or payload.get("package") != self.package_name:
+            return None
+        if tuple(tuple(item) for item in payload.get("fingerprint", [])) != fingerprint:
+            return None
+        try:
+            return [PluginCommandDefinition(**item) for item in payload.get("definitions", [])]
+        except TypeError:
+            return None
+
+    def _write_manifest(self, fingerprint: tuple, definitions: list[PluginCommandDefinition]) -> None:
+        payload = {
+            "version": MANIFEST_VERSION,
+            "package": self.package_name,
+            "fingerprint": [list(item) for item in fingerprint],
+            "definitions": [asdict(item) for item in definitions],
+        }
+        temp_file = self.manifest_file.with_suffix(".tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            os.replace(temp_file, self.manifest_file)
+        except OSError:
+            return
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable
+from typing import Callable, Sequence
 
 
 @dataclass(frozen=True)
@@ -47,17 +47,24 @@ class ComplexReasoningEngine:
         graph_payload: dict,
         embed_text: Callable[[str], list[float]],
         risk_level: Callable[[str], str],
+        embed_many: Callable[[Sequence[str]], list[list[float]]] | None = None,
     ) -> ReasoningPlan:
         decisions: list[ReasoningDecision] = []
         fallback_used = False
         confidence_total = 0.0
 
-        for step in graph_payload.get("steps", []):
-            command = step.get("resolved_command", "").strip()
+        steps = list(graph_payload.get("steps", []))
+        commands = [step.get("resolved_command", "").strip() for step in steps]
+        if embed_many is not None:
+            embeddings = embed_many(commands) if commands else []
+        else:
+            embeddings = [embed_text(command) for command in commands]
+
+        for step, command, embedding in zip(steps, commands, embeddings):
             keyword = command.split(" ")[0].lower() if command else "open"
             level = risk_level(keyword)
             confidence = self._extract_confidence(step.get("reason", ""))
-            confidence = self._apply_semantic_bonus(confidence, embed_text(command))
+            confidence = self._apply_semantic_bonus(confidence, embedding)
 
             mode = "execute"
             reason = "reasoning confidence valid"
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Callable
+
+from core.memory_engine import MemoryEngine
+from core.session import SessionLayer
+
+
+@dataclass(frozen=True)
+class RetentionProgress:
+    stage: str
+    target: str
+    count: int
+    total: int
+
+
+@dataclass(frozen=True)
+class RetentionReport:
+    started_at: str
+    removed_by_table: dict[str, int]
+    reclaimed_pages: int
+    error: str | None = None
+
+    @property
+    def total_removed(self) -> int:
+        return sum(self.removed_by_table.values())
+
+
+class RetentionJob:
+    def __init__(
+        self,
+        memory_engine: MemoryEngine,
+        session_layer: SessionLayer,
+        retention_days: int | None = None,
+        session_retention_days: int | None = None,
+        chunk_size: int = 500,
+        interval_seconds: float = 6 * 60 * 60,
+        initial_delay_seconds: float = 30.0,
+        progress_callback: Callable[[RetentionProgress], None] | None = None,
+        report_callback: Callable[[RetentionReport], None] | None = None,
+    ) -> None:
+        self.memory_engine = memory_engine
+        self.session_layer = session_layer
+        self.retention_days = retention_days
+        self.session_retention_days = session_retention_days
+        self.chunk_size = max(1, chunk_size)
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.initial_delay_seconds = max(0.0, initial_delay_seconds)
+        self.progress_callback = progress_callback
+        self.report_callback = report_callback
+        self.last_report: RetentionReport | None = None
+        self._run_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker: threading.Thread | None = None
+
+    def run_once(self) -> RetentionReport:
+        with self._run_lock:
+            started_at = datetime.now(UTC).isoformat(timespec="seconds")
+            removed: dict[str, int] = {"notes": 0, "commands": 0, "session_logs": 0}
+
+            def _report(stage: str, table: str, count: int) -> None:
+                removed[table] += count
+                if self.progress_callback is not None:
+                    self.progress_callback(RetentionProgress(stage, table, count, sum(removed.values())))
+
+            try:
+                # Purging history is opt-in: with no retention configured the job only compacts.
+                if self.retention_days is not None:
+                    self.memory_engine.purge_older_than(
+                        days=self.retention_days,
+                        chunk_size=self.chunk_size,
+                        on_chunk=lambda table, count: _report("purge", table, count),
+                    )
+                if self.session_retention_days is not None:
+                    self.session_layer.purge_older_than(
+                        days=self.session_retention_days,
+                        chunk_size=self.chunk_size,
+                        on_chunk=lambda count: _report("purge", "session_logs", count),
+                    )
+                reclaimed = self._compact()
+                error = None
+            except sqlite3.Error as exc:
+                reclaimed = 0
+                error = str(exc)
+            self.last_report = RetentionReport(started_at, dict(removed), reclaimed, error)
+        if self.report_callback is not None:
+            self.report_callback(self.last_report)
+        return self.last_report
+
+    def start(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="oriondesk-retention", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout=timeout)
+        self._worker = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def _run(self) -> None:
+        delay = self.initial_delay_seconds
+        while not self._stop_event.wait(delay):
+            self.run_once()
+            delay = self.interval_seconds
+
+    def _compact(self) -> int:
+        reclaimed = 0
+        for target, engine in (
+            ("memory", self.memory_engine.storage_engine),
+            ("session", self.session_layer.storage_engine),
+        ):
+            result = engine.compact()
+            reclaimed += result["reclaimed_pages"]
+            if self.progress_callback is not None:
+                self.progress_callback(RetentionProgress("compact", target, result["reclaimed_pages"], reclaimed))
+        return reclaimed
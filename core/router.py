@@ -2,48 +2,62 @@ from __future__ import annotations
 
 import getpass
 import os
+import threading
 import time
 from concurrent.futures import Future, ThreadPoolExecutor
-from dataclasses import asdict, dataclass
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, replace
+from functools import wraps
 from pathlib import Path
-from typing import Callable
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Mapping, Sequence
 from uuid import uuid4
 
+from core.audit_recorder import WriteBehindAuditRecorder
 from core.capability_guardrail import CapabilityGuardrail
 from core.capability_layer import SystemCapabilityLayer
 from core.companion_policy import AutoActionDecision, CompanionPolicy, ImpactAssessment
-from core.deployment_manager import ConfigMigrationManager, ProfileBackupManager, ReleaseChannelManager
 from core.argument_extractor import ArgumentExtractor
+from core.embedding_cache import EmbeddingCache
 from core.embedding_provider import EmbeddingConfig, EmbeddingProvider, OllamaEmbeddingProvider
 from core.generation_provider import GenerationConfig, GenerationProvider, OllamaGenerationProvider
+from core.http_pool import shared_http_pool
 from core.latency_budget import LatencyBudget, MainThreadResponsivenessGuard
 from core.execution_profile import ExecutionProfilePolicy
-from core.executor import ExecutionContext, UnifiedCommandExecutor, build_execution_timestamp
-from core.intent_engine import LocalIntentEngine
+from core.executor import ExecutionContext, ExecutionContextBase, UnifiedCommandExecutor
+from core.intent_engine import IntentResolution, IntentScope, LocalIntentEngine
 from core.intent_graph import IntentGraphPlanner
 from core.memory_engine import MemoryEngine
 from core.multi_command_executor import MultiCommandExecutor
 from core.observability import DiagnosticReporter, HealthMonitor, RecoveryManager, StructuredLogger
 from core.plugin_registry import PluginRegistry
-from core.performance_profiler import PerformanceProfiler
 from core.reasoning_engine import ComplexReasoningEngine
+from core.retention import RetentionJob, RetentionReport
 from core.retrieval_optimizer import RetrievalOptimizer
-from core.release_gate_v22 import GateScenario, ReleaseGateV22
-from core.release_hardening import ReleaseHardeningPlan
 from core.safe_mode_policy import SafeModePolicy
 from core.security_guard import SecurityGuard
 from core.session import SessionLayer
 from core.smart_assist import SmartAssistEngine
+from core.storage import SQLiteStorageEngine
+from core.suggestion_index import SuggestionIndex
+from core.vector_index import KIND_COMMAND, KIND_NOTE, KIND_USAGE, VectorHit, VectorIndex
 from core.system_intent_mapper import SystemIntentMapper
 from modules.clipboard_manager import ClipboardManager
 from modules.file_manager import FileManager
 from modules.focus_mode import FocusModeManager
 from modules.launcher import Launcher
-from modules.network_diagnostics import NetworkDiagnostics
 from modules.project_manager import ProjectManager
 from modules.system_actions import SystemActions
 from modules.system_tools import SystemTools
 
+if TYPE_CHECKING:
+    from core.deployment_manager import ConfigMigrationManager, ProfileBackupManager, ReleaseChannelManager
+    from core.performance_profiler import PerformanceProfiler
+    from core.release_gate_v22 import ReleaseGateV22
+    from core.release_hardening import ReleaseHardeningPlan
+    from modules.network_diagnostics import NetworkDiagnostics
+
 
 @dataclass(frozen=True)
 class ParsedCommand:
@@ -59,6 +73,14 @@ class CommandResult:
     pending_command: str | None = None
 
 
+@dataclass(frozen=True)
+class CommandAssist:
+    suggestions: tuple[str, ...]
+    usage_hint: str | None
+    argument_hint: str
+    intent_explanation: str
+
+
 @dataclass(frozen=True)
 class CommandContract:
     keyword: str
@@ -68,14 +90,111 @@ class CommandContract:
     first_arg_equals: str | None = None
 
 
+class _LazyComponent:
+    def __init__(self, factory: Callable[[CommandRouter], Any]) -> None:
+        self.factory = factory
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.attribute = f"_lazy_{name}"
+
+    def __get__(self, instance: CommandRouter | None, owner: type | None = None) -> Any:
+        if instance is None:
+            return None
+        value = instance.__dict__.get(self.attribute)
+        if value is None:
+            with self._lock:
+                value = instance.__dict__.get(self.attribute)
+                if value is None:
+                    value = self.factory(instance)
+                    instance.__dict__[self.attribute] = value
+        return value
+
+    def __set__(self, instance: CommandRouter, value: Any) -> None:
+        instance.__dict__[self.attribute] = value
+
+
+_INTENT_SCOPE: ContextVar[IntentScope | None] = ContextVar("oriondesk_intent_scope", default=None)
+
+
+def _intent_scoped(method: Callable) -> Callable:
+    @wraps(method)
+    def wrapper(self: CommandRouter, *args, **kwargs):
+        with self.intent_scope():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _build_release_channel_manager(_router: CommandRouter) -> ReleaseChannelManager:
+    from core.deployment_manager import ReleaseChannelManager
+
+    return ReleaseChannelManager()
+
+
+def _build_migration_manager(_router: CommandRouter) -> ConfigMigrationManager:
+    from core.deployment_manager import ConfigMigrationManager
+
+    return ConfigMigrationManager()
+
+
+def _build_backup_manager(_router: CommandRouter) -> ProfileBackupManager:
+    from core.deployment_manager import ProfileBackupManager
+
+    return ProfileBackupManager()
+
+
+def _build_network_diagnostics(_router: CommandRouter) -> NetworkDiagnostics:
+    from modules.network_diagnostics import NetworkDiagnostics
+
+    return NetworkDiagnostics()
+
+
+def _build_performance_profiler(_router: CommandRouter) -> PerformanceProfiler:
+    from core.performance_profiler import PerformanceProfiler
+
+    return PerformanceProfiler()
+
+
+def _build_release_hardening_plan(_router: CommandRouter) -> ReleaseHardeningPlan:
+    from core.release_hardening import ReleaseHardeningPlan
+
+    return ReleaseHardeningPlan()
+
+
+def _build_release_gate(_router: CommandRouter) -> ReleaseGateV22:
+    from core.release_gate_v22 import ReleaseGateV22
+
+    return ReleaseGateV22()
+
+
+def _build_suggestion_index(router: CommandRouter) -> SuggestionIndex:
+    return SuggestionIndex.build(
+        usages=router.command_table.usages,
+        argument_map=router.smart_assist.argument_map,
+        history=router.memory_engine.top_successful_commands(limit=50),
+        keywords=router.command_table.keywords,
+    )
+
+
+@dataclass(frozen=True)
+class CommandTable:
+    contracts: Mapping[str, CommandContract]
+    handlers: Mapping[str, Callable[[ParsedCommand], str]]
+    dangerous: frozenset[str]
+    keywords: frozenset[str]
+    ordered_keywords: tuple[str, ...]
+    usages: tuple[str, ...]
+
+
 @dataclass
 class CommandRouter:
     launcher: Launcher | None = None
     file_manager: FileManager | None = None
     system_tools: SystemTools | None = None
-    handlers: dict[str, Callable[[ParsedCommand], str]] | None = None
-    contracts: dict[str, CommandContract] | None = None
-    dangerous_keywords: set[str] | None = None
+    handlers: Mapping[str, Callable[[ParsedCommand], str]] | None = None
+    contracts: Mapping[str, CommandContract] | None = None
+    dangerous_keywords: frozenset[str] | None = None
     safe_mode: bool = True
     pending_confirmation: ParsedCommand | None = None
     pending_autocorrect: str | None = None
@@ -85,96 +204,120 @@ class CommandRouter:
     intent_engine: LocalIntentEngine | None = None
     memory_engine: MemoryEngine | None = None
     logger: StructuredLogger | None = None
-    recovery_manager: RecoveryManager | None = None
-    health_monitor: HealthMonitor | None = None
-    diagnostic_reporter: DiagnosticReporter | None = None
-    release_channel_manager: ReleaseChannelManager | None = None
-    migration_manager: ConfigMigrationManager | None = None
-    backup_manager: ProfileBackupManager | None = None
+    recovery_manager: RecoveryManager | None = _LazyComponent(lambda _router: RecoveryManager())
+    health_monitor: HealthMonitor | None = _LazyComponent(lambda _router: HealthMonitor())
+    diagnostic_reporter: DiagnosticReporter | None = _LazyComponent(lambda _router: DiagnosticReporter())
+    release_channel_manager: ReleaseChannelManager | None = _LazyComponent(_build_release_channel_manager)
+    migration_manager: ConfigMigrationManager | None = _LazyComponent(_build_migration_manager)
+    backup_manager: ProfileBackupManager | None = _LazyComponent(_build_backup_manager)
     executor: UnifiedCommandExecutor | None = None
     session_id: str | None = None
-    capability_layer: SystemCapabilityLayer | None = None
-    capability_guardrail: CapabilityGuardrail | None = None
-    system_intent_mapper: SystemIntentMapper | None = None
+    capability_layer: SystemCapabilityLayer | None = _LazyComponent(lambda _router: SystemCapabilityLayer())
+    capability_guardrail: CapabilityGuardrail | None = _LazyComponent(
+        lambda _router: CapabilityGuardrail(permission_tier="basic")
+    )
+    system_intent_mapper: SystemIntentMapper | None = _LazyComponent(lambda _router: SystemIntentMapper())
     smart_assist: SmartAssistEngine | None = None
-    system_actions: SystemActions | None = None
+    system_actions: SystemActions | None = _LazyComponent(lambda _router: SystemActions())
     execution_profile_policy: ExecutionProfilePolicy | None = None
-    project_manager: ProjectManager | None = None
-    clipboard_manager: ClipboardManager | None = None
-    focus_mode_manager: FocusModeManager | None = None
-    network_diagnostics: NetworkDiagnostics | None = None
-    performance_profiler: PerformanceProfiler | None = None
-    release_hardening_plan: ReleaseHardeningPlan | None = None
-    embedding_provider: EmbeddingProvider | None = None
-    generation_provider: GenerationProvider | None = None
+    project_manager: ProjectManager | None = _LazyComponent(lambda _router: ProjectManager())
+    clipboard_manager: ClipboardManager | None = _LazyComponent(lambda _router: ClipboardManager())
+    focus_mode_manager: FocusModeManager | None = _LazyComponent(lambda _router: FocusModeManager())
+    network_diagnostics: NetworkDiagnostics | None = _LazyComponent(_build_network_diagnostics)
+    performance_profiler: PerformanceProfiler | None = _LazyComponent(_build_performance_profiler)
+    release_hardening_plan: ReleaseHardeningPlan | None = _LazyComponent(_build_release_hardening_plan)
+    embedding_provider: EmbeddingProvider | None = _LazyComponent(
+        lambda router: OllamaEmbeddingProvider(config=router._build_embedding_config_from_env())
+    )
+    generation_provider: GenerationProvider | None = _LazyComponent(
+        lambda router: OllamaGenerationProvider(config=router._build_generation_config_from_env())
+    )
+    embedding_cache: EmbeddingCache | None = _LazyComponent(
+        lambda router: EmbeddingCache(storage_engine=router.memory_engine.storage_engine)
+    )
     chat_model_enabled: bool = True
     response_quality: str = "balanced"
-    intent_graph_planner: IntentGraphPlanner | None = None
-    reasoning_engine: ComplexReasoningEngine | None = None
-    argument_extractor: ArgumentExtractor | None = None
-    multi_command_executor: MultiCommandExecutor | None = None
-    retrieval_optimizer: RetrievalOptimizer | None = None
-    release_gate_v22: ReleaseGateV22 | None = None
-    companion_policy: CompanionPolicy | None = None
+    intent_graph_planner: IntentGraphPlanner | None = _LazyComponent(lambda _router: IntentGraphPlanner())
+    reasoning_engine: ComplexReasoningEngine | None = _LazyComponent(lambda _router: ComplexReasoningEngine())
+    argument_extractor: ArgumentExtractor | None = _LazyComponent(lambda _router: ArgumentExtractor())
+    multi_command_executor: MultiCommandExecutor | None = _LazyComponent(lambda _router: MultiCommandExecutor())
+    retrieval_optimizer: RetrievalOptimizer | None = _LazyComponent(lambda _router: RetrievalOptimizer())
+    release_gate_v22: ReleaseGateV22 | None = _LazyComponent(_build_release_gate)
+    companion_policy: CompanionPolicy | None = _LazyComponent(lambda _router: CompanionPolicy())
+    suggestion_index: SuggestionIndex | None = _LazyComponent(_build_suggestion_index)
+    vector_index: VectorIndex | None = None
+    audit_recorder: WriteBehindAuditRecorder | None = None
+    retention_job: RetentionJob | None = None
+    storage_engine: SQLiteStorageEngine | None = None
 
     def __post_init__(self) -> None:
         self.launcher = self.launcher or Launcher()
         self.file_manager = self.file_manager or FileManager()
         self.system_tools = self.system_tools or SystemTools()
-        self.handlers = {}
-        self.contracts = {}
-        self.dangerous_keywords = set()
-        self.session_layer = self.session_layer or SessionLayer(session_name="router-session")
+        self.session_layer = self.session_layer or SessionLayer(
+            session_name="router-session",
+            pooled_storage=True,
+            storage_engine=self.storage_engine,
+        )
         self.safe_mode_policy = self.safe_mode_policy or SafeModePolicy()
         self.intent_engine = self.intent_engine or LocalIntentEngine()
-        self.memory_engine = self.memory_engine or MemoryEngine()
+        self.memory_engine = self.memory_engine or MemoryEngine(
+            pooled_storage=True,
+            storage_engine=self.storage_engine,
+        )
         self.logger = self.logger or StructuredLogger()
-        self.recovery_manager = self.recovery_manager or RecoveryManager()
-        self.health_monitor = self.health_monitor or HealthMonitor()
-        self.diagnostic_reporter = self.diagnostic_reporter or DiagnosticReporter()
-        self.release_channel_manager = self.release_channel_manager or ReleaseChannelManager()
-        self.migration_manager = self.migration_manager or ConfigMigrationManager()
-        self.backup_manager = self.backup_manager or ProfileBackupManager()
+        self.audit_recorder = self.audit_recorder or WriteBehindAuditRecorder(
+            session_layer=self.session_layer,
+            memory_engine=self.memory_engine,
+            logger=self.logger,
+        )
+        self.session_layer.read_barrier = self.audit_recorder.flush
+        self.memory_engine.read_barrier = self.audit_recorder.flush
+        self.logger.read_barrier = self.audit_recorder.flush
+        self.logger.write_behind = self.audit_recorder.submit_log
+        retention_days = self._retention_days_from_env()
+        self.retention_job = self.retention_job or RetentionJob(
+            memory_engine=self.memory_engine,
+            session_layer=self.session_layer,
+            retention_days=retention_days,
+            session_retention_days=retention_days,
+            report_callback=self._log_retention_report,
+        )
         self.executor = self.executor or UnifiedCommandExecutor()
-        self.capability_layer = self.capability_layer or SystemCapabilityLayer()
-        self.capability_guardrail = self.capability_guardrail or CapabilityGuardrail(permission_tier="basic")
-        self.system_intent_mapper = self.system_intent_mapper or SystemIntentMapper()
         self.smart_assist = self.smart_assist or SmartAssistEngine()
-        self.system_actions = self.system_actions or SystemActions()
         self.execution_profile_policy = self.execution_profile_policy or ExecutionProfilePolicy(profile="power")
-        self.project_manager = self.project_manager or ProjectManager()
-        self.clipboard_manager = self.clipboard_manager or ClipboardManager()
-        self.focus_mode_manager = self.focus_mode_manager or FocusModeManager()
-        self.network_diagnostics = self.network_diagnostics or NetworkDiagnostics()
-        self.performance_profiler = self.performance_profiler or PerformanceProfiler()
-        self.release_hardening_plan = self.release_hardening_plan or ReleaseHardeningPlan()
-        self.embedding_provider = self.embedding_provider or OllamaEmbeddingProvider(
-            config=self._build_embedding_config_from_env()
-        )
-        self.generation_provider = self.generation_provider or OllamaGenerationProvider(
-            config=self._build_generation_config_from_env()
-        )
         env_chat_model = os.getenv("ORIONDESK_CHAT_MODEL_ENABLED")
         if env_chat_model is not None:
             self.chat_model_enabled = env_chat_model.strip() not in {"0", "false", "False"}
         elif os.getenv("PYTEST_CURRENT_TEST"):
             self.chat_model_enabled = False
-        self.intent_graph_planner = self.intent_graph_planner or IntentGraphPlanner()
-        self.reasoning_engine = self.reasoning_engine or ComplexReasoningEngine()
-        self.argument_extractor = self.argument_extractor or ArgumentExtractor()
-        self.multi_command_executor = self.multi_command_executor or MultiCommandExecutor()
-        self.retrieval_optimizer = self.retrieval_optimizer or RetrievalOptimizer()
-        self.release_gate_v22 = self.release_gate_v22 or ReleaseGateV22()
-        self.companion_policy = self.companion_policy or CompanionPolicy()
         self.session_id = self.session_id or uuid4().hex
         self._runtime_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="oriondesk-runtime")
         self._main_thread_guard = MainThreadResponsivenessGuard()
+        self._execution_context_base: ExecutionContextBase | None = None
         self._model_catalog_cache: list[dict] = []
         self._health_cache: dict[str, tuple[float, dict]] = {}
         self._health_cache_ttl_seconds = 20.0
+        self._vector_index_ready = threading.Event()
+        self._vector_index_lock = threading.Lock()
+        self._vector_index_build: Future | None = None
+        self._vector_index_retry_at = 0.0
+        self._vector_index_retry_seconds = 60.0
+        self._vector_index_batch_size = 64
+        self._vector_index_attempts = 3
+        self._vector_index_backoff_seconds = 0.5
+        self._closing = threading.Event()
         self._auto_action_timestamps: list[float] = []
         self._register_plugins()
-        self.security_guard = self.security_guard or SecurityGuard(command_whitelist=set(self.contracts.keys()))
+        self.security_guard = self.security_guard or SecurityGuard(command_whitelist=set(self.command_table.keywords))
+
+    def _retention_days_from_env(self) -> int | None:
+        value = os.getenv("ORIONDESK_RETENTION_DAYS", "").strip()
+        try:
+            days = int(value)
+        except ValueError:
+            return None
+        return days if days > 0 else None
 
     def _build_embedding_config_from_env(self) -> EmbeddingConfig:
         host = os.getenv("ORIONDESK_OLLAMA_HOST", "http://localhost:11434")
@@ -217,6 +360,7 @@ class CommandRouter:
     def route(self, command: str) -> str:
         return self.execute(command).message
 
+    @_intent_scoped
     def execute(self, command: str, dry_run: bool = False, allow_autocorrect: bool = True) -> CommandResult:
         if self._contains_multi_step(command):
             return self._execute_multi_step(command, dry_run=dry_run)
@@ -228,9 +372,8 @@ class CommandRouter:
             self._record_session(command, message, "success", context)
             return CommandResult(message)
 
-        normalized = self._resolve_intent(command)
-        normalized = self._normalize_shortcuts(normalized)
-        correction = self._resolve_autocorrect(normalized, allow_autocorrect)
+        parsed = self._normalize_shortcuts(self.parse(self._resolve_intent(command)))
+        correction = self._resolve_autocorrect(parsed, allow_autocorrect)
         if correction is not None:
             if correction.requires_confirmation:
                 self.pending_autocorrect = correction.corrected
@@ -238,32 +381,42 @@ class CommandRouter:
                 context = self._build_execution_context(command, dry_run=True)
                 self._record_session(command, message, "pending_confirmation", context)
                 return CommandResult(message, requires_confirmation=True, pending_command=correction.corrected)
-            normalized = correction.corrected
+            parsed = self.parse(correction.corrected)
 
-        profile_block = self._apply_profile_policy(normalized)
+        profile_block = self._apply_profile_policy(parsed)
         if profile_block is not None:
             return profile_block
 
-        context = self._build_execution_context(normalized, dry_run=dry_run)
-        envelope = self.executor.run(self, normalized, context)
-        self._record_session(normalized or command, envelope.message, envelope.status, envelope.context)
+        context = self._execution_context_for(parsed, dry_run=dry_run)
+        envelope = self.executor.run(self, parsed, context)
+        self._record_session(parsed.raw if parsed is not None else command, envelope.message, envelope.status, envelope.context)
         return self._to_command_result(envelope)
 
+    @_intent_scoped
     def execute_with_enhanced_response_trace(
         self,
         command: str,
         dry_run: bool = False,
         stage_callback: Callable[[str, float], None] | None = None,
+        token_callback: Callable[[str], None] | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> tuple[CommandResult, list[dict]]:
         parsed = self.parse(command)
-        if parsed is not None and parsed.keyword in self.contracts:
+        if parsed is not None and parsed.keyword in self.command_table.keywords:
             return self.execute(command, dry_run=dry_run), []
         clean = command.strip()
         if not clean:
             return self.execute(command, dry_run=dry_run), []
 
-        response = self.generate_reasoned_answer(clean, stage_callback=stage_callback)
+        response = self.generate_reasoned_answer(
+            clean,
+            stage_callback=stage_callback,
+            token_callback=token_callback,
+            cancel_event=cancel_event,
+        )
         stage_trace = list(response.get("stages", [])) if isinstance(response, dict) else []
+        if response.get("mode") == "cancelled":
+            return CommandResult(response.get("message") or "Generasi dibatalkan."), stage_trace
         result = self.execute(command, dry_run=dry_run)
         if result.requires_confirmation:
             return CommandResult(response.get("message", result.message), True, result.pending_command), stage_trace
@@ -325,11 +478,12 @@ class CommandRouter:
         self._record_session("<confirm>", envelope.message, envelope.status, envelope.context)
         return self._to_command_result(envelope)
 
+    @_intent_scoped
     def execute_enveloped(self, command: str, dry_run: bool = False):
-        normalized = self._resolve_intent(command)
-        context = self._build_execution_context(normalized, dry_run=dry_run)
-        envelope = self.executor.run(self, normalized, context)
-        self._record_session(normalized or command, envelope.message, envelope.status, envelope.context)
+        parsed = self.parse(self._resolve_intent(command))
+        context = self._execution_context_for(parsed, dry_run=dry_run)
+        envelope = self.executor.run(self, parsed, context)
+        self._record_session(parsed.raw if parsed is not None else command, envelope.message, envelope.status, envelope.context)
         return envelope
 
     def parse(self, command: str) -> ParsedCommand | None:
@@ -437,6 +591,25 @@ class CommandRouter:
             return self.network_diagnostics.public_ip()
         return "Aksi net tidak dikenali. Gunakan: ping, dns, ip."
 
+    def _handle_memory(self, command: ParsedCommand) -> str:
+        query = " ".join(command.args[1:]).strip()
+        notes = self.memory_engine.search_notes(query, limit=5)
+        history = [
+            hit
+            for hit in self.session_layer.search(query, limit=10)
+            if not hit.entry.command.lower().startswith("memory search")
+        ][:5]
+        if not notes and not history:
+            return f"Tidak ada hasil memory untuk: {query}"
+        lines = [f"Hasil memory untuk: {query}"]
+        if notes:
+            lines.append("Notes:")
+            lines.extend(f"- [{hit.note.tag}] {hit.snippet}" for hit in notes)
+        if history:
+            lines.append("Riwayat:")
+            lines.extend(f"- {hit.entry.timestamp} {hit.entry.command}: {hit.snippet}" for hit in history)
+        return "\n".join(lines)
+
     def _execute_dangerous(self, command: ParsedCommand) -> CommandResult:
         if self.safe_mode_policy.is_blocked(command.keyword):
             return CommandResult("Aksi ditolak oleh safe mode policy.")
@@ -455,80 +628,99 @@ class CommandRouter:
         return CommandResult("Aksi berbahaya tidak dikenali.")
 
     def _record_session(self, command: str, message: str, status: str, context: ExecutionContext | None = None) -> None:
-        self.session_layer.record(command=command, message=message, status=status)
-        self.memory_engine.record_command(command=command, status=status)
         level = "error" if status in {"invalid", "blocked", "failed"} else "info"
         metadata = {"command": command, "status": status}
         if context is not None:
-            metadata["execution_context"] = asdict(context)
-        self.logger.log(level=level, event="command", message=message, metadata=metadata)
+            metadata["execution_context"] = context
+        if status == "success" and self.__dict__.get("_lazy_suggestion_index") is not None:
+            self.suggestion_index.record(command, keywords=self.command_table.keywords)
+        if status == "success" and self.vector_index is not None:
+            self._index_in_background([(KIND_COMMAND, command)])
+        self.audit_recorder.submit(command=command, message=message, status=status, level=level, metadata=metadata)
 
     def _to_command_result(self, envelope) -> CommandResult:
         return CommandResult(envelope.message, envelope.requires_confirmation, envelope.pending_command)
 
     def _build_execution_context(self, command: str, dry_run: bool) -> ExecutionContext:
-        parsed = self.parse(command)
+        return self._execution_context_for(self.parse(command), dry_run=dry_run)
+
+    def _execution_context_for(self, parsed: ParsedCommand | None, dry_run: bool) -> ExecutionContext:
         keyword = parsed.keyword if parsed is not None else ""
         risk_level = self.execution_profile_policy.risk_level(keyword)
-        profile_policy = self.execution_profile_policy.profile
-        return ExecutionContext(
-            user=getpass.getuser(),
-            profile_policy=profile_policy,
-            session_id=self.session_id,
-            timestamp=build_execution_timestamp(),
-            risk_level=risk_level,
-            dry_run=dry_run,
-        )
+        return self._context_base().stamp(risk_level=risk_level, dry_run=dry_run)
 
-    def _apply_profile_policy(self, normalized: str) -> CommandResult | None:
-        parsed = self.parse(normalized)
+    def _context_base(self) -> ExecutionContextBase:
+        profile_policy = self.execution_profile_policy.profile
+        base = self._execution_context_base
+        if base is None:
+            base = ExecutionContextBase(user=getpass.getuser(), profile_policy=profile_policy, session_id=self.session_id)
+        elif base.profile_policy != profile_policy:
+            base = replace(base, profile_policy=profile_policy)
+        self._execution_context_base = base
+        return base
+
+    def _apply_profile_policy(self, parsed: ParsedCommand | None) -> CommandResult | None:
         if parsed is None:
             return None
 
         decision = self.execution_profile_policy.evaluate(parsed.keyword)
         if decision.mode == "blocked":
             message = f"Execution profile blocked: {decision.reason}"
-            self._record_session(normalized, message, "blocked", self._build_execution_context(normalized, dry_run=True))
+            self._record_session(parsed.raw, message, "blocked", self._execution_context_for(parsed, dry_run=True))
             return CommandResult(message)
 
         if decision.mode == "explain":
             message = f"Execution profile explain-only: {parsed.raw}"
-            self._record_session(normalized, message, "success", self._build_execution_context(normalized, dry_run=True))
+            self._record_session(parsed.raw, message, "success", self._execution_context_for(parsed, dry_run=True))
             return CommandResult(message)
 
-        if decision.requires_confirmation and not self.safe_mode and parsed.keyword in self.dangerous_keywords:
+        if decision.requires_confirmation and not self.safe_mode and parsed.keyword in self.command_table.dangerous:
             self.pending_confirmation = parsed
             message = "Execution profile membutuhkan konfirmasi manual."
-            self._record_session(normalized, message, "pending_confirmation", self._build_execution_context(normalized, dry_run=True))
+            self._record_session(parsed.raw, message, "pending_confirmation", self._execution_context_for(parsed, dry_run=True))
             return CommandResult(message, requires_confirmation=True, pending_command=parsed.raw)
 
         return None
 
-    def _resolve_autocorrect(self, normalized: str, allow_autocorrect: bool):
-        if not allow_autocorrect:
+    def _resolve_autocorrect(self, parsed: ParsedCommand | None, allow_autocorrect: bool):
+        if not allow_autocorrect or parsed is None:
             return None
-        correction = self.smart_assist.autocorrect(normalized, list(self.contracts.keys()))
+        if parsed.keyword in self.command_table.keywords:
+            correction = self._resolve_argument_autocorrect(parsed)
+        else:
+            correction = self.smart_assist.autocorrect(parsed.raw, self.command_table.ordered_keywords)
         if correction is None:
             return None
         if not correction.requires_confirmation:
             message = f"Smart Assist auto-applied -> {correction.corrected} (confidence={correction.confidence:.2f})"
-            self._record_session(normalized, message, "intent_resolved")
+            self._record_session(parsed.raw, message, "intent_resolved")
         return correction
 
+    def _resolve_argument_autocorrect(self, parsed: ParsedCommand):
+        if parsed.keyword == "open" and len(parsed.args) == 1:
+            aliases = getattr(self.launcher, "alias_map", None)
+            if aliases:
+                return self.smart_assist.correct_token(parsed.raw, 1, tuple(aliases), vocabulary="app_aliases")
+        if parsed.keyword == "proj" and len(parsed.args) == 2 and parsed.args[0].lower() == "open":
+            projects = getattr(self.project_manager, "projects", None)
+            if projects:
+                return self.smart_assist.correct_token(parsed.raw, 2, tuple(projects), vocabulary="projects")
+        return None
+
     def _expand_path(self, value: str) -> str:
         if value.startswith("~/"):
             return str(Path.home() / value[2:])
         return os.path.expandvars(value)
 
-    def _normalize_shortcuts(self, normalized: str) -> str:
-        parsed = self.parse(normalized)
+    def _normalize_shortcuts(self, parsed: ParsedCommand | None) -> ParsedCommand | None:
         if parsed is None:
-            return normalized
+            return None
         if parsed.keyword == "search" and parsed.args and parsed.args[0].lower() != "file":
             query = " ".join(parsed.args).strip()
-            return f"search file {query}"
-        return normalized
+            return ParsedCommand("search", ["file", *parsed.args], f"search file {query}")
+        return parsed
 
+    @_intent_scoped
     def evaluate_auto_action(self, raw_input: str, ui_context: dict | None = None) -> dict:
         clean = raw_input.strip()
         context = ui_context or {}
@@ -548,10 +740,9 @@ class CommandRouter:
             self.logger.log(level="info", event="companion_auto_action", message="Auto action skipped.", metadata=payload)
             return payload
 
-        allowed = set(self.contracts.keys())
-        resolution = self.intent_engine.resolve(clean, allowed_keywords=allowed)
-        normalized = self._normalize_shortcuts(resolution.resolved)
-        parsed = self.parse(normalized)
+        resolution = self.resolve_intent(clean)
+        parsed = self._normalize_shortcuts(self.parse(resolution.resolved))
+        normalized = parsed.raw if parsed is not None else resolution.resolved
         if parsed is None:
             decision = AutoActionDecision(
                 normalized_command=normalized,
@@ -584,7 +775,7 @@ class CommandRouter:
         )
         self._auto_action_timestamps = list(fatigue.auto_action_timestamps)
         final_score = min(1.0, max(0.0, base_score - fatigue.fatigue_penalty))
-        dangerous = parsed.keyword in self.dangerous_keywords
+        dangerous = parsed.keyword in self.command_table.dangerous
         allow_low_risk = risk_level == "low" and impact.is_read_only
         score_ok = final_score >= 0.70
         policy_allows = profile_decision.mode == "allow" and not profile_decision.requires_confirmation
@@ -652,15 +843,10 @@ class CommandRouter:
         }
 
     def list_command_keywords(self) -> list[str]:
-        return sorted(self.contracts.keys())
+        return list(self.command_table.ordered_keywords)
 
     def suggest_commands(self, raw_input: str, limit: int = 5) -> list[str]:
-        typed = raw_input.strip().lower()
-        usages = sorted(contract.usage for contract in self.contracts.values())
-        if not typed:
-            return usages[:limit]
-        matched = [usage for usage in usages if usage.startswith(typed) or usage.split(" ")[0].startswith(typed)]
-        return list(dict.fromkeys(matched))[:limit]
+        return self.suggestion_index.suggest(raw_input, limit=limit)
 
     def usage_hint(self, raw_input: str) -> str | None:
         command = raw_input.strip().split(" ")[0].lower() if raw_input.strip() else ""
@@ -674,22 +860,81 @@ class CommandRouter:
         text = raw_input.strip()
         if not text:
             return ""
-        resolution = self.intent_engine.resolve(text, allowed_keywords=set(self.contracts.keys()))
+        resolution = self.resolve_intent(text)
         if resolution.resolved == text:
             return ""
         return f"Did you mean: {resolution.resolved}"
 
+    @_intent_scoped
+    def command_assist(self, raw_input: str, limit: int = 5) -> CommandAssist:
+        return CommandAssist(
+            suggestions=tuple(self.suggest_commands(raw_input, limit=limit)),
+            usage_hint=self.usage_hint(raw_input),
+            argument_hint=self.argument_hint(raw_input),
+            intent_explanation=self.explain_intent(raw_input),
+        )
+
     def save_recovery_snapshot(self):
-        entries = [item.__dict__ for item in self.session_layer.entries]
+        self.audit_recorder.flush()
+        entries = (item._asdict() for item in self.session_layer.iter_entries())
         return self.recovery_manager.save_snapshot("router-session", entries)
 
+    def restore_recovery_snapshot(self) -> int:
+        snapshot = self.recovery_manager.load_latest_snapshot()
+        if snapshot is None:
+            return 0
+        return self.session_layer.import_entries(snapshot.get("entries", []), replace=True)
+
+    def start_background_maintenance(self) -> None:
+        self.retention_job.start()
+        self.warm_vector_index()
+
+    def run_retention(self) -> RetentionReport:
+        return self.retention_job.run_once()
+
+    def _log_retention_report(self, report: RetentionReport) -> None:
+        level = "warning" if report.error else "info"
+        metadata = {
+            "removed": report.removed_by_table,
+            "reclaimed_pages": report.reclaimed_pages,
+            "error": report.error,
+        }
+        self.logger.log(level=level, event="retention", message=f"removed={report.total_removed}", metadata=metadata)
+
+    def shutdown(self) -> None:
+        self._closing.set()
+        self.retention_job.stop()
+        self._runtime_pool.shutdown(wait=False, cancel_futures=True)
+        self.audit_recorder.close()
+        self.session_layer.close()
+        self.memory_engine.close()
+        if self.storage_engine is not None:
+            self.storage_engine.close()
+
     def create_diagnostic_report(self):
         checks = self.health_monitor.run(self)
         recent_logs = self.logger.tail(limit=30)
-        return self.diagnostic_reporter.generate(checks, recent_logs)
+        return self.diagnostic_reporter.generate(checks, recent_logs, metrics=self.runtime_metrics())
+
+    def runtime_metrics(self) -> dict:
+        metrics = {
+            "http_pool": shared_http_pool().stats(),
+            "embedding_cache": self.embedding_cache.stats(),
+            "audit_recorder": self.audit_recorder.stats(),
+        }
+        if self.vector_index is not None:
+            metrics["vector_index"] = {
+                "items": len(self.vector_index),
+                "backend": self.vector_index.backend,
+                "ready": self._vector_index_ready.is_set(),
+            }
+        return metrics
 
     def build_performance_baseline(self) -> dict:
-        startup = self.performance_profiler.measure_startup(lambda: CommandRouter())
+        startup = self.performance_profiler.measure_startup(
+            lambda: CommandRouter(storage_engine=self.storage_engine),
+            teardown=lambda router: router.shutdown(),
+        )
         command_latency = self.performance_profiler.measure_command_latency(self.route, "sys info", iterations=3)
         storage_io = self.performance_profiler.measure_storage_io(iterations=10)
         self.release_hardening_plan.mark_completed("profiling")
@@ -712,6 +957,8 @@ class CommandRouter:
         return payload
 
     def run_release_gate_v22(self) -> dict:
+        from core.release_gate_v22 import GateScenario
+
         scenarios = [
             GateScenario(name="sys_info", command="sys info"),
             GateScenario(name="open_app", command="open notepad"),
@@ -766,7 +1013,101 @@ class CommandRouter:
         return payload
 
     def embed_text(self, text: str) -> list[float]:
-        return self.embedding_provider.embed(text)
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: Sequence[str]) -> list[list[float]]:
+        return self.embedding_cache.embed_many(self.embedding_provider, texts)
+
+    def semantic_search(
+        self,
+        text: str,
+        limit: int = 4,
+        kinds: Sequence[str] | None = None,
+        min_score: float = 0.5,
+    ) -> list[VectorHit]:
+        clean = text.strip()
+        if not clean:
+            return []
+        if not self._vector_index_ready.is_set():
+            # The archive is embedded in the background; never make a request wait for it.
+            self.warm_vector_index()
+            return []
+        if not self.embedding_health().get("ok"):
+            return []
+        try:
+            query = self.embed_text(clean)
+        except (OSError, ValueError):
+            return []
+        return self.vector_index.search(query, limit=limit, kinds=kinds, min_score=min_score)
+
+    def warm_vector_index(self) -> Future | None:
+        with self._vector_index_lock:
+            if self._vector_index_ready.is_set():
+                return None
+            if self._vector_index_build is not None and not self._vector_index_build.done():
+                return self._vector_index_build
+            if time.monotonic() < self._vector_index_retry_at:
+                return None
+            try:
+                self._vector_index_build = self._runtime_pool.submit(self._build_vector_index)
+            except RuntimeError:
+                return None
+            return self._vector_index_build
+
+    def _build_vector_index(self) -> bool:
+        if not self.embedding_health().get("ok"):
+            self._vector_index_retry_at = time.monotonic() + self._vector_index_retry_seconds
+            return False
+        index = VectorIndex()
+        # Publish the index before the backfill so commands and notes recorded meanwhile are added too.
+        self.vector_index = index
+        self.memory_engine.note_listener = self._on_note_added
+        archive = [(KIND_USAGE, usage) for usage in self.command_table.usages]
+        archive.extend((KIND_COMMAND, command) for command, _count in self.memory_engine.top_commands(limit=2000))
+        archive.extend((KIND_NOTE, note.text) for note in self.memory_engine.iter_notes())
+        size = self._vector_index_batch_size
+        for start in range(0, len(archive), size):
+            if not self._index_with_retry(index, archive[start:start + size]):
+                # A partial index would silently hide history; drop it and rebuild later.
+                self.memory_engine.note_listener = None
+                self.vector_index = None
+                self._vector_index_retry_at = time.monotonic() + self._vector_index_retry_seconds
+                return False
+        self._vector_index_ready.set()
+        return True
+
+    def _index_with_retry(self, index: VectorIndex, items: Sequence[tuple[str, str]]) -> bool:
+        for attempt in range(self._vector_index_attempts):
+            if self._closing.is_set():
+                return False
+            if self._index_texts(index, items):
+                return True
+            if attempt + 1 < self._vector_index_attempts:
+                self._closing.wait(self._vector_index_backoff_seconds * (2**attempt))
+        return False
+
+    def _index_texts(self, index: VectorIndex, items: Sequence[tuple[str, str]]) -> bool:
+        pending = [(kind, text.strip()) for kind, text in items if text.strip() and (kind, text.strip()) not in index]
+        if not pending:
+            return True
+        try:
+            vectors = self.embed_texts([text for _kind, text in pending])
+        except (OSError, ValueError):
+            return False
+        index.add_many((kind, text, vector) for (kind, text), vector in zip(pending, vectors))
+        return True
+
+    def _index_in_background(self, items: Sequence[tuple[str, str]]) -> None:
+        index = self.vector_index
+        if index is None:
+            return
+        try:
+            self._runtime_pool.submit(self._index_texts, index, items)
+        except RuntimeError:
+            return
+
+    def _on_note_added(self, note) -> None:
+        self._index_in_background([(KIND_NOTE, note.text)])
 
     def generation_config(self) -> dict:
         config = self.generation_provider.config()
@@ -836,10 +1177,13 @@ class CommandRouter:
         self.chat_model_enabled = bool(enabled)
         return self.chat_model_enabled
 
+    @_intent_scoped
     def generate_reasoned_answer(
         self,
         raw_input: str,
         stage_callback: Callable[[str, float], None] | None = None,
+        token_callback: Callable[[str], None] | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> dict:
         stage_trace: list[dict] = []
 
@@ -888,9 +1232,32 @@ class CommandRouter:
 
         prompt = self._build_reasoning_prompt(optimized_query, plan)
         generation_started = time.perf_counter()
-        text = self.generation_provider.generate(prompt=prompt, system_prompt="You are OrionDesk local assistant.")
+        system_prompt = "You are OrionDesk local assistant."
+        if token_callback is None and cancel_event is None:
+            text = self.generation_provider.generate(prompt=prompt, system_prompt=system_prompt)
+        else:
+            chunks: list[str] = []
+            for chunk in self.generation_provider.generate_stream(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                cancel_event=cancel_event,
+            ):
+                chunks.append(chunk)
+                if token_callback is not None:
+                    token_callback(chunk)
+            text = "".join(chunks).strip()
         _emit_stage("generation", (time.perf_counter() - generation_started) * 1000)
         final_started = time.perf_counter()
+        if cancel_event is not None and cancel_event.is_set():
+            # A partial answer is shown as-is but never cached.
+            payload = {
+                "mode": "cancelled",
+                "message": text,
+                "health": {"ok": health.ok, "message": "generation cancelled"},
+                "stages": stage_trace,
+            }
+            _emit_stage("final_validation", (time.perf_counter() - final_started) * 1000)
+            return payload
         if text:
             payload = {
                 "mode": "gemma",
@@ -913,13 +1280,10 @@ class CommandRouter:
         return payload
 
     def intent_graph(self, raw_input: str) -> dict:
-        allowed = set(self.contracts.keys())
-        graph = self.intent_graph_planner.build(
-            raw_input=raw_input,
-            resolve_intent=lambda text: self.intent_engine.resolve(text, allowed_keywords=allowed),
-        )
+        graph = self.intent_graph_planner.build(raw_input=raw_input, resolve_intent=self.resolve_intent)
         return graph.to_dict()
 
+    @_intent_scoped
     def reason_plan(self, raw_input: str) -> dict:
         optimized_query = self.retrieval_optimizer.optimize_query(raw_input)
         cache_key = f"reason-plan:{optimized_query}"
@@ -932,6 +1296,7 @@ class CommandRouter:
             graph_payload=graph_payload,
             embed_text=self.embed_text,
             risk_level=self.execution_profile_policy.risk_level,
+            embed_many=self.embed_texts,
         )
         payload = {
             "graph": graph_payload,
@@ -940,10 +1305,12 @@ class CommandRouter:
         self.retrieval_optimizer.set_cache(cache_key, payload)
         return payload
 
+    @_intent_scoped
     def execute_with_latency_budget(self, command: str, dry_run: bool = False) -> dict:
         latency = LatencyBudget()
-        normalized = latency.timed("intent", lambda: self._normalize_shortcuts(self._resolve_intent(command)))
-        policy_block = latency.timed("policy", lambda: self._apply_profile_policy(normalized))
+        parsed = latency.timed("intent", lambda: self._normalize_shortcuts(self.parse(self._resolve_intent(command))))
+        normalized = parsed.raw if parsed is not None else ""
+        policy_block = latency.timed("policy", lambda: self._apply_profile_policy(parsed))
         if policy_block is not None:
             result = policy_block
         else:
@@ -959,6 +1326,7 @@ class CommandRouter:
     def execute_reasoning_async(self, raw_input: str) -> Future:
         return self._runtime_pool.submit(self.generate_reasoned_answer, raw_input)
 
+    @_intent_scoped
     def multi_command_bundle(self, raw_input: str) -> dict:
         graph_payload = self.intent_graph(raw_input)
         commands = [step["resolved_command"] for step in graph_payload.get("steps", [])]
@@ -977,17 +1345,18 @@ class CommandRouter:
             status = "guarded_pending" if envelope.requires_confirmation else envelope.status
             return status, envelope.message
 
-        reports = self.multi_command_executor.execute(bundles, _run)
+        run = self.multi_command_executor.run(bundles, _run)
         return {
             "dry_run": dry_run,
             "commands": bundles,
             "arguments": payload["arguments"],
-            "reports": reports,
+            "reports": run.reports,
+            "timing": run.timing(),
         }
 
     def _build_reasoning_prompt(self, raw_input: str, plan: dict) -> str:
         decisions = plan["reasoning"].get("decisions", [])
-        intent = self.intent_engine.resolve(raw_input, allowed_keywords=set(self.contracts.keys()))
+        intent = self.resolve_intent(raw_input)
         context_rows = self.retrieval_optimizer.rank_session_context(self.session_layer.recent(limit=12), raw_input, limit=4)
         context_lines = [f"- {item.command} -> {item.status}" for item in context_rows]
         quality_instruction = {
@@ -1008,6 +1377,11 @@ class CommandRouter:
         if context_lines:
             lines.append("Relevant session context:")
             lines.extend(context_lines)
+        seen = {item.command for item in context_rows}
+        related = [hit for hit in self.semantic_search(raw_input, limit=6) if hit.text not in seen][:4]
+        if related:
+            lines.append("Semantically related commands and notes:")
+            lines.extend(f"- [{hit.kind}] {hit.text} (similarity={hit.score:.2f})" for hit in related)
         lines.append(quality_instruction)
         lines.append("Compose one final answer in Indonesian.")
         return "\n".join(lines)
@@ -1023,8 +1397,11 @@ class CommandRouter:
 
     def _register_plugins(self) -> None:
         registry = PluginRegistry(package_name="plugins")
+        contracts: dict[str, CommandContract] = {}
+        handlers: dict[str, Callable[[ParsedCommand], str]] = {}
+        dangerous: set[str] = set()
         for item in registry.discover():
-            self.contracts[item.keyword] = CommandContract(
+            contracts[item.keyword] = CommandContract(
                 keyword=item.keyword,
                 usage=item.usage,
                 min_args=item.min_args,
@@ -1032,13 +1409,49 @@ class CommandRouter:
                 first_arg_equals=item.first_arg_equals,
             )
             if item.dangerous:
-                self.dangerous_keywords.add(item.keyword)
+                dangerous.add(item.keyword)
                 continue
-            self.handlers[item.keyword] = getattr(self, item.handler_name)
+            handlers[item.keyword] = getattr(self, item.handler_name)
+        self.command_table = CommandTable(
+            contracts=MappingProxyType(contracts),
+            handlers=MappingProxyType(handlers),
+            dangerous=frozenset(dangerous),
+            keywords=frozenset(contracts),
+            ordered_keywords=tuple(sorted(contracts)),
+            usages=tuple(sorted(contract.usage for contract in contracts.values())),
+        )
+        self.contracts = self.command_table.contracts
+        self.handlers = self.command_table.handlers
+        self.dangerous_keywords = self.command_table.dangerous
+        self.intent_engine.clear_cache()
+
+    @contextmanager
+    def intent_scope(self) -> Iterator[IntentScope]:
+        scope = _INTENT_SCOPE.get()
+        if scope is not None and scope.allowed_keywords is self.command_table.keywords:
+            yield scope
+            return
+        scope = IntentScope(self.command_table.keywords)
+        token = _INTENT_SCOPE.set(scope)
+        try:
+            yield scope
+        finally:
+            _INTENT_SCOPE.reset(token)
+
+    def resolve_intent(self, text: str) -> IntentResolution:
+        keywords = self.command_table.keywords
+        scope = _INTENT_SCOPE.get()
+        if scope is None or scope.allowed_keywords is not keywords:
+            return self.intent_engine.resolve(text, allowed_keywords=keywords)
+        resolution = scope.resolutions.get(text)
+        if resolution is None:
+            resolution = self.intent_engine.resolve(text, allowed_keywords=keywords)
+            scope.resolutions[text] = resolution
+            scope.engine_calls += 1
+        return resolution
 
     def _resolve_intent(self, raw_command: str) -> str:
-        allowed = set(self.contracts.keys())
-        resolution = self.intent_engine.resolve(raw_command, allowed_keywords=allowed)
+        resolution = self.resolve_intent(raw_command)
         if resolution.reason.startswith("semantic"):
             message = f"Intent resolved -> {resolution.resolved} (confidence={resolution.confidence:.2f})"
             self._record_session(raw_command, message, "intent_resolved")
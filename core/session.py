@@ -1,19 +1,38 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict, dataclass, field
-from datetime import datetime, UTC
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
-from core.storage import SessionLogRepository, SQLiteStorageEngine
+from core.storage import (
+    SessionLogRepository,
+    SessionLogRow,
+    SQLiteStorageEngine,
+    write_json_document,
+    write_json_lines,
+)
+
+SessionEntry = SessionLogRow
 
 
 @dataclass(frozen=True)
-class SessionEntry:
-    timestamp: str
-    command: str
-    message: str
-    status: str
+class SessionStats:
+    total: int
+    counts_by_status: dict[str, int]
+    first_timestamp: str | None
+    recent: list[SessionEntry]
+
+    def count(self, *statuses: str) -> int:
+        return sum(self.counts_by_status.get(status, 0) for status in statuses)
+
+
+@dataclass(frozen=True)
+class SessionSearchHit:
+    entry: SessionEntry
+    snippet: str
+    score: float
 
 
 @dataclass
@@ -21,51 +40,133 @@ class SessionLayer:
     session_name: str = "default"
     storage_dir: Path = field(default_factory=lambda: Path(".oriondesk") / "session")
     db_path: Path | None = None
+    pooled_storage: bool = False
+    read_barrier: Callable[[], object] | None = None
+    storage_engine: SQLiteStorageEngine | None = None
 
     def __post_init__(self) -> None:
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
-        database_path = self.db_path or (self.storage_dir / "session.db")
-        self.storage_engine = SQLiteStorageEngine(db_path=database_path)
+        if self.storage_engine is None:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            database_path = self.db_path or (self.storage_dir / "session.db")
+            self.storage_engine = SQLiteStorageEngine(db_path=database_path, pooled=self.pooled_storage)
         self.session_repo = SessionLogRepository(self.storage_engine)
 
-    def record(self, command: str, message: str, status: str) -> SessionEntry:
-        entry = SessionEntry(
+    def build_entry(self, command: str, message: str, status: str) -> SessionEntry:
+        return SessionEntry(
             timestamp=self._timestamp(),
             command=command,
             message=message,
             status=status,
         )
-        self.session_repo.add(
-            session_name=self.session_name,
-            timestamp=entry.timestamp,
-            command=entry.command,
-            message=entry.message,
-            status=entry.status,
-        )
+
+    def record(self, command: str, message: str, status: str) -> SessionEntry:
+        entry = self.build_entry(command=command, message=message, status=status)
+        self.record_many([entry])
         return entry
 
+    def record_many(self, entries: list[SessionEntry]) -> int:
+        return self.session_repo.add_many(
+            self.session_name,
+            ((item.timestamp, item.command, item.message, item.status) for item in entries),
+        )
+
+    def import_entries(self, items: Iterable[dict], replace: bool = False) -> int:
+        self._sync()
+        rows = (
+            (
+                str(item.get("timestamp", self._timestamp())),
+                str(item.get("command", "")),
+                str(item.get("message", "")),
+                str(item.get("status", "")),
+            )
+            for item in items
+        )
+        with self.storage_engine.transaction():
+            if replace:
+                self.session_repo.clear(self.session_name)
+            return self.session_repo.add_many(self.session_name, rows)
+
+    def import_json(self, input_path: Path, replace: bool = False) -> int:
+        payload = json.loads(input_path.read_text(encoding="utf-8"))
+        return self.import_entries(payload.get("entries", []), replace=replace)
+
     def recent(self, limit: int = 20) -> list[SessionEntry]:
-        rows = self.session_repo.recent(session_name=self.session_name, limit=limit)
-        return [SessionEntry(**item) for item in rows]
+        # Hot-path lookup: records still queued by a write-behind recorder are not flushed for it.
+        return self.session_repo.recent(session_name=self.session_name, limit=limit)
 
     @property
     def entries(self) -> list[SessionEntry]:
-        rows = self.session_repo.recent(session_name=self.session_name, limit=None)
-        return [SessionEntry(**item) for item in rows]
+        self._sync()
+        return self.session_repo.recent(session_name=self.session_name, limit=None)
+
+    def stats(self, recent_limit: int = 5) -> SessionStats:
+        self._sync()
+        counts = self.session_repo.status_counts(self.session_name)
+        return SessionStats(
+            total=sum(counts.values()),
+            counts_by_status=counts,
+            first_timestamp=self.session_repo.first_timestamp(self.session_name),
+            recent=self.session_repo.recent(session_name=self.session_name, limit=recent_limit),
+        )
+
+    def search(self, query: str, limit: int = 10) -> list[SessionSearchHit]:
+        self._sync()
+        rows = self.session_repo.search(self.session_name, query, limit=limit)
+        return [
+            SessionSearchHit(
+                entry=SessionEntry(item.timestamp, item.command, item.message, item.status),
+                snippet=item.snippet,
+                score=item.score,
+            )
+            for item in rows
+        ]
 
     def clear(self) -> None:
+        self._sync()
         self.session_repo.clear(self.session_name)
 
-    def export_json(self, output_path: Path) -> Path:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        entries = self.entries
-        payload = {
-            "session_name": self.session_name,
-            "count": len(entries),
-            "entries": [asdict(item) for item in entries],
-        }
-        output_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    def purge_older_than(
+        self,
+        days: int = 30,
+        chunk_size: int = 500,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        self._sync()
+        threshold = datetime.now(UTC) - timedelta(days=days)
+        return self.session_repo.purge_older_than(
+            self.session_name,
+            threshold.isoformat(timespec="seconds"),
+            chunk_size,
+            on_chunk,
+        )
+
+    def close(self) -> None:
+        self.storage_engine.close()
+
+    def iter_entries(self, page_size: int = 1000) -> Iterator[SessionEntry]:
+        self._sync()
+        yield from self.session_repo.iter_session(self.session_name, page_size=page_size)
+
+    def export_json(self, output_path: Path, page_size: int = 1000) -> Path:
+        self._sync()
+        rows = (item._asdict() for item in self.session_repo.iter_session(self.session_name, page_size=page_size))
+        write_json_document(
+            output_path,
+            {"session_name": self.session_name},
+            {"entries": rows},
+            trailer=lambda counts: {"count": counts["entries"]},
+        )
         return output_path
 
+    def export_jsonl(self, output_path: Path, page_size: int = 1000) -> Path:
+        self._sync()
+        rows = self.session_repo.iter_session(self.session_name, page_size=page_size)
+        write_json_lines(output_path, (item._asdict() for item in rows))
+        return output_path
+
+    def _sync(self) -> None:
+        if self.read_barrier is not None:
+            self.read_barrier()
+
     def _timestamp(self) -> str:
         return datetime.now(UTC).isoformat(timespec="seconds")
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Callable, Iterable, NamedTuple, Sequence
+
+MIN_MATCH_SCORE = 0.50
+AUTO_APPLY_SCORE = 0.92
 
 
 @dataclass(frozen=True)
@@ -20,23 +24,34 @@ class SmartAssistEngine:
             "smart": ["cek koneksi lambat gak sih", "bersihin folder download"],
             "open": ["vscode", "notepad", "chrome"],
         }
+        self._indexes: dict[str, _TermIndex] = {}
+
+    def autocorrect(self, raw: str, keywords: Sequence[str]) -> AutoCorrection | None:
+        return self.correct_token(raw, 0, keywords, vocabulary="keywords")
 
-    def autocorrect(self, raw: str, keywords: list[str]) -> AutoCorrection | None:
+    def correct_token(
+        self,
+        raw: str,
+        position: int,
+        terms: Sequence[str],
+        vocabulary: str,
+    ) -> AutoCorrection | None:
         clean = raw.strip()
         if not clean:
             return None
 
         tokens = clean.split()
-        keyword = tokens[0].lower()
-        if keyword in keywords:
+        if position >= len(tokens):
             return None
-
-        candidate, score = self._best_keyword_match(keyword, keywords)
-        if candidate is None or score < 0.50:
+        value = tokens[position].lower()
+        candidate, score = self._best_match(vocabulary, value, terms)
+        if candidate == value:
+            return None
+        if candidate is None or score < MIN_MATCH_SCORE:
             return None
 
-        corrected = " ".join([candidate, *tokens[1:]])
-        needs_confirmation = score < 0.92
+        corrected = " ".join([*tokens[:position], candidate, *tokens[position + 1:]])
+        needs_confirmation = score < AUTO_APPLY_SCORE
         return AutoCorrection(clean, corrected, score, needs_confirmation)
 
     def argument_hints(self, raw: str) -> list[str]:
@@ -56,33 +71,175 @@ class SmartAssistEngine:
         joined = " | ".join(hints)
         return f"Explain: command '{keyword}' akan dieksekusi. Contoh argumen: {joined}"
 
-    def _best_keyword_match(self, keyword: str, keywords: list[str]) -> tuple[str | None, float]:
-        best_keyword = None
-        best_score = 0.0
-        for item in keywords:
-            distance = self._levenshtein(keyword, item)
-            scale = max(len(keyword), len(item), 1)
-            score = 1.0 - (distance / scale)
-            if score > best_score:
-                best_keyword = item
-                best_score = score
-        return best_keyword, best_score
-
-    def _levenshtein(self, left: str, right: str) -> int:
-        if left == right:
-            return 0
-        if not left:
-            return len(right)
-        if not right:
-            return len(left)
-
-        previous = list(range(len(right) + 1))
-        for i, left_char in enumerate(left, start=1):
-            current = [i]
-            for j, right_char in enumerate(right, start=1):
-                insert_cost = current[j - 1] + 1
-                delete_cost = previous[j] + 1
-                replace_cost = previous[j - 1] + (left_char != right_char)
-                current.append(min(insert_cost, delete_cost, replace_cost))
-            previous = current
-        return previous[-1]
+    def _best_match(self, vocabulary: str, value: str, terms: Sequence[str]) -> tuple[str | None, float]:
+        index = self._index_for(vocabulary, terms)
+        if not index.terms:
+            return None, 0.0
+        length = len(value)
+
+        def ceiling(distance: int) -> float:
+            # Best score any term at this distance could reach, given the longest indexed term.
+            return 1.0 - distance / max(length, min(index.longest, length + distance), 1)
+
+        def radius_for(score: float) -> int:
+            radius = 0
+            while radius < length and ceiling(radius + 1) >= score:
+                radius += 1
+            return radius
+
+        best: list = [None, (MIN_MATCH_SCORE, -len(index.terms))]
+
+        def on_match(term: str, distance: int) -> int:
+            key = (1.0 - distance / max(length, len(term), 1), -index.order[term])
+            if key >= best[1]:
+                best[0], best[1] = term, key
+            return radius_for(best[1][0])
+
+        # Typos are usually within the deletion index range; the BK-tree only covers wider searches.
+        radius = radius_for(MIN_MATCH_SCORE)
+        for term, distance in index.deletions.search(value, radius):
+            on_match(term, distance)
+        if best[0] is not None:
+            radius = min(radius, radius_for(best[1][0]))
+        if radius > index.deletions.max_distance:
+            index.tree.search(value, radius, on_match=on_match)
+        return best[0], best[1][0] if best[0] is not None else 0.0
+
+    def _index_for(self, vocabulary: str, terms: Sequence[str]) -> _TermIndex:
+        ordered = tuple(terms)
+        index = self._indexes.get(vocabulary)
+        if index is None or (index.terms is not ordered and index.terms != ordered):
+            order = {}
+            for position, term in enumerate(ordered):
+                order.setdefault(term, position)
+            longest = max((len(term) for term in ordered), default=0)
+            index = _TermIndex(ordered, order, BKTree(order), DeletionIndex(order), longest)
+            self._indexes[vocabulary] = index
+        return index
+
+
+class _TermIndex(NamedTuple):
+    terms: tuple[str, ...]
+    order: dict[str, int]
+    tree: BKTree
+    deletions: DeletionIndex
+    longest: int
+
+
+class BKTree:
+    def __init__(self, terms: Iterable[str] = ()) -> None:
+        self._root: tuple[str, dict[int, tuple]] | None = None
+        self._size = 0
+        for term in terms:
+            self.add(term)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, term: str) -> None:
+        if self._root is None:
+            self._root = (term, {})
+            self._size = 1
+            return
+        node_term, children = self._root
+        while True:
+            distance = bounded_levenshtein(term, node_term, max(len(term), len(node_term)))
+            if distance == 0:
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (term, {})
+                self._size += 1
+                return
+            node_term, children = child
+
+    def search(
+        self,
+        term: str,
+        max_distance: int,
+        on_match: Callable[[str, int], int] | None = None,
+    ) -> list[tuple[str, int]]:
+        if self._root is None or max_distance < 0:
+            return []
+        matches: list[tuple[str, int]] = []
+        stack = [self._root]
+        while stack:
+            node_term, children = stack.pop()
+            limit = max_distance + max(children, default=0)
+            distance = bounded_levenshtein(term, node_term, limit)
+            if distance <= max_distance:
+                matches.append((node_term, distance))
+                if on_match is not None:
+                    # The callback may tighten the radius once a good enough match is known.
+                    max_distance = min(max_distance, on_match(node_term, distance))
+            low, high = distance - max_distance, distance + max_distance
+            # Children closest to this node's distance are pushed last so they are visited first.
+            nearby = sorted(
+                (edge for edge in children if low <= edge <= high),
+                key=lambda edge: abs(edge - distance),
+                reverse=True,
+            )
+            stack.extend(children[edge] for edge in nearby)
+        return matches
+
+
+class DeletionIndex:
+    def __init__(self, terms: Iterable[str] = (), max_distance: int = 2) -> None:
+        self.max_distance = max(0, max_distance)
+        self._variants: dict[str, list[str]] = {}
+        for term in terms:
+            for variant in _deletion_variants(term, self.max_distance):
+                self._variants.setdefault(variant, []).append(term)
+
+    def search(self, term: str, max_distance: int) -> list[tuple[str, int]]:
+        limit = min(max_distance, self.max_distance)
+        if limit < 0:
+            return []
+        seen: set[str] = set()
+        matches: list[tuple[str, int]] = []
+        for variant in _deletion_variants(term, limit):
+            for candidate in self._variants.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = bounded_levenshtein(term, candidate, limit)
+                if distance <= limit:
+                    matches.append((candidate, distance))
+        return matches
+
+
+def _deletion_variants(term: str, depth: int) -> set[str]:
+    variants = {term}
+    frontier = {term}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+def bounded_levenshtein(left: str, right: str, limit: int) -> int:
+    # Returns limit + 1 as soon as the distance is known to exceed limit.
+    if left == right:
+        return 0
+    if abs(len(left) - len(right)) > limit:
+        return limit + 1
+    if not left or not right:
+        return max(len(left), len(right))
+
+    previous = list(range(len(right) + 1))
+    for i, left_char in enumerate(left, start=1):
+        current = [i]
+        row_min = i
+        for j, right_char in enumerate(right, start=1):
+            value = min(
+                current[j - 1] + 1,
+                previous[j] + 1,
+                previous[j - 1] + (left_char != right_char),
+            )
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1] if previous[-1] <= limit else limit + 1
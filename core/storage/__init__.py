@@ -1,15 +1,27 @@
 from .repositories import (
     CommandHistoryRepository,
+    EmbeddingCacheRepository,
     NoteRepository,
     PreferenceRepository,
     SessionLogRepository,
 )
+from .rows import CommandRow, NoteRow, NoteSearchRow, SessionLogRow, SessionLogSearchRow, tuple_row_factory
 from .sqlite_engine import SQLiteStorageEngine
+from .streaming import write_json_document, write_json_lines
 
 __all__ = [
     "SQLiteStorageEngine",
     "PreferenceRepository",
     "NoteRepository",
     "CommandHistoryRepository",
+    "EmbeddingCacheRepository",
     "SessionLogRepository",
+    "NoteRow",
+    "CommandRow",
+    "SessionLogRow",
+    "NoteSearchRow",
+    "SessionLogSearchRow",
+    "tuple_row_factory",
+    "write_json_document",
+    "write_json_lines",
 ]
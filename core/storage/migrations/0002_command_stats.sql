@@ -0,0 +1,42 @@
+CREATE TABLE IF NOT EXISTS command_stats (
+  command TEXT PRIMARY KEY,
+  frequency INTEGER NOT NULL,
+  last_used_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS command_stats_hourly (
+  bucket TEXT NOT NULL,
+  command TEXT NOT NULL,
+  frequency INTEGER NOT NULL,
+  PRIMARY KEY (bucket, command)
+);
+
+CREATE INDEX IF NOT EXISTS idx_command_stats_frequency ON command_stats(frequency DESC, command ASC);
+
+INSERT OR REPLACE INTO command_stats(command, frequency, last_used_at)
+SELECT command, COUNT(*), MAX(created_at) FROM commands GROUP BY command;
+
+INSERT OR REPLACE INTO command_stats_hourly(bucket, command, frequency)
+SELECT substr(created_at, 1, 13), command, COUNT(*) FROM commands GROUP BY substr(created_at, 1, 13), command;
+
+CREATE TRIGGER IF NOT EXISTS trg_commands_stats_insert AFTER INSERT ON commands
+BEGIN
+  INSERT INTO command_stats(command, frequency, last_used_at)
+  VALUES (NEW.command, 1, NEW.created_at)
+  ON CONFLICT(command) DO UPDATE SET
+    frequency = frequency + 1,
+    last_used_at = MAX(last_used_at, excluded.last_used_at);
+  INSERT INTO command_stats_hourly(bucket, command, frequency)
+  VALUES (substr(NEW.created_at, 1, 13), NEW.command, 1)
+  ON CONFLICT(bucket, command) DO UPDATE SET frequency = frequency + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_commands_stats_delete AFTER DELETE ON commands
+BEGIN
+  UPDATE command_stats SET frequency = frequency - 1 WHERE command = OLD.command;
+  DELETE FROM command_stats WHERE command = OLD.command AND frequency <= 0;
+  UPDATE command_stats_hourly SET frequency = frequency - 1
+  WHERE bucket = substr(OLD.created_at, 1, 13) AND command = OLD.command;
+  DELETE FROM command_stats_hourly
+  WHERE bucket = substr(OLD.created_at, 1, 13) AND command = OLD.command AND frequency <= 0;
+END;
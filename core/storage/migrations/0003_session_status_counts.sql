@@ -0,0 +1,24 @@
+CREATE TABLE IF NOT EXISTS session_status_counts (
+  session_name TEXT NOT NULL,
+  status TEXT NOT NULL,
+  frequency INTEGER NOT NULL,
+  PRIMARY KEY (session_name, status)
+);
+
+INSERT OR REPLACE INTO session_status_counts(session_name, status, frequency)
+SELECT session_name, status, COUNT(*) FROM session_logs GROUP BY session_name, status;
+
+CREATE TRIGGER IF NOT EXISTS trg_session_logs_stats_insert AFTER INSERT ON session_logs
+BEGIN
+  INSERT INTO session_status_counts(session_name, status, frequency)
+  VALUES (NEW.session_name, NEW.status, 1)
+  ON CONFLICT(session_name, status) DO UPDATE SET frequency = frequency + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_session_logs_stats_delete AFTER DELETE ON session_logs
+BEGIN
+  UPDATE session_status_counts SET frequency = frequency - 1
+  WHERE session_name = OLD.session_name AND status = OLD.status;
+  DELETE FROM session_status_counts
+  WHERE session_name = OLD.session_name AND status = OLD.status AND frequency <= 0;
+END;
@@ -0,0 +1,52 @@
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+  tag,
+  text,
+  content='notes',
+  content_rowid='id',
+  tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS session_logs_fts USING fts5(
+  command,
+  message,
+  content='session_logs',
+  content_rowid='id',
+  tokenize='unicode61 remove_diacritics 2'
+);
+
+INSERT INTO notes_fts(notes_fts) VALUES ('rebuild');
+INSERT INTO session_logs_fts(session_logs_fts) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS trg_notes_fts_insert AFTER INSERT ON notes
+BEGIN
+  INSERT INTO notes_fts(rowid, tag, text) VALUES (NEW.id, NEW.tag, NEW.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notes_fts_delete AFTER DELETE ON notes
+BEGIN
+  INSERT INTO notes_fts(notes_fts, rowid, tag, text) VALUES ('delete', OLD.id, OLD.tag, OLD.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notes_fts_update AFTER UPDATE ON notes
+BEGIN
+  INSERT INTO notes_fts(notes_fts, rowid, tag, text) VALUES ('delete', OLD.id, OLD.tag, OLD.text);
+  INSERT INTO notes_fts(rowid, tag, text) VALUES (NEW.id, NEW.tag, NEW.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_session_logs_fts_insert AFTER INSERT ON session_logs
+BEGIN
+  INSERT INTO session_logs_fts(rowid, command, message) VALUES (NEW.id, NEW.command, NEW.message);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_session_logs_fts_delete AFTER DELETE ON session_logs
+BEGIN
+  INSERT INTO session_logs_fts(session_logs_fts, rowid, command, message)
+  VALUES ('delete', OLD.id, OLD.command, OLD.message);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_session_logs_fts_update AFTER UPDATE ON session_logs
+BEGIN
+  INSERT INTO session_logs_fts(session_logs_fts, rowid, command, message)
+  VALUES ('delete', OLD.id, OLD.command, OLD.message);
+  INSERT INTO session_logs_fts(rowid, command, message) VALUES (NEW.id, NEW.command, NEW.message);
+END;
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  model TEXT NOT NULL,
+  text_hash BLOB NOT NULL,
+  dimensions INTEGER NOT NULL,
+  vector BLOB NOT NULL,
+  created_at TEXT NOT NULL,
+  PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
@@ -1,10 +1,36 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Iterable, Iterator
 
+from core.storage.rows import (
+    CommandRow,
+    NoteRow,
+    NoteSearchRow,
+    SessionLogRow,
+    SessionLogSearchRow,
+    tuple_row_factory,
+)
 from core.storage.sqlite_engine import SQLiteStorageEngine
 
+_SEARCH_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_NOTE_ROWS = tuple_row_factory(NoteRow)
+_COMMAND_ROWS = tuple_row_factory(CommandRow)
+_SESSION_LOG_ROWS = tuple_row_factory(SessionLogRow)
+_NOTE_SEARCH_ROWS = tuple_row_factory(NoteSearchRow)
+_SESSION_LOG_SEARCH_ROWS = tuple_row_factory(SessionLogSearchRow)
+
+
+def _match_expression(query: str) -> str | None:
+    tokens = _SEARCH_TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens[:-1]]
+    terms.append(f'"{tokens[-1]}"*')
+    return " ".join(terms)
+
 
 @dataclass
 class PreferenceRepository:
@@ -22,6 +48,19 @@ class PreferenceRepository:
             (key, value, self._now_iso()),
         )
 
+    def set_many(self, items: Iterable[tuple[str, str]]) -> int:
+        now = self._now_iso()
+        return self.engine.execute_many(
+            """
+            INSERT INTO preferences(key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value,
+                updated_at = excluded.updated_at
+            """,
+            ((key, value, now) for key, value in items),
+        )
+
     def get(self, key: str, default: str | None = None) -> str | None:
         row = self.engine.fetch_one("SELECT value FROM preferences WHERE key = ?", (key,))
         if row is None:
@@ -30,7 +69,7 @@ class PreferenceRepository:
 
     def all(self) -> dict[str, str]:
         rows = self.engine.fetch_all("SELECT key, value FROM preferences")
-        return {str(key): str(value) for key, value in rows}
+        return dict(rows)
 
     def clear(self) -> None:
         self.engine.execute("DELETE FROM preferences")
@@ -49,7 +88,13 @@ class NoteRepository:
             (tag, text, created_at),
         )
 
-    def recent(self, limit: int = 10) -> list[dict[str, str]]:
+    def add_many(self, rows: Iterable[tuple[str, str, str]]) -> int:
+        return self.engine.execute_many(
+            "INSERT INTO notes(tag, text, created_at) VALUES (?, ?, ?)",
+            rows,
+        )
+
+    def recent(self, limit: int = 10) -> list[NoteRow]:
         if limit <= 0:
             return []
         rows = self.engine.fetch_all(
@@ -60,27 +105,46 @@ class NoteRepository:
             LIMIT ?
             """,
             (limit,),
+            row_factory=_NOTE_ROWS,
         )
-        ordered = reversed(rows)
-        return [
-            {"tag": str(tag), "text": str(text), "created_at": str(created_at)}
-            for tag, text, created_at in ordered
-        ]
+        rows.reverse()
+        return rows
 
-    def all(self) -> list[dict[str, str]]:
-        rows = self.engine.fetch_all(
-            "SELECT tag, text, created_at FROM notes ORDER BY id ASC"
+    def all(self) -> list[NoteRow]:
+        return self.engine.fetch_all(
+            "SELECT tag, text, created_at FROM notes ORDER BY id ASC",
+            row_factory=_NOTE_ROWS,
         )
-        return [
-            {"tag": str(tag), "text": str(text), "created_at": str(created_at)}
-            for tag, text, created_at in rows
-        ]
 
-    def purge_older_than(self, threshold_iso: str) -> int:
-        before = self.engine.table_count("notes")
-        self.engine.execute("DELETE FROM notes WHERE created_at < ?", (threshold_iso,))
-        after = self.engine.table_count("notes")
-        return before - after
+    def iter_all(self, page_size: int = 1000) -> Iterator[NoteRow]:
+        return self.engine.iter_keyset("notes", NoteRow._fields, page_size=page_size, row_type=NoteRow)
+
+    def search(self, query: str, limit: int = 10) -> list[NoteSearchRow]:
+        expression = _match_expression(query)
+        if expression is None or limit <= 0:
+            return []
+        return self.engine.fetch_all(
+            """
+            SELECT n.tag, n.text, n.created_at,
+                   snippet(notes_fts, -1, '[', ']', '...', 12),
+                   bm25(notes_fts)
+            FROM notes_fts
+            JOIN notes AS n ON n.id = notes_fts.rowid
+            WHERE notes_fts MATCH ?
+            ORDER BY bm25(notes_fts) ASC, n.id DESC
+            LIMIT ?
+            """,
+            (expression, limit),
+            row_factory=_NOTE_SEARCH_ROWS,
+        )
+
+    def purge_older_than(
+        self,
+        threshold_iso: str,
+        chunk_size: int = 500,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        return self.engine.delete_in_chunks("notes", "created_at < ?", (threshold_iso,), chunk_size, on_chunk)
 
     def clear(self) -> None:
         self.engine.execute("DELETE FROM notes")
@@ -96,35 +160,85 @@ class CommandHistoryRepository:
             (command, status, created_at),
         )
 
-    def all(self) -> list[dict[str, str]]:
-        rows = self.engine.fetch_all(
-            "SELECT command, status, created_at FROM commands ORDER BY id ASC"
+    def add_many(self, rows: Iterable[tuple[str, str, str]]) -> int:
+        return self.engine.execute_many(
+            "INSERT INTO commands(command, status, created_at) VALUES (?, ?, ?)",
+            rows,
         )
-        return [
-            {"command": str(command), "status": str(status), "created_at": str(created_at)}
-            for command, status, created_at in rows
-        ]
+
+    def all(self) -> list[CommandRow]:
+        return self.engine.fetch_all(
+            "SELECT command, status, created_at FROM commands ORDER BY id ASC",
+            row_factory=_COMMAND_ROWS,
+        )
+
+    def iter_all(self, page_size: int = 1000) -> Iterator[CommandRow]:
+        return self.engine.iter_keyset("commands", CommandRow._fields, page_size=page_size, row_type=CommandRow)
 
     def top_commands(self, limit: int = 5) -> list[tuple[str, int]]:
         if limit <= 0:
             return []
         rows = self.engine.fetch_all(
+            """
+            SELECT command, frequency
+            FROM command_stats
+            ORDER BY frequency DESC, command ASC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return rows
+
+    def top_commands_with_status(self, status: str, limit: int = 5) -> list[tuple[str, int]]:
+        if limit <= 0:
+            return []
+        # command_stats counts every attempt; filtering by status has to go back to the raw rows.
+        return self.engine.fetch_all(
             """
             SELECT command, COUNT(*) as frequency
             FROM commands
+            WHERE status = ?
             GROUP BY command
             ORDER BY frequency DESC, command ASC
             LIMIT ?
             """,
-            (limit,),
+            (status, limit),
         )
-        return [(str(command), int(freq)) for command, freq in rows]
 
-    def purge_older_than(self, threshold_iso: str) -> int:
-        before = self.engine.table_count("commands")
-        self.engine.execute("DELETE FROM commands WHERE created_at < ?", (threshold_iso,))
-        after = self.engine.table_count("commands")
-        return before - after
+    def top_commands_since(self, threshold_iso: str, limit: int = 5) -> list[tuple[str, int]]:
+        if limit <= 0:
+            return []
+        # Whole hours after the threshold come from the hourly buckets; the partially covered
+        # threshold hour is counted exactly from the raw rows (an index range of at most one hour).
+        bucket = threshold_iso[:13]
+        bucket_end = (
+            datetime.fromisoformat(threshold_iso).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        ).isoformat(timespec="seconds")
+        rows = self.engine.fetch_all(
+            """
+            SELECT command, SUM(frequency) as frequency
+            FROM (
+                SELECT command, frequency FROM command_stats_hourly WHERE bucket > ?
+                UNION ALL
+                SELECT command, COUNT(*) FROM commands
+                WHERE created_at >= ? AND created_at < ?
+                GROUP BY command
+            )
+            GROUP BY command
+            ORDER BY frequency DESC, command ASC
+            LIMIT ?
+            """,
+            (bucket, threshold_iso, bucket_end, limit),
+        )
+        return rows
+
+    def purge_older_than(
+        self,
+        threshold_iso: str,
+        chunk_size: int = 500,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        return self.engine.delete_in_chunks("commands", "created_at < ?", (threshold_iso,), chunk_size, on_chunk)
 
     def clear(self) -> None:
         self.engine.execute("DELETE FROM commands")
@@ -143,11 +257,20 @@ class SessionLogRepository:
             (session_name, timestamp, command, message, status),
         )
 
-    def recent(self, session_name: str, limit: int | None = 20) -> list[dict[str, str]]:
+    def add_many(self, session_name: str, rows: Iterable[tuple[str, str, str, str]]) -> int:
+        return self.engine.execute_many(
+            """
+            INSERT INTO session_logs(session_name, timestamp, command, message, status)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            ((session_name, timestamp, command, message, status) for timestamp, command, message, status in rows),
+        )
+
+    def recent(self, session_name: str, limit: int | None = 20) -> list[SessionLogRow]:
         if limit is not None and limit <= 0:
             return []
         if limit is None:
-            rows = self.engine.fetch_all(
+            return self.engine.fetch_all(
                 """
                 SELECT timestamp, command, message, status
                 FROM session_logs
@@ -155,29 +278,126 @@ class SessionLogRepository:
                 ORDER BY id ASC
                 """,
                 (session_name,),
+                row_factory=_SESSION_LOG_ROWS,
             )
-        else:
-            rows = self.engine.fetch_all(
-                """
-                SELECT timestamp, command, message, status
-                FROM session_logs
-                WHERE session_name = ?
-                ORDER BY id DESC
-                LIMIT ?
-                """,
-                (session_name, limit),
-            )
-            rows = list(reversed(rows))
-
-        return [
-            {
-                "timestamp": str(timestamp),
-                "command": str(command),
-                "message": str(message),
-                "status": str(status),
-            }
-            for timestamp, command, message, status in rows
-        ]
+        rows = self.engine.fetch_all(
+            """
+            SELECT timestamp, command, message, status
+            FROM session_logs
+            WHERE session_name = ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (session_name, limit),
+            row_factory=_SESSION_LOG_ROWS,
+        )
+        rows.reverse()
+        return rows
+
+    def iter_session(self, session_name: str, page_size: int = 1000) -> Iterator[SessionLogRow]:
+        return self.engine.iter_keyset(
+            "session_logs",
+            SessionLogRow._fields,
+            "session_name = ?",
+            (session_name,),
+            page_size=page_size,
+            row_type=SessionLogRow,
+        )
+
+    def search(self, session_name: str, query: str, limit: int = 10) -> list[SessionLogSearchRow]:
+        expression = _match_expression(query)
+        if expression is None or limit <= 0:
+            return []
+        return self.engine.fetch_all(
+            """
+            SELECT s.timestamp, s.command, s.message, s.status,
+                   snippet(session_logs_fts, -1, '[', ']', '...', 12),
+                   bm25(session_logs_fts)
+            FROM session_logs_fts
+            JOIN session_logs AS s ON s.id = session_logs_fts.rowid
+            WHERE session_logs_fts MATCH ? AND s.session_name = ?
+            ORDER BY bm25(session_logs_fts) ASC, s.id DESC
+            LIMIT ?
+            """,
+            (expression, session_name, limit),
+            row_factory=_SESSION_LOG_SEARCH_ROWS,
+        )
+
+    def status_counts(self, session_name: str) -> dict[str, int]:
+        rows = self.engine.fetch_all(
+            "SELECT status, frequency FROM session_status_counts WHERE session_name = ?",
+            (session_name,),
+        )
+        return {str(status): int(frequency) for status, frequency in rows}
+
+    def first_timestamp(self, session_name: str) -> str | None:
+        row = self.engine.fetch_one(
+            """
+            SELECT timestamp
+            FROM session_logs
+            WHERE session_name = ?
+            ORDER BY id ASC
+            LIMIT 1
+            """,
+            (session_name,),
+        )
+        return str(row[0]) if row is not None else None
+
+    def purge_older_than(
+        self,
+        session_name: str,
+        threshold_iso: str,
+        chunk_size: int = 500,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        return self.engine.delete_in_chunks(
+            "session_logs",
+            "session_name = ? AND timestamp < ?",
+            (session_name, threshold_iso),
+            chunk_size,
+            on_chunk,
+        )
 
     def clear(self, session_name: str) -> None:
         self.engine.execute("DELETE FROM session_logs WHERE session_name = ?", (session_name,))
+
+
+@dataclass
+class EmbeddingCacheRepository:
+    engine: SQLiteStorageEngine
+
+    def get_many(self, model: str, text_hashes: Iterable[bytes]) -> dict[bytes, bytes]:
+        keys = list(text_hashes)
+        found: dict[bytes, bytes] = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.engine.fetch_all(
+                f"SELECT text_hash, vector FROM embedding_cache WHERE model = ? AND text_hash IN ({placeholders})",
+                (model, *chunk),
+            )
+            found.update((bytes(text_hash), bytes(vector)) for text_hash, vector in rows)
+        return found
+
+    def put_many(self, model: str, rows: Iterable[tuple[bytes, int, bytes]]) -> int:
+        created_at = datetime.now(UTC).isoformat(timespec="seconds")
+        return self.engine.execute_many(
+            """
+            INSERT OR REPLACE INTO embedding_cache(model, text_hash, dimensions, vector, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            ((model, text_hash, dimensions, vector, created_at) for text_hash, dimensions, vector in rows),
+        )
+
+    def purge_other_models(self, model: str) -> int:
+        return self.engine.execute("DELETE FROM embedding_cache WHERE model != ?", (model,))
+
+    def count(self, model: str | None = None) -> int:
+        if model is None:
+            return self.engine.table_count("embedding_cache")
+        row = self.engine.fetch_one("SELECT COUNT(*) FROM embedding_cache WHERE model = ?", (model,))
+        return int(row[0]) if row is not None else 0
+
+    def clear(self) -> None:
+        self.engine.execute("DELETE FROM embedding_cache")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Callable, NamedTuple, TypeVar
+
+RowT = TypeVar("RowT", bound=tuple)
+
+
+class NoteRow(NamedTuple):
+    tag: str
+    text: str
+    created_at: str
+
+
+class CommandRow(NamedTuple):
+    command: str
+    status: str
+    created_at: str
+
+
+class SessionLogRow(NamedTuple):
+    timestamp: str
+    command: str
+    message: str
+    status: str
+
+
+class NoteSearchRow(NamedTuple):
+    tag: str
+    text: str
+    created_at: str
+    snippet: str
+    score: float
+
+
+class SessionLogSearchRow(NamedTuple):
+    timestamp: str
+    command: str
+    message: str
+    status: str
+    snippet: str
+    score: float
+
+
+def tuple_row_factory(row_type: type[RowT]) -> Callable[[sqlite3.Cursor, tuple], RowT]:
+    new = tuple.__new__
+
+    def factory(_cursor: sqlite3.Cursor, row: tuple) -> RowT:
+        return new(row_type, row)
+
+    return factory
@@ -1,61 +1,295 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
+
+_SCHEMA_CACHE_LOCK = threading.Lock()
+_MIGRATION_SCRIPTS: dict[Path, tuple[Path, ...]] = {}
+_VERIFIED_SCHEMAS: dict[tuple[Path, Path], int] = {}
 
 
 @dataclass
 class SQLiteStorageEngine:
     db_path: Path = field(default_factory=lambda: Path(".oriondesk") / "storage" / "oriondesk.db")
     migrations_dir: Path = field(default_factory=lambda: Path(__file__).parent / "migrations")
+    pooled: bool = False
+    pool_size: int = 4
+    cache_size_kib: int = 8192
+    mmap_size_bytes: int = 64 * 1024 * 1024
+    statement_cache_size: int = 256
 
     def __post_init__(self) -> None:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool_size = max(1, self.pool_size)
+        self._pool_condition = threading.Condition()
+        self._idle_connections: list[sqlite3.Connection] = []
+        self._open_connections = 0
+        self._thread_state = threading.local()
         self.apply_migrations()
 
-    def execute(self, query: str, params: Iterable | None = None) -> None:
+    def execute(self, query: str, params: Iterable | None = None) -> int:
+        values = tuple(params or ())
+        with self._lease() as connection:
+            if self._transaction_depth() > 0:
+                return max(0, connection.execute(query, values).rowcount)
+            with connection:
+                return max(0, connection.execute(query, values).rowcount)
+
+    def iter_keyset(
+        self,
+        table_name: str,
+        columns: tuple[str, ...],
+        where_clause: str = "1 = 1",
+        params: Iterable | None = None,
+        page_size: int = 1000,
+        row_type: type[tuple] | None = None,
+    ) -> Iterator[tuple]:
+        batch = max(1, page_size)
         values = tuple(params or ())
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute(query, values)
-            connection.commit()
+        query = (
+            f"SELECT id, {', '.join(columns)} FROM {table_name} "
+            f"WHERE ({where_clause}) AND id > ? ORDER BY id ASC LIMIT ?"
+        )
+        new = tuple.__new__
+        last_id = 0
+        while True:
+            rows = self.fetch_all(query, (*values, last_id, batch))
+            for row in rows:
+                yield row[1:] if row_type is None else new(row_type, row[1:])
+            if len(rows) < batch:
+                return
+            last_id = rows[-1][0]
+
+    def delete_in_chunks(
+        self,
+        table_name: str,
+        where_clause: str,
+        params: Iterable | None = None,
+        chunk_size: int = 500,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        batch = max(1, chunk_size)
+        values = tuple(params or ())
+        query = (
+            f"DELETE FROM {table_name} WHERE id IN "
+            f"(SELECT id FROM {table_name} WHERE {where_clause} ORDER BY id LIMIT ?)"
+        )
+        removed = 0
+        while True:
+            changed = self.execute(query, (*values, batch))
+            removed += changed
+            if changed and on_chunk is not None:
+                on_chunk(changed)
+            if changed < batch:
+                return removed
+
+    def execute_many(self, query: str, rows: Iterable[Iterable]) -> int:
+        with self.transaction() as connection:
+            cursor = connection.executemany(query, (tuple(row) for row in rows))
+            return max(0, cursor.rowcount)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lease() as connection:
+            depth = self._transaction_depth()
+            self._thread_state.transaction_depth = depth + 1
+            try:
+                yield connection
+            except BaseException:
+                if depth == 0:
+                    connection.rollback()
+                raise
+            else:
+                if depth == 0:
+                    connection.commit()
+            finally:
+                self._thread_state.transaction_depth = depth
 
     def fetch_one(self, query: str, params: Iterable | None = None):
         values = tuple(params or ())
-        with sqlite3.connect(self.db_path) as connection:
+        with self._lease() as connection:
             cursor = connection.execute(query, values)
             return cursor.fetchone()
 
-    def fetch_all(self, query: str, params: Iterable | None = None) -> list[tuple]:
+    def fetch_all(
+        self,
+        query: str,
+        params: Iterable | None = None,
+        row_factory: Callable[[sqlite3.Cursor, tuple], object] | None = None,
+    ) -> list:
         values = tuple(params or ())
-        with sqlite3.connect(self.db_path) as connection:
-            cursor = connection.execute(query, values)
-            return cursor.fetchall()
+        with self._lease() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = row_factory
+            return cursor.execute(query, values).fetchall()
 
     def apply_migrations(self) -> None:
-        with sqlite3.connect(self.db_path) as connection:
+        scripts = self._migration_scripts()
+        target_version = len(scripts)
+        cache_key = (self.db_path.resolve(), self.migrations_dir.resolve())
+        if _VERIFIED_SCHEMAS.get(cache_key) == target_version and self.db_path.exists():
+            return
+        with self._lease() as connection:
+            if not self.pooled:
+                _prefer_incremental_auto_vacuum(connection)
+            current_version = int(connection.execute("PRAGMA user_version").fetchone()[0])
+            if current_version != target_version:
+                self._apply_pending_migrations(connection, scripts, target_version)
+        with _SCHEMA_CACHE_LOCK:
+            _VERIFIED_SCHEMAS[cache_key] = target_version
+
+    def schema_version(self) -> int:
+        row = self.fetch_one("PRAGMA user_version")
+        return int(row[0]) if row is not None else 0
+
+    def _migration_scripts(self) -> tuple[Path, ...]:
+        key = self.migrations_dir.resolve()
+        with _SCHEMA_CACHE_LOCK:
+            scripts = _MIGRATION_SCRIPTS.get(key)
+            if scripts is None:
+                scripts = tuple(sorted(self.migrations_dir.glob("*.sql")))
+                _MIGRATION_SCRIPTS[key] = scripts
+        return scripts
+
+    def _apply_pending_migrations(
+        self,
+        connection: sqlite3.Connection,
+        scripts: tuple[Path, ...],
+        target_version: int,
+    ) -> None:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (version TEXT PRIMARY KEY, applied_at TEXT NOT NULL)"
+        )
+        applied = {
+            row[0] for row in connection.execute("SELECT version FROM schema_migrations").fetchall()
+        }
+        for path in scripts:
+            if path.name in applied:
+                continue
+            script = path.read_text(encoding="utf-8")
+            connection.executescript(script)
             connection.execute(
-                "CREATE TABLE IF NOT EXISTS schema_migrations (version TEXT PRIMARY KEY, applied_at TEXT NOT NULL)"
+                "INSERT INTO schema_migrations(version, applied_at) VALUES (?, ?)",
+                (path.name, self._now_iso()),
             )
-            applied = {
-                row[0] for row in connection.execute("SELECT version FROM schema_migrations").fetchall()
-            }
-            for path in sorted(self.migrations_dir.glob("*.sql")):
-                if path.name in applied:
-                    continue
-                script = path.read_text(encoding="utf-8")
-                connection.executescript(script)
-                connection.execute(
-                    "INSERT INTO schema_migrations(version, applied_at) VALUES (?, ?)",
-                    (path.name, self._now_iso()),
-                )
-            connection.commit()
+        connection.commit()
+        connection.execute(f"PRAGMA user_version={int(target_version)}")
 
     def table_count(self, table_name: str) -> int:
         row = self.fetch_one(f"SELECT COUNT(*) FROM {table_name}")
         return int(row[0]) if row is not None else 0
 
+    def compact(self, max_pages: int | None = None) -> dict[str, int]:
+        with self._lease() as connection:
+            before = int(connection.execute("PRAGMA freelist_count").fetchone()[0])
+            converted = 0
+            if int(connection.execute("PRAGMA auto_vacuum").fetchone()[0]) != 2:
+                # Databases created before auto_vacuum=INCREMENTAL need one full rebuild. It runs here, from
+                # background maintenance, rather than on open; SQLITE_BUSY surfaces and is retried next run.
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("VACUUM")
+                converted = 1
+            pages = "" if max_pages is None else f"({int(max_pages)})"
+            connection.executescript(f"PRAGMA incremental_vacuum{pages}; PRAGMA optimize;")
+            after = int(connection.execute("PRAGMA freelist_count").fetchone()[0])
+        return {
+            "freelist_before": before,
+            "freelist_after": after,
+            "reclaimed_pages": max(0, before - after),
+            "converted": converted,
+        }
+
+    def pool_stats(self) -> dict[str, int | bool]:
+        with self._pool_condition:
+            return {
+                "pooled": self.pooled,
+                "pool_size": self.pool_size,
+                "open": self._open_connections,
+                "idle": len(self._idle_connections),
+            }
+
+    def close(self) -> None:
+        with self._pool_condition:
+            idle = list(self._idle_connections)
+            self._idle_connections.clear()
+            self._open_connections -= len(idle)
+            self._pool_condition.notify_all()
+        for connection in idle:
+            connection.close()
+
+    @contextmanager
+    def _lease(self) -> Iterator[sqlite3.Connection]:
+        held = getattr(self._thread_state, "connection", None)
+        if held is not None:
+            yield held
+            return
+
+        connection = (
+            self._acquire()
+            if self.pooled
+            else sqlite3.connect(self.db_path, cached_statements=self.statement_cache_size)
+        )
+        self._thread_state.connection = connection
+        try:
+            yield connection
+        finally:
+            self._thread_state.connection = None
+            if self.pooled:
+                self._release(connection)
+            else:
+                connection.close()
+
+    def _transaction_depth(self) -> int:
+        return getattr(self._thread_state, "transaction_depth", 0)
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._pool_condition:
+            while not self._idle_connections and self._open_connections >= self.pool_size:
+                self._pool_condition.wait()
+            if self._idle_connections:
+                return self._idle_connections.pop()
+            self._open_connections += 1
+        try:
+            return self._open_pooled_connection()
+        except sqlite3.Error:
+            with self._pool_condition:
+                self._open_connections -= 1
+                self._pool_condition.notify()
+            raise
+
+    def _release(self, connection: sqlite3.Connection) -> None:
+        if connection.in_transaction:
+            connection.rollback()
+        with self._pool_condition:
+            self._idle_connections.append(connection)
+            self._pool_condition.notify()
+
+    def _open_pooled_connection(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        connection.execute("PRAGMA busy_timeout=5000")
+        # auto_vacuum must be settled before WAL mode writes the database header.
+        _prefer_incremental_auto_vacuum(connection)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        connection.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        connection.execute(f"PRAGMA mmap_size={int(self.mmap_size_bytes)}")
+        return connection
+
     def _now_iso(self) -> str:
         return datetime.now(UTC).isoformat(timespec="seconds")
+
+
+def _prefer_incremental_auto_vacuum(connection: sqlite3.Connection) -> None:
+    # Only a file without pages can switch mode for free; existing files are converted by compact().
+    if int(connection.execute("PRAGMA page_count").fetchone()[0]) == 0:
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+
+def write_json_document(
+    output_path: Path,
+    header: dict[str, Any],
+    sections: dict[str, Iterable[dict[str, Any]]],
+    trailer: Callable[[dict[str, int]], dict[str, Any]] | None = None,
+) -> dict[str, int]:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    counts: dict[str, int] = {}
+    with output_path.open("w", encoding="utf-8") as handle:
+        handle.write("{")
+        prefix = "\n"
+        for key, value in header.items():
+            handle.write(f"{prefix}  {json.dumps(key)}: {json.dumps(value)}")
+            prefix = ",\n"
+        for key, rows in sections.items():
+            handle.write(f"{prefix}  {json.dumps(key)}: [")
+            counts[key] = _write_array_items(handle, rows)
+            handle.write("\n  ]" if counts[key] else "]")
+            prefix = ",\n"
+        for key, value in (trailer(counts) if trailer is not None else {}).items():
+            handle.write(f"{prefix}  {json.dumps(key)}: {json.dumps(value)}")
+            prefix = ",\n"
+        handle.write("\n}\n")
+    return counts
+
+
+def write_json_lines(output_path: Path, rows: Iterable[dict[str, Any]]) -> int:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with output_path.open("w", encoding="utf-8") as handle:
+        for row in rows:
+            handle.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def _write_array_items(handle, rows: Iterable[dict[str, Any]]) -> int:
+    count = 0
+    for row in rows:
+        separator = "\n    " if count == 0 else ",\n    "
+        handle.write(separator + json.dumps(row))
+        count += 1
+    return count
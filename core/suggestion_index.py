@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+from typing import Iterable, Mapping
+
+SOURCE_USAGE = 0
+SOURCE_ARGUMENT = 1
+SOURCE_HISTORY = 2
+
+
+class _TrieNode:
+    __slots__ = ("children", "entry_ids", "ranked", "ranked_version")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.entry_ids: list[int] = []
+        self.ranked: tuple[int, ...] = ()
+        self.ranked_version = -1
+
+
+class SuggestionIndex:
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._texts: list[str] = []
+        self._sources: list[int] = []
+        self._keywords: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._frequency: dict[int, int] = {}
+        self._keyword_frequency: dict[str, int] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._last_typed = ""
+        self._last_node: _TrieNode | None = self._root
+
+    @classmethod
+    def build(
+        cls,
+        usages: Iterable[str],
+        argument_map: Mapping[str, Iterable[str]] | None = None,
+        history: Iterable[tuple[str, int]] = (),
+        keywords: Iterable[str] | None = None,
+    ) -> SuggestionIndex:
+        index = cls()
+        for usage in usages:
+            index._add(usage, SOURCE_USAGE)
+        for keyword, hints in sorted((argument_map or {}).items()):
+            for hint in hints:
+                index._add(f"{keyword} {hint}", SOURCE_ARGUMENT)
+        allowed = set(keywords) if keywords is not None else None
+        for command, frequency in history:
+            index._record(command, int(frequency), allowed)
+        return index
+
+    def suggest(self, raw_input: str, limit: int = 5) -> list[str]:
+        if limit <= 0:
+            return []
+        typed = raw_input.strip().lower()
+        with self._lock:
+            node = self._walk(typed)
+            if node is None:
+                return []
+            return [self._texts[entry_id] for entry_id in self._ranked(node)[:limit]]
+
+    def record(self, command: str, count: int = 1, keywords: Iterable[str] | None = None) -> None:
+        with self._lock:
+            self._record(command, count, set(keywords) if keywords is not None else None)
+
+    def frequency(self, command: str) -> int:
+        entry_id = self._ids.get(command.strip().lower())
+        return 0 if entry_id is None else self._frequency.get(entry_id, 0)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _record(self, command: str, count: int, allowed_keywords: set[str] | None) -> None:
+        text = " ".join(command.strip().lower().split())
+        if not text or count <= 0:
+            return
+        keyword = text.split(" ", 1)[0]
+        if allowed_keywords is not None and keyword not in allowed_keywords:
+            return
+        entry_id = self._add(text, SOURCE_HISTORY)
+        self._frequency[entry_id] = self._frequency.get(entry_id, 0) + count
+        self._keyword_frequency[keyword] = self._keyword_frequency.get(keyword, 0) + count
+        self._version += 1
+
+    def _add(self, text: str, source: int) -> int:
+        key = text.strip().lower()
+        entry_id = self._ids.get(key)
+        if entry_id is not None:
+            return entry_id
+        entry_id = len(self._texts)
+        self._ids[key] = entry_id
+        self._texts.append(text.strip())
+        self._sources.append(source)
+        self._keywords.append(key.split(" ", 1)[0])
+        node = self._root
+        node.entry_ids.append(entry_id)
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            child.entry_ids.append(entry_id)
+            node = child
+        self._version += 1
+        # The cached walk may have ended on a node that did not exist yet; restart from the root.
+        self._last_typed = ""
+        self._last_node = self._root
+        return entry_id
+
+    def _walk(self, typed: str) -> _TrieNode | None:
+        # Typing usually extends the previous query, so resume from its node.
+        if typed.startswith(self._last_typed):
+            if self._last_node is None:
+                self._last_typed = typed
+                return None
+            node, remainder = self._last_node, typed[len(self._last_typed):]
+        else:
+            node, remainder = self._root, typed
+        for char in remainder:
+            node = node.children.get(char)
+            if node is None:
+                break
+        self._last_typed = typed
+        self._last_node = node
+        return node
+
+    def _ranked(self, node: _TrieNode) -> tuple[int, ...]:
+        if node.ranked_version != self._version:
+            node.ranked = tuple(sorted(node.entry_ids, key=self._rank_key))
+            node.ranked_version = self._version
+        return node.ranked
+
+    def _rank_key(self, entry_id: int) -> tuple[int, int, int, str]:
+        return (
+            -self._keyword_frequency.get(self._keywords[entry_id], 0),
+            -self._frequency.get(entry_id, 0),
+            self._sources[entry_id],
+            self._texts[entry_id],
+        )
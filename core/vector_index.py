@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+import heapq
+import math
+import operator
+import threading
+from typing import Iterable, Sequence
+
+try:
+    import numpy as _np
+except ImportError:  # NumPy is optional; the stdlib path returns the same ranking, only slower.
+    _np = None
+
+KIND_COMMAND = "command"
+KIND_NOTE = "note"
+KIND_USAGE = "usage"
+
+
+@dataclass(frozen=True)
+class VectorHit:
+    kind: str
+    text: str
+    score: float
+
+
+class VectorIndex:
+    def __init__(self, use_numpy: bool | None = None) -> None:
+        self.use_numpy = (_np is not None) if use_numpy is None else (use_numpy and _np is not None)
+        self.dimensions: int | None = None
+        self._lock = threading.Lock()
+        self._kinds: list[str] = []
+        self._texts: list[str] = []
+        self._keys: dict[tuple[str, str], int] = {}
+        self._rows: list[array] = []
+        self._matrix = None
+        self._kind_codes = None
+        self._kind_ids: dict[str, int] = {}
+
+    @property
+    def backend(self) -> str:
+        return "numpy" if self.use_numpy else "python"
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, item: tuple[str, str]) -> bool:
+        return item in self._keys
+
+    def add(self, kind: str, text: str, vector: Sequence[float]) -> bool:
+        return self.add_many([(kind, text, vector)]) == 1
+
+    def add_many(self, items: Iterable[tuple[str, str, Sequence[float]]]) -> int:
+        added = 0
+        with self._lock:
+            for kind, text, vector in items:
+                if (kind, text) in self._keys or not vector:
+                    continue
+                if self.dimensions is None:
+                    self.dimensions = len(vector)
+                elif len(vector) != self.dimensions:
+                    continue
+                unit = _normalize(vector)
+                if unit is None:
+                    continue
+                self._keys[(kind, text)] = len(self._texts)
+                self._kinds.append(kind)
+                self._texts.append(text)
+                self._append_row(kind, unit)
+                added += 1
+        return added
+
+    def search(
+        self,
+        vector: Sequence[float],
+        limit: int = 5,
+        kinds: Iterable[str] | None = None,
+        min_score: float = 0.0,
+    ) -> list[VectorHit]:
+        if limit <= 0 or not vector:
+            return []
+        with self._lock:
+            if not self._texts or len(vector) != self.dimensions:
+                return []
+            query = _normalize(vector)
+            if query is None:
+                return []
+            allowed = None if kinds is None else frozenset(kinds)
+            if self.use_numpy:
+                ranked = self._search_numpy(query, limit, allowed)
+            else:
+                ranked = self._search_python(query, limit, allowed)
+            return [
+                VectorHit(self._kinds[position], self._texts[position], round(score, 4))
+                for score, position in ranked
+                if score >= min_score
+            ]
+
+    def _append_row(self, kind: str, unit: array) -> None:
+        if not self.use_numpy:
+            self._rows.append(unit)
+            return
+        code = self._kind_ids.setdefault(kind, len(self._kind_ids))
+        size = len(self._texts) - 1
+        if self._matrix is None:
+            self._matrix = _np.zeros((64, len(unit)), dtype=_np.float32)
+            self._kind_codes = _np.zeros(64, dtype=_np.int32)
+        elif size >= self._matrix.shape[0]:
+            # Capacity doubles so incremental inserts stay amortized O(1).
+            self._matrix = _np.concatenate([self._matrix, _np.zeros_like(self._matrix)])
+            self._kind_codes = _np.concatenate([self._kind_codes, _np.zeros_like(self._kind_codes)])
+        self._matrix[size] = _np.frombuffer(unit, dtype=_np.float32)
+        self._kind_codes[size] = code
+
+    def _search_numpy(self, query: array, limit: int, allowed: frozenset[str] | None) -> list[tuple[float, int]]:
+        size = len(self._texts)
+        scores = self._matrix[:size] @ _np.frombuffer(query, dtype=_np.float32)
+        if allowed is not None:
+            codes = [self._kind_ids[kind] for kind in allowed if kind in self._kind_ids]
+            scores = _np.where(_np.isin(self._kind_codes[:size], codes), scores, -_np.inf)
+        count = min(limit, size)
+        top = _np.argpartition(-scores, count - 1)[:count]
+        ordered = top[_np.lexsort((top, -scores[top]))]
+        return [(float(scores[position]), int(position)) for position in ordered if scores[position] != -_np.inf]
+
+    def _search_python(self, query: array, limit: int, allowed: frozenset[str] | None) -> list[tuple[float, int]]:
+        kinds = self._kinds
+        scored = (
+            (sum(map(operator.mul, row, query)), position)
+            for position, row in enumerate(self._rows)
+            if allowed is None or kinds[position] in allowed
+        )
+        return heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+
+
+def _normalize(vector: Sequence[float]) -> array | None:
+    values = array("f", vector)
+    norm = math.sqrt(sum(value * value for value in values))
+    if norm == 0.0 or math.isnan(norm):
+        return None
+    return array("f", (value / norm for value in values))
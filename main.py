@@ -7,9 +7,12 @@ from ui.main_window import MainWindow
 def main() -> int:
     app = QApplication([])
     router = CommandRouter()
+    router.start_background_maintenance()
     window = MainWindow(router=router)
     window.show()
-    return app.exec()
+    exit_code = app.exec()
+    router.shutdown()
+    return exit_code
 
 
 if __name__ == "__main__":
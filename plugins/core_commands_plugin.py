@@ -73,4 +73,12 @@ COMMAND_DEFINITIONS = [
         "handler_name": "_handle_net",
         "dangerous": False,
     },
+    {
+        "keyword": "memory",
+        "usage": "memory search <query>",
+        "min_args": 2,
+        "first_arg_equals": "search",
+        "handler_name": "_handle_memory",
+        "dangerous": False,
+    },
 ]
@@ -0,0 +1,127 @@
+import sqlite3
+import time
+
+from core.audit_recorder import WriteBehindAuditRecorder
+from core.memory_engine import MemoryEngine
+from core.observability import StructuredLogger
+from core.session import SessionLayer
+
+
+def _build_recorder(tmp_path, batch_size: int = 64, flush_interval_seconds: float = 30.0) -> WriteBehindAuditRecorder:
+    return WriteBehindAuditRecorder(
+        session_layer=SessionLayer(session_name="audit", db_path=tmp_path / "session.db"),
+        memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"),
+        logger=StructuredLogger(log_dir=tmp_path / "logs"),
+        batch_size=batch_size,
+        flush_interval_seconds=flush_interval_seconds,
+    )
+
+
+def test_audit_recorder_defers_writes_until_flush(tmp_path) -> None:
+    recorder = _build_recorder(tmp_path)
+
+    recorder.submit("sys info", "ok", "success", "info", {"command": "sys info"})
+    recorder.submit("open vscode", "ok", "success", "info", {"command": "open vscode"})
+
+    assert recorder.stats()["pending"] == 2
+    assert recorder.session_layer.session_repo.recent("audit", limit=None) == []
+
+    flushed = recorder.flush()
+
+    assert flushed == 2
+    assert [item.command for item in recorder.session_layer.recent(limit=5)] == ["sys info", "open vscode"]
+    assert recorder.memory_engine.top_commands(limit=5) == [("open vscode", 1), ("sys info", 1)]
+    assert [item["metadata"]["command"] for item in recorder.logger.tail(limit=5)] == ["sys info", "open vscode"]
+    assert recorder.stats()["flushes"] == 1
+    recorder.close()
+
+
+def test_audit_recorder_flushes_in_background_on_batch_size(tmp_path) -> None:
+    recorder = _build_recorder(tmp_path, batch_size=3)
+
+    for index in range(3):
+        recorder.submit(f"cmd {index}", "ok", "success", "info", {})
+
+    deadline = time.monotonic() + 5.0
+    while recorder.stats()["written"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert recorder.stats()["written"] == 3
+    assert recorder.stats()["pending"] == 0
+    recorder.close()
+
+
+def test_audit_recorder_read_barrier_and_close(tmp_path) -> None:
+    recorder = _build_recorder(tmp_path)
+    recorder.session_layer.read_barrier = recorder.flush
+
+    recorder.submit("sys info", "ok", "success", "info", {})
+    assert recorder.session_layer.recent(limit=1) == []
+    assert recorder.session_layer.entries[0].command == "sys info"
+
+    recorder.submit("net ip", "ok", "success", "info", {})
+    recorder.close()
+    recorder.submit("clip show", "ok", "success", "info", {})
+
+    commands = [item.command for item in recorder.session_layer.entries]
+    assert commands == ["sys info", "net ip", "clip show"]
+
+
+def test_audit_recorder_keeps_log_order_with_direct_logger_writes(tmp_path) -> None:
+    recorder = _build_recorder(tmp_path)
+    recorder.logger.read_barrier = recorder.flush
+    recorder.logger.write_behind = recorder.submit_log
+
+    recorder.submit("sys info", "ok", "success", "info", {})
+    recorder.logger.log("info", "safety_drill", "Simulation Success")
+
+    assert recorder.stats()["pending"] == 2
+    assert not recorder.logger.log_file.exists()
+    events = [item["event"] for item in recorder.logger.tail(limit=2)]
+    assert events == ["command", "safety_drill"]
+    recorder.close()
+
+
+def test_audit_recorder_retries_failed_store_without_duplicating_rows(tmp_path) -> None:
+    recorder = _build_recorder(tmp_path)
+    recorder.retry_backoff_seconds = 0.0
+    original = recorder.memory_engine.record_commands
+    failures = iter([sqlite3.OperationalError("database is locked")])
+
+    def _flaky(items):
+        error = next(failures, None)
+        if error is not None:
+            raise error
+        return original(items)
+
+    recorder.memory_engine.record_commands = _flaky
+    recorder.submit("sys info", "ok", "success", "info", {})
+    recorder.flush()
+
+    stats = recorder.stats()
+    assert stats["written"] == 1
+    assert stats["failed"] == 0
+    assert stats["retries"] == 1
+    assert stats["last_error"] == "database is locked"
+    assert [item.command for item in recorder.session_layer.recent(limit=5)] == ["sys info"]
+    assert recorder.memory_engine.top_commands(limit=5) == [("sys info", 1)]
+    recorder.close()
+
+
+def test_audit_recorder_counts_batch_as_failed_after_last_attempt(tmp_path) -> None:
+    recorder = _build_recorder(tmp_path)
+    recorder.max_attempts = 2
+    recorder.retry_backoff_seconds = 0.0
+
+    def _locked(_items):
+        raise sqlite3.OperationalError("database is locked")
+
+    recorder.memory_engine.record_commands = _locked
+    recorder.submit("sys info", "ok", "success", "info", {})
+    recorder.flush()
+
+    stats = recorder.stats()
+    assert stats["failed"] == 1
+    assert stats["retries"] == 1
+    assert stats["written"] == 0
+    recorder.close()
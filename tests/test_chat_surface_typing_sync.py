@@ -82,3 +82,33 @@ def test_chat_surface_typing_indicator_not_orphan_after_final_hide() -> None:
         or surface.messages_layout.itemAt(index).widget().objectName() != "chatTypingRow"
         for index in range(surface.messages_layout.count())
     )
+
+
+def test_chat_surface_streams_tokens_into_single_live_bubble() -> None:
+    app = _app()
+    surface = ChatSurface(default_dark_tokens())
+    surface.show()
+    app.processEvents()
+
+    surface.show_typing_indicator(stage="generation", expected_ms=150)
+    surface.append_stream_token("Halo")
+    surface.append_stream_token(" dunia")
+    surface.update_typing_stage("final_validation", 5.0)
+    app.processEvents()
+
+    rows = [
+        surface.messages_layout.itemAt(index).widget()
+        for index in range(surface.messages_layout.count())
+        if surface.messages_layout.itemAt(index).widget() is not None
+    ]
+    assert surface.is_streaming() is True
+    assert surface.typing_indicator.isHidden() is True
+    assert [row.objectName() for row in rows if row.objectName() == "chatStreamRow"] == ["chatStreamRow"]
+    assert all(row.objectName() != "chatTypingRow" for row in rows)
+
+    surface.add_message("Halo dunia!", is_user=False)
+    app.processEvents()
+
+    assert surface.is_streaming() is False
+    assert surface.toPlainText() == "OrionDesk: Halo dunia!"
+    assert sum(1 for row in rows if row.objectName() == "chatBubbleRow") == 1
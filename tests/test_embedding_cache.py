@@ -0,0 +1,48 @@
+from core.embedding_cache import EmbeddingCache, decode_vector, encode_vector
+from core.embedding_provider import EmbeddingConfig, EmbeddingHealth, EmbeddingProvider
+from core.storage import SQLiteStorageEngine
+
+
+class CountingEmbeddingProvider(EmbeddingProvider):
+    def __init__(self) -> None:
+        self.requested: list[str] = []
+
+    def config(self) -> EmbeddingConfig:
+        return EmbeddingConfig(model="nomic-embed-text:latest")
+
+    def health(self) -> EmbeddingHealth:
+        return EmbeddingHealth(True, "ready")
+
+    def embed(self, text: str) -> list[float]:
+        self.requested.append(text)
+        return [] if text == "offline" else [0.1, float(len(text))]
+
+
+def test_embedding_vector_blob_is_compact_float32() -> None:
+    blob = encode_vector([0.1, 2.0, -3.5])
+
+    assert len(blob) == 12
+    assert decode_vector(blob)[1:] == (2.0, -3.5)
+    assert abs(decode_vector(blob)[0] - 0.1) < 1e-7
+
+
+def test_embedding_cache_memory_lru_and_disk_tiers(tmp_path) -> None:
+    engine = SQLiteStorageEngine(db_path=tmp_path / "cache.db")
+    provider = CountingEmbeddingProvider()
+    cache = EmbeddingCache(storage_engine=engine, memory_size=2)
+
+    first = cache.embed_many(provider, ["a", "bb", "ccc", "offline"])
+    again = cache.embed_many(provider, ["ccc", "bb", "a"])
+
+    assert again == [first[2], first[1], first[0]]
+    assert first[3] == []
+    assert provider.requested == ["a", "bb", "ccc", "offline"]
+    stats = cache.stats()
+    assert stats["misses"] == 4
+    assert stats["writes"] == 3
+    assert stats["memory_hits"] == 2
+    assert stats["disk_hits"] == 1
+    assert stats["memory_entries"] == 2
+
+    cache.embed_many(provider, ["offline"])
+    assert provider.requested[-1] == "offline"
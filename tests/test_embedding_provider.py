@@ -1,4 +1,7 @@
+import pytest
+
 from core.embedding_provider import EmbeddingConfig, OllamaEmbeddingProvider
+from core.http_pool import HttpStatusError
 
 
 def test_ollama_embedding_health_ok_when_model_available() -> None:
@@ -41,3 +44,74 @@ def test_ollama_embedding_embed_returns_vector() -> None:
 
     vector = provider.embed("hello")
     assert vector == [0.1, 0.2, 0.3]
+
+
+def test_ollama_embedding_embed_many_uses_single_batch_request() -> None:
+    calls: list[tuple[str, dict]] = []
+
+    def fake_request(url: str, payload, timeout: float) -> dict:
+        calls.append((url, payload))
+        return {"embeddings": [[float(len(item))] for item in payload["input"]]}
+
+    provider = OllamaEmbeddingProvider(config=EmbeddingConfig(), request_json=fake_request)
+
+    vectors = provider.embed_many(["sys info", " open vscode ", "", "sys info"])
+
+    assert vectors == [[8.0], [11.0], [], [8.0]]
+    assert len(calls) == 1
+    assert calls[0][0].endswith("/api/embed")
+    assert calls[0][1]["input"] == ["sys info", "open vscode"]
+
+
+def test_ollama_embedding_embed_many_falls_back_to_concurrent_requests() -> None:
+    calls: list[str] = []
+
+    def fake_request(url: str, payload, timeout: float) -> dict:
+        calls.append(url.rsplit("/", 1)[-1])
+        if url.endswith("/api/embed"):
+            raise HttpStatusError(404, "Not Found", url)
+        return {"embedding": [float(len(payload["prompt"]))]}
+
+    provider = OllamaEmbeddingProvider(config=EmbeddingConfig(), request_json=fake_request)
+
+    assert provider.embed_many(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert provider.embed_many(["dddd"]) == [[4.0]]
+    assert calls.count("embed") == 1
+    assert calls.count("embeddings") == 4
+
+
+def test_ollama_embedding_embed_many_keeps_batching_after_model_not_found() -> None:
+    calls: list[str] = []
+    pulled = False
+
+    def fake_request(url: str, payload, timeout: float) -> dict:
+        calls.append(url.rsplit("/", 1)[-1])
+        if not pulled:
+            body = '{"error":"model \\"nomic-embed-text\\" not found, try pulling it first"}'
+            raise HttpStatusError(404, "Not Found", url, body)
+        return {"embeddings": [[float(len(text))] for text in payload["input"]]}
+
+    provider = OllamaEmbeddingProvider(config=EmbeddingConfig(), request_json=fake_request)
+
+    with pytest.raises(HttpStatusError):
+        provider.embed_many(["a"])
+    pulled = True
+    assert provider.embed_many(["a", "bb"]) == [[1.0], [2.0]]
+    assert calls == ["embed", "embeddings", "embed"]
+
+
+def test_ollama_embedding_embed_many_reprobes_batch_endpoint_after_retry_window() -> None:
+    calls: list[str] = []
+
+    def fake_request(url: str, payload, timeout: float) -> dict:
+        calls.append(url.rsplit("/", 1)[-1])
+        if url.endswith("/api/embed"):
+            raise HttpStatusError(404, "Not Found", url, "404 page not found")
+        return {"embedding": [1.0]}
+
+    provider = OllamaEmbeddingProvider(config=EmbeddingConfig(), request_json=fake_request, batch_retry_seconds=0.0)
+
+    provider.embed_many(["a"])
+    provider.embed_many(["b"])
+
+    assert calls == ["embed", "embeddings", "embed", "embeddings"]
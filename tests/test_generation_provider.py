@@ -1,3 +1,6 @@
+import json
+import threading
+
 from core.generation_provider import GenerationConfig, OllamaGenerationProvider
 
 
@@ -69,3 +72,66 @@ def test_ollama_generation_list_models_with_gpu_badges() -> None:
     assert badges["llama3:13b"] == "Borderline"
     assert badges["mega:30b"] == "Jangan dipaksa"
     assert badges["nomic-embed-text:latest"] == "Lowest/Embed"
+
+
+class _FakeStream:
+    def __init__(self, lines: list[dict]) -> None:
+        self.lines = [(json.dumps(item) + "\n").encode("utf-8") for item in lines]
+        self.read_lines = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        if self.read_lines >= len(self.lines):
+            raise StopIteration
+        self.read_lines += 1
+        return self.lines[self.read_lines - 1]
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_ollama_generation_stream_yields_ndjson_chunks() -> None:
+    stream = _FakeStream(
+        [
+            {"response": "Halo", "done": False},
+            {"response": " dunia", "done": False},
+            {"response": "", "done": True},
+            {"response": "tidak dibaca", "done": False},
+        ]
+    )
+    requests: list[dict] = []
+
+    def fake_open(url: str, payload: dict, timeout: float, cancel_event=None):
+        assert "/api/generate" in url
+        requests.append(payload)
+        return stream
+
+    provider = OllamaGenerationProvider(config=GenerationConfig(model="gemma3:4b"), open_stream=fake_open)
+
+    assert list(provider.generate_stream("ringkas ini", system_prompt="sys")) == ["Halo", " dunia"]
+    assert requests[0]["stream"] is True
+    assert requests[0]["system"] == "sys"
+    assert stream.read_lines == 4
+    assert stream.closed is True
+
+
+def test_ollama_generation_stream_cancel_closes_response() -> None:
+    stream = _FakeStream([{"response": f"t{index} ", "done": False} for index in range(10)])
+    provider = OllamaGenerationProvider(
+        config=GenerationConfig(model="gemma3:4b"),
+        open_stream=lambda url, payload, timeout, cancel_event: stream,
+    )
+    cancel_event = threading.Event()
+
+    received: list[str] = []
+    for chunk in provider.generate_stream("panjang", cancel_event=cancel_event):
+        received.append(chunk)
+        if len(received) == 2:
+            cancel_event.set()
+
+    assert received == ["t0 ", "t1 "]
+    assert stream.read_lines == 3
+    assert stream.closed is True
@@ -0,0 +1,219 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.embedding_provider import EmbeddingConfig, OllamaEmbeddingProvider
+from core.generation_provider import GenerationConfig, OllamaGenerationProvider
+from core.http_pool import CancelEvent, HttpConnectionPool, HttpStatusError, RequestCancelledError
+
+
+class _StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_args) -> None:
+        return
+
+    def do_GET(self) -> None:
+        self.server.client_ports.append(self.client_address[1])
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "gemma3:4b"}, {"name": "nomic-embed-text:latest"}]})
+        elif self.path == "/drop":
+            # Answers, then closes without announcing it, like a server expiring an idle keep-alive socket.
+            self._send_json({"ok": True})
+            self.close_connection = True
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self) -> None:
+        self.server.client_ports.append(self.client_address[1])
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/api/embeddings":
+            self._send_json({"embedding": [float(len(payload["prompt"])), 1.0]})
+        elif self.path == "/api/generate":
+            self._send_stream(payload)
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, payload: dict) -> None:
+        if payload["prompt"].startswith("hold"):
+            # Ollama sends no headers until the first token is ready.
+            time.sleep(2.0)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        lines = [{"response": token, "done": False} for token in payload["prompt"].split()]
+        for index, line in enumerate([*lines, {"response": "", "done": True}]):
+            if payload["prompt"].startswith("slow") and index == 1:
+                time.sleep(2.0)
+            data = (json.dumps(line) + "\n").encode("utf-8")
+            try:
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+            except OSError:
+                return
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture()
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllamaHandler)
+    server.daemon_threads = True
+    server.client_ports = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _host(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_http_pool_reuses_connection_across_providers(stub_server) -> None:
+    pool = HttpConnectionPool(max_per_host=2)
+    embedding = OllamaEmbeddingProvider(
+        config=EmbeddingConfig(host=_host(stub_server), model="nomic-embed-text:latest"),
+        http_pool=pool,
+    )
+    generation = OllamaGenerationProvider(config=GenerationConfig(host=_host(stub_server)), http_pool=pool)
+
+    assert embedding.health().ok is True
+    assert embedding.embed("halo") == [4.0, 1.0]
+    assert generation.health().ok is True
+    assert "".join(generation.generate_stream("satu dua")) == "satudua"
+    assert generation.health().ok is True
+
+    stats = pool.stats()
+    assert stats["requests"] == 5
+    assert stats["created"] == 1
+    assert stats["reused"] == 4
+    assert stats["idle"] == 1
+    assert stats["in_use"] == 0
+    assert len(set(stub_server.client_ports)) == 1
+    pool.close()
+
+
+def test_http_pool_limits_connections_per_host(stub_server) -> None:
+    pool = HttpConnectionPool(max_per_host=1)
+    url = f"{_host(stub_server)}/api/generate"
+
+    held = pool.open(url, {"prompt": "tahan"}, 2.0)
+    with pytest.raises(TimeoutError):
+        pool.request_json(f"{_host(stub_server)}/api/tags", None, 0.2)
+    list(held)
+    held.close()
+
+    assert pool.request_json(f"{_host(stub_server)}/api/tags", None, 2.0)["models"]
+    assert pool.stats()["reused"] == 1
+    pool.close()
+
+
+def test_http_pool_retries_stale_keep_alive_connection(stub_server) -> None:
+    pool = HttpConnectionPool()
+
+    assert pool.request_json(f"{_host(stub_server)}/drop", None, 2.0) == {"ok": True}
+    time.sleep(0.05)
+    assert pool.request_json(f"{_host(stub_server)}/api/tags", None, 2.0)["models"]
+
+    stats = pool.stats()
+    assert stats["retries"] == 1
+    assert stats["created"] == 2
+    pool.close()
+
+
+def test_http_pool_raises_status_error_and_keeps_connection(stub_server) -> None:
+    pool = HttpConnectionPool()
+
+    with pytest.raises(HttpStatusError) as error:
+        pool.request_json(f"{_host(stub_server)}/missing", None, 2.0)
+
+    assert error.value.status == 404
+    assert pool.stats()["idle"] == 1
+    pool.close()
+
+
+def test_http_pool_close_aborts_blocked_stream_read(stub_server) -> None:
+    pool = HttpConnectionPool()
+    response = pool.open(f"{_host(stub_server)}/api/generate", {"prompt": "slow satu dua"}, 5.0)
+    lines = iter(response)
+    assert json.loads(next(lines))["response"] == "slow"
+
+    timer = threading.Timer(0.1, response.close)
+    started = time.perf_counter()
+    timer.start()
+    remaining = list(lines)
+    elapsed = time.perf_counter() - started
+    timer.join()
+
+    assert elapsed < 1.5
+    assert remaining == []
+    assert pool.stats()["discarded"] == 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_cancel_event_runs_callbacks_once_and_immediately_after_set() -> None:
+    event = CancelEvent()
+    calls: list[str] = []
+    event.add_callback(lambda: calls.append("first"))
+    detach = event.add_callback(lambda: calls.append("detached"))
+    detach()
+
+    event.set()
+    event.set()
+    event.add_callback(lambda: calls.append("late"))
+
+    assert calls == ["first", "late"]
+
+
+def test_generation_stream_cancel_aborts_read_before_first_token(stub_server) -> None:
+    pool = HttpConnectionPool()
+    generation = OllamaGenerationProvider(config=GenerationConfig(host=_host(stub_server)), http_pool=pool)
+    cancel_event = CancelEvent()
+
+    timer = threading.Timer(0.1, cancel_event.set)
+    started = time.perf_counter()
+    timer.start()
+    chunks = list(generation.generate_stream("hold satu dua", cancel_event=cancel_event))
+    elapsed = time.perf_counter() - started
+    timer.join()
+
+    assert chunks == []
+    assert elapsed < 1.5
+    assert pool.stats()["in_use"] == 0
+    with pytest.raises(RequestCancelledError):
+        pool.open(f"{_host(stub_server)}/api/generate", {"prompt": "satu"}, 2.0, cancel_event)
+    pool.close()
+
+
+def test_generation_stream_cancel_aborts_read_between_tokens(stub_server) -> None:
+    pool = HttpConnectionPool()
+    generation = OllamaGenerationProvider(config=GenerationConfig(host=_host(stub_server)), http_pool=pool)
+    cancel_event = CancelEvent()
+    stream = generation.generate_stream("slow satu dua", cancel_event=cancel_event)
+
+    assert next(stream) == "slow"
+    timer = threading.Timer(0.1, cancel_event.set)
+    started = time.perf_counter()
+    timer.start()
+    remaining = list(stream)
+    elapsed = time.perf_counter() - started
+    timer.join()
+
+    assert remaining == []
+    assert elapsed < 1.5
+    assert pool.stats()["discarded"] == 1
+    assert pool.stats()["in_use"] == 0
+    pool.close()
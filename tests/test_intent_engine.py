@@ -1,3 +1,5 @@
+import json
+
 from core.intent_engine import LocalIntentEngine
 
 
@@ -37,4 +39,53 @@ def test_intent_engine_unresolved() -> None:
     engine = LocalIntentEngine()
     result = engine.resolve("abcdef ghijk", allowed_keywords={"open", "search", "sys"})
 
-    assert result.reason == "unresolved"
\ No newline at end of file
+    assert result.reason == "unresolved"
+
+def test_intent_engine_caches_resolutions_per_keyword_set() -> None:
+    engine = LocalIntentEngine(cache_size=2)
+    allowed = frozenset({"open", "search", "sys"})
+
+    first = engine.resolve("tolong bukakan notepad", allowed_keywords=allowed)
+    assert engine.resolve("tolong bukakan notepad", allowed_keywords=allowed) is first
+    assert engine.resolve("tolong bukakan notepad", allowed_keywords={"search"}).reason == "unresolved"
+
+    engine.resolve("status system sekarang", allowed_keywords=allowed)
+    assert engine.cache_info()["size"] == 2
+    assert engine.resolve("tolong bukakan notepad", allowed_keywords=allowed) is not first
+
+
+def test_intent_engine_loads_extra_rules_from_disk(tmp_path) -> None:
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(
+        json.dumps(
+            {
+                "rules": [
+                    {
+                        "keyword": "proj",
+                        "markers": ["proyek", "project"],
+                        "targets": ["oriondesk"],
+                        "template": "proj open {target}",
+                        "confidence": 0.74,
+                    }
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    engine = LocalIntentEngine(rules_path=rules_path)
+    allowed = {"open", "search", "sys", "proj"}
+
+    result = engine.resolve("buka proyek oriondesk", allowed_keywords=allowed)
+    assert result.resolved == "proj open oriondesk"
+    assert result.reason == "semantic_proj"
+    assert engine.resolve("tolong bukakan notepad", allowed_keywords=allowed).resolved == "open notepad"
+    assert engine.rules_error is None
+
+
+def test_intent_engine_keeps_defaults_when_rule_file_is_invalid(tmp_path) -> None:
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text("{not json", encoding="utf-8")
+    engine = LocalIntentEngine(rules_path=rules_path)
+
+    assert engine.rules_error is not None
+    assert engine.resolve("tolong bukakan notepad", allowed_keywords={"open"}).resolved == "open notepad"
@@ -65,4 +65,51 @@ def test_memory_engine_imports_legacy_json(tmp_path) -> None:
     assert engine.get_preference("persona") == "calm"
     assert engine.recent_notes(limit=1)[0].tag == "legacy"
     assert engine.top_commands(limit=1)[0] == ("open vscode", 1)
-    assert (storage_dir / "memory.db").exists() is True
\ No newline at end of file
+    assert (storage_dir / "memory.db").exists() is True
+
+def test_memory_top_commands_time_window(tmp_path) -> None:
+    engine = MemoryEngine(storage_dir=tmp_path / "memory")
+    engine.record_commands([("open vscode", "success", "2020-01-01T00:00:00+00:00")])
+    engine.record_command("sys info", "success")
+
+    assert engine.top_commands(limit=5) == [("open vscode", 1), ("sys info", 1)]
+    assert engine.top_commands(limit=5, window="day") == [("sys info", 1)]
+    assert engine.top_commands(limit=5, window="week") == [("sys info", 1)]
+
+
+def test_memory_streaming_exports(tmp_path) -> None:
+    engine = MemoryEngine(storage_dir=tmp_path / "memory")
+    engine.set_preference("persona", "calm")
+    engine.add_note("work", "ingat buka vscode")
+    engine.record_command("open vscode", "success")
+    engine.record_command("sys info", "success")
+
+    payload = json.loads(engine.export_memory(tmp_path / "memory.json", page_size=1).read_text(encoding="utf-8"))
+    lines = engine.export_memory_jsonl(tmp_path / "memory.jsonl", page_size=1).read_text(encoding="utf-8").splitlines()
+
+    assert payload["preferences"] == {"persona": "calm"}
+    assert payload["notes"][0]["tag"] == "work"
+    assert [item["command"] for item in payload["commands"]] == ["open vscode", "sys info"]
+    assert [json.loads(line)["type"] for line in lines] == ["preference", "note", "command", "command"]
+
+
+def test_memory_search_notes_returns_ranked_snippets(tmp_path) -> None:
+    engine = MemoryEngine(storage_dir=tmp_path / "memory")
+    engine.add_note("work", "ingat buka vscode untuk review")
+    engine.add_note("home", "siram tanaman")
+
+    hits = engine.search_notes("vscode")
+
+    assert len(hits) == 1
+    assert hits[0].note.tag == "work"
+    assert "[vscode]" in hits[0].snippet
+
+
+def test_memory_top_successful_commands_ignores_failed_attempts(tmp_path) -> None:
+    engine = MemoryEngine(storage_dir=tmp_path / "memory")
+    engine.record_command("sys info", "success")
+    engine.record_command("open vscode", "blocked")
+    engine.record_command("open vscode", "invalid")
+
+    assert engine.top_commands(limit=1) == [("open vscode", 2)]
+    assert engine.top_successful_commands(limit=5) == [("sys info", 1)]
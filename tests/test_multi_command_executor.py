@@ -1,3 +1,6 @@
+import threading
+import time
+
 from core.multi_command_executor import MultiCommandExecutor
 
 
@@ -23,3 +26,53 @@ def test_multi_command_executor_reports_execution() -> None:
     assert len(reports) == 1
     assert reports[0]["status"] == "success"
     assert reports[0]["message"] == "ok"
+
+
+def test_multi_command_executor_runs_parallel_group_concurrently() -> None:
+    executor = MultiCommandExecutor(max_workers=4)
+    barrier = threading.Barrier(3, timeout=2.0)
+    events: list[str] = []
+    lock = threading.Lock()
+    bundles = [
+        {"command": "open vscode", "risk_level": "low", "execution_mode": "chain"},
+        {"command": "search file a", "risk_level": "low", "execution_mode": "parallel-eligible"},
+        {"command": "sys info", "risk_level": "low", "execution_mode": "parallel-eligible"},
+        {"command": "net ping", "risk_level": "low", "execution_mode": "parallel-eligible"},
+        {"command": "delete tmp", "risk_level": "high", "execution_mode": "guarded"},
+    ]
+
+    def run_command(command: str) -> tuple[str, str]:
+        if command in {"search file a", "sys info", "net ping"}:
+            barrier.wait()
+            time.sleep(0.05)
+        with lock:
+            events.append(command)
+        return "success", command
+
+    run = executor.run(bundles, run_command)
+
+    assert [item["command"] for item in run.reports] == [item["command"] for item in bundles]
+    assert events[0] == "open vscode"
+    assert events[-1] == "delete tmp"
+    assert run.parallel_groups == 1
+    assert run.summed_ms > run.wall_ms
+    assert run.timing()["speedup"] > 1.0
+    assert all(item["duration_ms"] >= 50.0 for item in run.reports[1:4])
+
+
+def test_multi_command_executor_propagates_step_errors_in_order() -> None:
+    executor = MultiCommandExecutor()
+    bundles = [
+        {"command": "search file a", "risk_level": "low", "execution_mode": "parallel-eligible"},
+        {"command": "sys info", "risk_level": "low", "execution_mode": "parallel-eligible"},
+    ]
+
+    def run_command(command: str) -> tuple[str, str]:
+        raise RuntimeError(command)
+
+    try:
+        executor.execute(bundles, run_command)
+    except RuntimeError as error:
+        assert str(error) == "search file a"
+    else:
+        raise AssertionError("RuntimeError tidak diteruskan")
@@ -11,6 +11,25 @@ def test_performance_profiler_measures_storage_io() -> None:
     assert result.average_ms >= 0
 
 
+def test_performance_profiler_compares_sqlite_pooling() -> None:
+    profiler = PerformanceProfiler()
+    pooled = profiler.measure_sqlite_storage_io(pooled=True, iterations=3)
+    comparison = profiler.compare_sqlite_pooling(iterations=3)
+
+    assert pooled.metric == "sqlite_pooled_io_ms"
+    assert pooled.iterations == 3
+    assert comparison["pooled_ms"] >= 0
+    assert comparison["unpooled_ms"] >= 0
+
+
+def test_performance_profiler_benchmarks_bulk_imports() -> None:
+    profiler = PerformanceProfiler()
+    report = profiler.benchmark_bulk_imports(row_counts=(100, 1_000))
+
+    assert set(report.keys()) == {100, 1_000}
+    assert report[1_000]["rows_per_second"] > 0
+
+
 def test_performance_profiler_measures_command_latency() -> None:
     profiler = PerformanceProfiler()
     calls: list[str] = []
@@ -52,3 +71,37 @@ def test_release_hardening_plan_contains_safety_drill_check() -> None:
     keys = [item.key for item in plan.checklist]
 
     assert "safety_drill" in keys
+
+
+def test_performance_profiler_measures_recent_row_materialization() -> None:
+    profiler = PerformanceProfiler()
+    report = profiler.measure_recent_rows(limit=40, iterations=5)
+
+    assert report["row_factory_ms"] > 0
+    assert report["row_factory_bytes_per_row"] < report["dict_bytes_per_row"]
+
+
+def test_performance_profiler_measures_statement_cache_sizes() -> None:
+    profiler = PerformanceProfiler()
+    report = profiler.measure_statement_cache(cache_sizes=(16, 256), statements=40, iterations=2)
+
+    assert set(report) == {16, 256}
+    assert all(value > 0 for value in report.values())
+
+
+def test_performance_profiler_measures_command_dispatch() -> None:
+    profiler = PerformanceProfiler()
+    calls: list[str] = []
+
+    report = profiler.measure_command_dispatch(calls.append, ("sys info", "open vscode"), iterations=3)
+
+    assert set(report) == {"sys info", "open vscode"}
+    assert len(calls) == 8
+
+
+def test_performance_profiler_measures_cold_start_time_to_first_command() -> None:
+    profiler = PerformanceProfiler()
+    report = profiler.measure_cold_start(command="sys info", iterations=1)
+
+    assert set(report) == {"import_ms", "construct_ms", "first_command_ms", "time_to_first_command_ms"}
+    assert report["time_to_first_command_ms"] >= report["construct_ms"] > 0
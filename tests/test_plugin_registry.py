@@ -1,3 +1,8 @@
+import json
+import os
+import sys
+
+import core.plugin_registry as plugin_registry
 from core.plugin_registry import PluginRegistry
 
 
@@ -19,4 +24,53 @@ def test_plugin_registry_marks_dangerous_commands() -> None:
     items = registry.discover()
     dangerous = {item.keyword for item in items if item.dangerous}
 
-    assert dangerous == {"delete", "kill", "shutdown"}
\ No newline at end of file
+    assert dangerous == {"delete", "kill", "shutdown"}
+
+def test_plugin_registry_reuses_manifest_without_importing_plugins(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(plugin_registry, "_MANIFEST_CACHE", {})
+    registry = PluginRegistry(package_name="plugins", cache_dir=tmp_path)
+    scanned = registry.discover()
+    assert registry.last_source == "scan"
+    assert registry.manifest_file.exists()
+    payload = json.loads(registry.manifest_file.read_text(encoding="utf-8"))
+    assert len(payload["definitions"]) == len(scanned)
+
+    monkeypatch.setattr(plugin_registry, "_MANIFEST_CACHE", {})
+
+    def _fail_import(name):
+        raise AssertionError(f"plugin module diimport ulang: {name}")
+
+    monkeypatch.setattr(plugin_registry.importlib, "import_module", _fail_import)
+    cached = PluginRegistry(package_name="plugins", cache_dir=tmp_path)
+    assert cached.discover() == scanned
+    assert cached.last_source == "manifest"
+    assert cached.discover() == scanned
+    assert cached.last_source == "memory"
+
+
+def test_plugin_registry_manifest_invalidated_by_plugin_mtime(tmp_path, monkeypatch) -> None:
+    package_dir = tmp_path / "mtime_plugins_pkg"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("", encoding="utf-8")
+    plugin_file = package_dir / "alpha_plugin.py"
+    plugin_file.write_text(
+        'COMMAND_DEFINITIONS = [{"keyword": "alpha", "usage": "alpha", "handler_name": "_handle_alpha"}]\n',
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(plugin_registry, "_MANIFEST_CACHE", {})
+
+    registry = PluginRegistry(package_name="mtime_plugins_pkg", cache_dir=tmp_path / "cache")
+    assert [item.keyword for item in registry.discover()] == ["alpha"]
+
+    plugin_file.write_text(
+        'COMMAND_DEFINITIONS = [{"keyword": "beta", "usage": "beta", "handler_name": "_handle_beta"}]\n',
+        encoding="utf-8",
+    )
+    stat = plugin_file.stat()
+    os.utime(plugin_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    sys.modules.pop("mtime_plugins_pkg.alpha_plugin", None)
+
+    refreshed = PluginRegistry(package_name="mtime_plugins_pkg", cache_dir=tmp_path / "cache")
+    assert [item.keyword for item in refreshed.discover()] == ["beta"]
+    assert refreshed.last_source == "scan"
@@ -44,3 +44,32 @@ def test_reasoning_engine_prunes_high_risk_low_confidence() -> None:
 
     assert plan["decisions"][0]["mode"] == "pruned"
     assert "pruned" in plan["decisions"][0]["reason"]
+
+
+def test_reasoning_engine_embeds_all_steps_in_one_batch() -> None:
+    engine = ComplexReasoningEngine()
+    graph = {
+        "steps": [
+            {"step_id": "S1", "resolved_command": "open vscode", "reason": "confidence=0.80"},
+            {"step_id": "S2", "resolved_command": "sys info", "reason": "confidence=0.70"},
+            {"step_id": "S3", "resolved_command": "search file a.txt", "reason": "confidence=0.70"},
+        ]
+    }
+    batches: list[list[str]] = []
+
+    def embed_many(texts):
+        batches.append(list(texts))
+        return [[0.1] if text != "sys info" else [] for text in texts]
+
+    def embed_text(_text):
+        raise AssertionError("embed_text should not be called when embed_many is available")
+
+    plan = engine.build_plan(
+        graph_payload=graph,
+        embed_text=embed_text,
+        risk_level=lambda _keyword: "low",
+        embed_many=embed_many,
+    ).to_dict()
+
+    assert batches == [["open vscode", "sys info", "search file a.txt"]]
+    assert [item["confidence"] for item in plan["decisions"]] == [0.85, 0.62, 0.75]
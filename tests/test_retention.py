@@ -0,0 +1,93 @@
+import time
+
+from core.memory_engine import MemoryEngine
+from core.retention import RetentionJob
+from core.session import SessionLayer
+
+
+def _seed(memory: MemoryEngine, session: SessionLayer) -> None:
+    old = "2020-01-01T00:00:00+00:00"
+    memory.record_commands([("sys info", "success", old) for _ in range(12)])
+    memory.note_repo.add_many([("legacy", f"note {index}", old) for index in range(5)])
+    session.import_entries([{"timestamp": old, "command": "sys info", "message": "ok", "status": "success"}] * 7)
+    memory.record_command("open vscode", "success")
+    session.record("open vscode", "ok", "success")
+
+
+def test_retention_job_purges_in_chunks_with_progress(tmp_path) -> None:
+    memory = MemoryEngine(storage_dir=tmp_path / "memory")
+    session = SessionLayer(session_name="retention", db_path=tmp_path / "session.db")
+    _seed(memory, session)
+    progress = []
+    reports = []
+    job = RetentionJob(
+        memory_engine=memory,
+        session_layer=session,
+        retention_days=30,
+        session_retention_days=30,
+        chunk_size=5,
+        progress_callback=progress.append,
+        report_callback=reports.append,
+    )
+
+    report = job.run_once()
+
+    assert report.removed_by_table == {"notes": 5, "commands": 12, "session_logs": 7}
+    assert report.total_removed == 24
+    assert report.error is None
+    assert reports == [report]
+    purge_chunks = [item.count for item in progress if item.stage == "purge" and item.target == "commands"]
+    assert purge_chunks == [5, 5, 2]
+    assert {item.target for item in progress if item.stage == "compact"} == {"memory", "session"}
+    assert memory.top_commands(limit=5) == [("open vscode", 1)]
+    assert [item.command for item in session.entries] == ["open vscode"]
+
+
+def test_retention_job_only_compacts_without_configured_retention(tmp_path) -> None:
+    memory = MemoryEngine(storage_dir=tmp_path / "memory")
+    session = SessionLayer(session_name="retention", db_path=tmp_path / "session.db")
+    _seed(memory, session)
+    progress = []
+    job = RetentionJob(memory_engine=memory, session_layer=session, progress_callback=progress.append)
+
+    report = job.run_once()
+
+    assert report.total_removed == 0
+    assert {item.stage for item in progress} == {"compact"}
+    assert memory.top_commands(limit=5) == [("sys info", 12), ("open vscode", 1)]
+    assert len(session.entries) == 8
+
+
+def test_retention_job_background_schedule_start_stop(tmp_path) -> None:
+    memory = MemoryEngine(storage_dir=tmp_path / "memory")
+    session = SessionLayer(db_path=tmp_path / "session.db")
+    reports = []
+    job = RetentionJob(
+        memory_engine=memory,
+        session_layer=session,
+        interval_seconds=3600,
+        initial_delay_seconds=0.0,
+        report_callback=reports.append,
+    )
+
+    job.start()
+    assert job.is_running is True
+    deadline = time.monotonic() + 5.0
+    while not reports and time.monotonic() < deadline:
+        time.sleep(0.01)
+    job.stop()
+
+    assert job.is_running is False
+    assert len(reports) == 1
+
+
+def test_session_purge_only_touches_its_own_session(tmp_path) -> None:
+    old = "2020-01-01T00:00:00+00:00"
+    session = SessionLayer(session_name="retention", db_path=tmp_path / "session.db")
+    other = SessionLayer(session_name="other", db_path=tmp_path / "session.db")
+    session.import_entries([{"timestamp": old, "command": "sys info", "message": "ok", "status": "success"}] * 3)
+    other.import_entries([{"timestamp": old, "command": "net ip", "message": "ok", "status": "success"}] * 2)
+
+    assert session.purge_older_than(days=30) == 3
+    assert session.entries == []
+    assert [item.command for item in other.entries] == ["net ip", "net ip"]
@@ -1,8 +1,16 @@
+import json
+import tempfile
+import threading
 import time
+from pathlib import Path
 
+from core.observability import RecoveryManager, StructuredLogger
+from core.intent_engine import LocalIntentEngine
+from core.memory_engine import MemoryEngine
 from core.router import CommandRouter
 from core.safe_mode_policy import SafeModePolicy
 from core.security_guard import SecurityGuard
+from core.session import SessionLayer
 from core.embedding_provider import EmbeddingConfig, EmbeddingHealth, EmbeddingProvider
 from core.generation_provider import GenerationConfig, GenerationHealth, GenerationModelInfo, GenerationProvider
 
@@ -148,8 +156,9 @@ class CapturingGenerationProvider(DummyGenerationProvider):
         return super().generate(prompt, system_prompt)
 
 
-def build_router() -> CommandRouter:
+def build_router(**overrides) -> CommandRouter:
     return CommandRouter(
+        logger=StructuredLogger(log_dir=Path(tempfile.mkdtemp(prefix="oriondesk-logs-"))),
         launcher=DummyLauncher(),
         file_manager=DummyFileManager(),
         system_tools=DummySystemTools(),
@@ -160,6 +169,7 @@ def build_router() -> CommandRouter:
         network_diagnostics=DummyNetworkDiagnostics(),
         embedding_provider=DummyEmbeddingProvider(),
         generation_provider=DummyGenerationProvider(),
+        **overrides,
     )
 
 
@@ -301,6 +311,7 @@ def test_contract_rejects_kill_without_target() -> None:
 def test_router_records_session_for_success_command() -> None:
     router = build_router()
     router.execute("open vscode")
+    router.audit_recorder.flush()
     latest = router.session_layer.recent(limit=1)[0]
 
     assert latest.command == "open vscode"
@@ -310,10 +321,12 @@ def test_router_records_session_for_success_command() -> None:
 def test_router_records_session_for_pending_and_cancelled() -> None:
     router = build_router()
     router.execute("shutdown")
+    router.audit_recorder.flush()
     pending = router.session_layer.recent(limit=1)[0]
     assert pending.status == "pending_confirmation"
 
     router.confirm_pending(False)
+    router.audit_recorder.flush()
     cancelled = router.session_layer.recent(limit=1)[0]
     assert cancelled.status == "cancelled"
 
@@ -326,6 +339,42 @@ def test_router_auto_registers_plugin_commands() -> None:
     assert {"delete", "kill", "shutdown"}.issubset(router.dangerous_keywords)
 
 
+def test_router_compiles_command_table_and_parses_once() -> None:
+    router = build_router()
+    parse_calls: list[str] = []
+    original_parse = router.parse
+
+    def counting_parse(command: str):
+        parse_calls.append(command)
+        return original_parse(command)
+
+    router.parse = counting_parse
+    result = router.execute("search report")
+
+    assert parse_calls == ["search report"]
+    assert "report" in result.message
+    assert router.contracts is router.command_table.contracts
+    assert "memory" in router.command_table.keywords
+    assert router.list_command_keywords() == sorted(router.command_table.keywords)
+    try:
+        router.contracts["extra"] = router.contracts["sys"]
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("command contracts must be read-only after registration")
+
+
+def test_router_builds_rarely_used_subsystems_on_first_use() -> None:
+    router = build_router()
+    lazy = ("release_gate_v22", "backup_manager", "diagnostic_reporter", "release_hardening_plan", "recovery_manager")
+
+    assert all(router.__dict__.get(f"_lazy_{name}") is None for name in lazy)
+    assert router.network_diagnostics is router.network_diagnostics
+    assert router.release_hardening_summary() is not None
+    assert router.__dict__.get("_lazy_release_hardening_plan") is not None
+    assert router.__dict__.get("_lazy_backup_manager") is None
+
+
 def test_router_exposes_embedding_config_and_health() -> None:
     router = build_router()
 
@@ -527,6 +576,8 @@ def test_router_execute_multi_returns_reports() -> None:
     assert payload["dry_run"] is True
     assert len(payload["reports"]) == 2
     assert all("status" in item for item in payload["reports"])
+    assert set(payload["timing"]) == {"wall_ms", "summed_ms", "speedup", "parallel_groups"}
+    assert payload["timing"]["summed_ms"] <= payload["timing"]["wall_ms"] + 1.0
 
 
 def test_execute_multi_step_natural_input_runs_two_tasks() -> None:
@@ -638,6 +689,56 @@ def test_router_recovery_snapshot_and_diagnostic() -> None:
 
     assert snapshot is not None
     assert report is not None
+    metrics = json.loads(report.read_text(encoding="utf-8"))["metrics"]
+    assert {"created", "reused", "idle", "in_use"} <= set(metrics["http_pool"])
+
+
+def test_router_restore_recovery_snapshot_bulk_imports_entries(tmp_path) -> None:
+    router = build_router(
+        session_layer=SessionLayer(session_name="restore", db_path=tmp_path / "session.db"),
+        recovery_manager=RecoveryManager(snapshot_dir=tmp_path / "recovery"),
+    )
+    router.execute("open vscode")
+    router.execute("sys info")
+    router.save_recovery_snapshot()
+    router.execute("net ip")
+
+    restored = router.restore_recovery_snapshot()
+    commands = [item.command for item in router.session_layer.entries]
+
+    assert restored == 2
+    assert commands == ["open vscode", "sys info"]
+
+
+def test_router_shares_injected_storage_engine(tmp_path) -> None:
+    from core.storage import SQLiteStorageEngine
+
+    engine = SQLiteStorageEngine(db_path=tmp_path / "oriondesk.db", pooled=True)
+    router = build_router(storage_engine=engine)
+    router.execute("sys info")
+
+    assert router.session_layer.storage_engine is engine
+    assert router.memory_engine.storage_engine is engine
+    assert router.session_layer.entries[-1].command == "sys info"
+    assert router.memory_summary()["top_commands"] == [("sys info", 1)]
+    router.shutdown()
+
+
+def test_router_memory_search_command(tmp_path) -> None:
+    from core.storage import SQLiteStorageEngine
+
+    router = build_router(storage_engine=SQLiteStorageEngine(db_path=tmp_path / "oriondesk.db"))
+    router.memory_engine.add_note("work", "rapat review vscode jam 10")
+    router.execute("open vscode")
+
+    message = router.execute("memory search vscode").message
+    repeated = router.execute("memory search vscode").message
+
+    assert "[work] rapat review [vscode]" in message
+    assert "open vscode" in message
+    assert "memory search" not in repeated.split("Riwayat:")[1]
+    assert "Tidak ada hasil memory" in router.execute("memory search kopi").message
+    router.shutdown()
 
 
 def test_router_release_channel_api() -> None:
@@ -702,6 +803,22 @@ def test_router_build_performance_baseline() -> None:
     assert baseline["startup_ms"] >= 0
 
 
+def test_router_performance_baseline_shuts_down_probe_routers(monkeypatch) -> None:
+    router = build_router()
+    stopped: list[CommandRouter] = []
+    original = CommandRouter.shutdown
+
+    def _record(self) -> None:
+        stopped.append(self)
+        original(self)
+
+    monkeypatch.setattr(CommandRouter, "shutdown", _record)
+    router.build_performance_baseline()
+
+    assert len(stopped) == 3
+    assert all(item is not router for item in stopped)
+
+
 def test_router_release_hardening_summary() -> None:
     router = build_router()
     router.build_performance_baseline()
@@ -775,3 +892,289 @@ def test_router_evaluate_auto_action_hacker_profile_keeps_higher_threshold() ->
 
     assert payload["force_confirmation"] is False
     assert payload["fatigue_penalty"] == 0.0
+
+
+def test_router_command_assist_ranks_executed_commands_first(tmp_path) -> None:
+    router = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    assert router.suggest_commands("op")[0] == "open <app_alias>"
+
+    router.route("open vscode")
+    router.route("open vscode")
+
+    assert router.suggest_commands("op")[0] == "open vscode"
+    assert router.suggest_commands("")[0] == "open vscode"
+
+    router.audit_recorder.flush()
+    restarted = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    assert restarted.suggest_commands("o")[0] == "open vscode"
+
+
+def test_router_resolves_intent_once_per_request() -> None:
+    calls: list[str] = []
+
+    class CountingIntentEngine(LocalIntentEngine):
+        def resolve(self, raw, allowed_keywords):
+            calls.append(raw)
+            return super().resolve(raw, allowed_keywords)
+
+    router = build_router(intent_engine=CountingIntentEngine())
+    router.set_chat_model_enabled(True)
+
+    result, _trace = router.execute_with_enhanced_response_trace("tolong bukakan vscode")
+
+    assert "open:vscode" in result.message
+    assert calls == ["tolong bukakan vscode"]
+
+    calls.clear()
+    router.evaluate_auto_action("tolong bukakan vscode")
+    assert calls == ["tolong bukakan vscode"]
+
+
+def test_router_intent_scope_is_shared_by_nested_entry_points() -> None:
+    router = build_router()
+
+    with router.intent_scope() as scope:
+        router.explain_intent("tolong bukakan vscode")
+        router.execute("tolong bukakan vscode")
+        router.evaluate_auto_action("tolong bukakan vscode")
+
+    assert scope.engine_calls == 1
+    assert list(scope.resolutions) == ["tolong bukakan vscode"]
+
+
+def test_router_streams_generation_tokens_to_callback() -> None:
+    class StreamingGenerationProvider(DummyGenerationProvider):
+        def generate_stream(self, prompt, system_prompt=None, cancel_event=None):
+            yield from ["Halo", ", ", "dunia"]
+
+    router = build_router()
+    router.generation_provider = StreamingGenerationProvider()
+    router.set_chat_model_enabled(True)
+    tokens: list[str] = []
+
+    payload = router.generate_reasoned_answer("jelaskan streaming token", token_callback=tokens.append)
+
+    assert tokens == ["Halo", ", ", "dunia"]
+    assert payload["mode"] == "gemma"
+    assert payload["message"] == "Halo, dunia"
+
+
+def test_router_cancelled_stream_returns_partial_answer_without_cache() -> None:
+    cancel_event = threading.Event()
+
+    class StreamingGenerationProvider(DummyGenerationProvider):
+        def generate_stream(self, prompt, system_prompt=None, cancel_event=None):
+            for token in ["satu ", "dua ", "tiga"]:
+                if cancel_event.is_set():
+                    return
+                yield token
+
+    router = build_router()
+    router.generation_provider = StreamingGenerationProvider()
+    router.set_chat_model_enabled(True)
+
+    def on_token(token: str) -> None:
+        if token.startswith("dua"):
+            cancel_event.set()
+
+    payload = router.generate_reasoned_answer(
+        "batalkan jawaban panjang",
+        token_callback=on_token,
+        cancel_event=cancel_event,
+    )
+
+    assert payload["mode"] == "cancelled"
+    assert payload["message"] == "satu dua"
+    assert router.generate_reasoned_answer("batalkan jawaban panjang")["mode"] == "gemma"
+
+
+def test_router_reason_plan_embeds_steps_in_one_batch(tmp_path) -> None:
+    batches: list[list[str]] = []
+
+    class BatchingEmbeddingProvider(DummyEmbeddingProvider):
+        def embed(self, text: str) -> list[float]:
+            raise AssertionError("single embed should not be used by reason_plan")
+
+        def embed_many(self, texts):
+            batches.append(list(texts))
+            return [[1.0] for _ in texts]
+
+    router = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    router.embedding_provider = BatchingEmbeddingProvider()
+
+    payload = router.reason_plan("buka vscode lalu cek status sistem")
+
+    assert len(batches) == 1
+    assert len(batches[0]) == len(payload["reasoning"]["decisions"]) >= 2
+
+
+def test_router_embedding_cache_persists_and_invalidates_on_model_change(tmp_path) -> None:
+    calls: list[list[str]] = []
+
+    class RecordingEmbeddingProvider(DummyEmbeddingProvider):
+        def __init__(self, model: str) -> None:
+            self.model = model
+
+        def config(self) -> EmbeddingConfig:
+            return EmbeddingConfig(model=self.model)
+
+        def embed_many(self, texts):
+            calls.append(list(texts))
+            return [[float(len(text)), 0.5] for text in texts]
+
+    router = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    router.embedding_provider = RecordingEmbeddingProvider("model-a")
+
+    assert router.embed_texts(["sys info", "open  vscode", ""]) == [[8.0, 0.5], [11.0, 0.5], []]
+    assert router.embed_text("sys info") == [8.0, 0.5]
+    assert calls == [["sys info", "open vscode"]]
+
+    restarted = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    restarted.embedding_provider = RecordingEmbeddingProvider("model-a")
+    assert restarted.embed_texts(["open vscode", "sys info"]) == [[11.0, 0.5], [8.0, 0.5]]
+    assert len(calls) == 1
+    assert restarted.runtime_metrics()["embedding_cache"]["disk_hits"] == 2
+
+    restarted.embedding_provider = RecordingEmbeddingProvider("model-b")
+    restarted.embed_text("sys info")
+    stats = restarted.runtime_metrics()["embedding_cache"]
+    assert calls[-1] == ["sys info"]
+    assert stats["invalidations"] == 1
+    assert stats["misses"] == 1
+    assert restarted.embedding_cache.repository.count("model-a") == 0
+
+
+class KeywordEmbeddingProvider(DummyEmbeddingProvider):
+    VOCABULARY = ("open", "vscode", "sys", "info", "search", "file", "backup", "notepad")
+
+    def embed(self, text: str) -> list[float]:
+        words = text.lower().split()
+        return [float(sum(word.startswith(term) for word in words)) + 0.01 for term in self.VOCABULARY]
+
+
+def test_router_vector_index_covers_archive_and_updates_on_record(tmp_path) -> None:
+    memory = MemoryEngine(storage_dir=tmp_path / "memory")
+    memory.record_command("open notepad", "success")
+    memory.add_note("kerja", "backup vscode settings tiap jumat")
+    router = build_router(memory_engine=memory)
+    router.embedding_provider = KeywordEmbeddingProvider()
+    assert router.warm_vector_index().result(timeout=5.0) is True
+
+    assert router.semantic_search("open vscode", kinds=["usage"])[0].text.startswith("open ")
+    assert router.semantic_search("vscode", kinds=["note"])[0].text == "backup vscode settings tiap jumat"
+    assert router.semantic_search("notepad", kinds=["command"])[0].text == "open notepad"
+
+    router.execute("search file laporan.pdf")
+    router.memory_engine.add_note("rapat", "search file notulen sebelum rapat")
+    expected = {("command", "search file laporan.pdf"), ("note", "search file notulen sebelum rapat")}
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline and not all(item in router.vector_index for item in expected):
+        time.sleep(0.01)
+
+    assert all(item in router.vector_index for item in expected)
+    assert router.runtime_metrics()["vector_index"]["items"] == len(router.vector_index)
+
+
+def test_router_reasoning_prompt_includes_semantic_history(tmp_path) -> None:
+    memory = MemoryEngine(storage_dir=tmp_path / "memory")
+    memory.add_note("kerja", "backup vscode settings tiap jumat")
+    router = build_router(memory_engine=memory)
+    router.embedding_provider = KeywordEmbeddingProvider()
+    router.warm_vector_index().result(timeout=5.0)
+
+    prompt = router._build_reasoning_prompt("kapan backup vscode", router.reason_plan("kapan backup vscode"))
+
+    assert "Semantically related commands and notes:" in prompt
+    assert "[note] backup vscode settings tiap jumat" in prompt
+
+
+def test_router_semantic_search_does_not_wait_for_index_build(tmp_path) -> None:
+    release = threading.Event()
+
+    class BlockingEmbeddingProvider(KeywordEmbeddingProvider):
+        def embed_many(self, texts):
+            release.wait(timeout=5.0)
+            return [self.embed(text) for text in texts]
+
+    router = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    router.embedding_provider = BlockingEmbeddingProvider()
+
+    started = time.perf_counter()
+    assert router.semantic_search("open vscode") == []
+    assert time.perf_counter() - started < 1.0
+    build = router.warm_vector_index()
+    assert build is not None and not build.done()
+
+    release.set()
+    assert build.result(timeout=5.0) is True
+    assert router.semantic_search("open vscode", kinds=["usage"])[0].text.startswith("open ")
+    assert router.runtime_metrics()["vector_index"]["ready"] is True
+    router.shutdown()
+
+
+def test_router_vector_index_retries_failed_batches(tmp_path) -> None:
+    failures = iter([TimeoutError("embed timed out")])
+
+    class FlakyEmbeddingProvider(KeywordEmbeddingProvider):
+        def embed_many(self, texts):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            return [self.embed(text) for text in texts]
+
+    router = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    router.embedding_provider = FlakyEmbeddingProvider()
+    router._vector_index_backoff_seconds = 0.0
+
+    assert router.warm_vector_index().result(timeout=5.0) is True
+    assert len(router.vector_index) == len(router.command_table.usages)
+    router.shutdown()
+
+
+def test_router_vector_index_discards_partial_build_and_backs_off(tmp_path) -> None:
+    calls: list[int] = []
+
+    class BrokenEmbeddingProvider(KeywordEmbeddingProvider):
+        def embed_many(self, texts):
+            calls.append(len(texts))
+            if len(calls) > 1:
+                raise TimeoutError("embed timed out")
+            return [self.embed(text) for text in texts]
+
+    router = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+    router.embedding_provider = BrokenEmbeddingProvider()
+    router._vector_index_batch_size = 4
+    router._vector_index_backoff_seconds = 0.0
+
+    assert router.warm_vector_index().result(timeout=5.0) is False
+    assert len(calls) == 1 + router._vector_index_attempts
+    assert router.vector_index is None
+    assert router.semantic_search("open vscode") == []
+    assert router.warm_vector_index() is None
+    router.shutdown()
+
+
+
+def test_router_retention_purge_is_opt_in(monkeypatch) -> None:
+    monkeypatch.delenv("ORIONDESK_RETENTION_DAYS", raising=False)
+    default = build_router()
+    assert default.retention_job.retention_days is None
+    assert default.retention_job.session_retention_days is None
+
+    monkeypatch.setenv("ORIONDESK_RETENTION_DAYS", "90")
+    configured = build_router()
+    assert configured.retention_job.retention_days == 90
+    assert configured.retention_job.session_retention_days == 90
+
+
+def test_router_suggestion_index_seeds_from_successful_history_only(tmp_path) -> None:
+    memory = MemoryEngine(storage_dir=tmp_path / "memory")
+    memory.record_command("open vscode", "success")
+    for status in ("blocked", "invalid", "dangerous"):
+        memory.record_command("open secret vault", status)
+
+    router = build_router(memory_engine=MemoryEngine(storage_dir=tmp_path / "memory"))
+
+    assert router.suggestion_index.frequency("open vscode") == 1
+    assert router.suggestion_index.frequency("open secret vault") == 0
+    assert "open secret vault" not in router.suggest_commands("open s")
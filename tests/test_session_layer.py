@@ -43,4 +43,88 @@ def test_session_persists_across_instances(tmp_path) -> None:
     recent = second.recent(limit=5)
 
     assert len(recent) == 1
-    assert recent[0].command == "open vscode"
\ No newline at end of file
+    assert recent[0].command == "open vscode"
+
+def test_session_import_json_bulk_inserts_entries(tmp_path) -> None:
+    source = SessionLayer(session_name="import", db_path=tmp_path / "source.db")
+    source.record("open vscode", "ok", "success")
+    source.record("sys info", "ok", "success")
+    exported = source.export_json(tmp_path / "session.json")
+
+    target = SessionLayer(session_name="import", db_path=tmp_path / "target.db")
+    target.record("net ip", "ok", "success")
+
+    assert target.import_json(exported) == 2
+    assert [item.command for item in target.entries] == ["net ip", "open vscode", "sys info"]
+    assert target.import_json(exported, replace=True) == 2
+    assert [item.command for item in target.entries] == ["open vscode", "sys info"]
+
+
+def test_session_stats_uses_maintained_status_counts(tmp_path) -> None:
+    session = SessionLayer(session_name="stats", db_path=tmp_path / "session_stats.db")
+    other = SessionLayer(session_name="other", db_path=tmp_path / "session_stats.db")
+    session.record("open vscode", "ok", "success")
+    session.record("shutdown", "blocked", "blocked")
+    session.record("delete x", "confirm?", "pending_confirmation")
+    other.record("sys info", "ok", "success")
+
+    stats = session.stats(recent_limit=2)
+
+    assert stats.total == 3
+    assert stats.counts_by_status == {"success": 1, "blocked": 1, "pending_confirmation": 1}
+    assert stats.count("blocked", "failed") == 1
+    assert stats.first_timestamp == session.entries[0].timestamp
+    assert [item.command for item in stats.recent] == ["shutdown", "delete x"]
+
+    session.clear()
+    cleared = session.stats()
+    assert cleared.total == 0
+    assert cleared.first_timestamp is None
+    assert other.stats().total == 1
+
+
+def test_session_and_memory_share_injected_engine(tmp_path) -> None:
+    from core.memory_engine import MemoryEngine
+    from core.storage import SQLiteStorageEngine
+
+    engine = SQLiteStorageEngine(db_path=tmp_path / "unified.db", pooled=True)
+    session = SessionLayer(session_name="shared", storage_engine=engine, storage_dir=tmp_path / "session")
+    memory = MemoryEngine(storage_dir=tmp_path / "memory", storage_engine=engine)
+
+    session.record("sys info", "ok", "success")
+    memory.record_command("sys info", "success")
+
+    assert session.storage_engine is memory.storage_engine
+    assert engine.table_count("session_logs") == 1
+    assert engine.table_count("commands") == 1
+    assert not (tmp_path / "memory" / "memory.db").exists()
+    assert engine.pool_stats()["open"] == 1
+    engine.close()
+
+
+def test_session_streaming_exports_page_through_history(tmp_path) -> None:
+    session = SessionLayer(session_name="stream", db_path=tmp_path / "session_stream.db")
+    other = SessionLayer(session_name="other", db_path=tmp_path / "session_stream.db")
+    session.record_many([session.build_entry(f"cmd-{index}", "ok", "success") for index in range(5)])
+    other.record("ignored", "ok", "success")
+
+    payload = json.loads(session.export_json(tmp_path / "stream.json", page_size=2).read_text(encoding="utf-8"))
+    lines = session.export_jsonl(tmp_path / "stream.jsonl", page_size=2).read_text(encoding="utf-8").splitlines()
+
+    assert payload["count"] == 5
+    assert [item["command"] for item in payload["entries"]] == [f"cmd-{index}" for index in range(5)]
+    assert [json.loads(line)["command"] for line in lines] == [f"cmd-{index}" for index in range(5)]
+    assert [item.command for item in session.iter_entries(page_size=2)][-1] == "cmd-4"
+
+
+def test_session_search_is_scoped_to_session(tmp_path) -> None:
+    session = SessionLayer(session_name="alpha", db_path=tmp_path / "session_search.db")
+    other = SessionLayer(session_name="beta", db_path=tmp_path / "session_search.db")
+    session.record("open vscode", "VS Code dibuka", "success")
+    session.record("sys info", "CPU 12%", "success")
+    other.record("open vscode", "VS Code dibuka", "success")
+
+    hits = session.search("vscode")
+
+    assert [hit.entry.command for hit in hits] == ["open vscode"]
+    assert hits[0].score < 0
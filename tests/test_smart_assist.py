@@ -1,8 +1,10 @@
-from core.smart_assist import SmartAssistEngine
+from core.smart_assist import BKTree, DeletionIndex, SmartAssistEngine, bounded_levenshtein
 from core.router import CommandRouter
 
 
 class DummyLauncher:
+    alias_map = {"vscode": "code", "chrome": "chrome", "notepad": "notepad"}
+
     def open_app(self, alias: str) -> str:
         return f"open:{alias}"
 
@@ -55,3 +57,59 @@ def test_router_confirm_autocorrect_executes_corrected_command() -> None:
     confirmed = router.confirm_pending(True)
 
     assert "open:vscode" in confirmed.message
+
+
+def test_bounded_levenshtein_stops_past_limit() -> None:
+    assert bounded_levenshtein("kitten", "sitting", 5) == 3
+    assert bounded_levenshtein("kitten", "sitting", 2) == 3
+    assert bounded_levenshtein("a", "abcdef", 1) == 2
+    assert bounded_levenshtein("", "abc", 3) == 3
+
+
+def test_bk_tree_search_matches_linear_scan() -> None:
+    terms = ["open", "search", "sys", "proj", "profile", "capability", "clip", "focus", "smart", "memory"]
+    tree = BKTree(terms)
+
+    assert len(tree) == len(terms)
+    for query in ("opne", "serch", "prof", "cpability", "x"):
+        for radius in range(4):
+            expected = {
+                (term, bounded_levenshtein(query, term, 99))
+                for term in terms
+                if bounded_levenshtein(query, term, 99) <= radius
+            }
+            assert set(tree.search(query, radius)) == expected
+
+
+def test_deletion_index_finds_every_term_within_two_edits() -> None:
+    terms = ["vscode", "notepad", "chrome", "orion-desk", "oriondesk"]
+    index = DeletionIndex(terms)
+
+    assert set(index.search("vscod", 2)) == {("vscode", 1)}
+    assert set(index.search("chorme", 2)) == {("chrome", 2)}
+    assert set(index.search("oriondsk", 2)) == {("oriondesk", 1), ("orion-desk", 2)}
+    assert index.search("chorme", 1) == []
+
+
+def test_smart_assist_keeps_first_keyword_on_tied_scores() -> None:
+    assist = SmartAssistEngine()
+    correction = assist.autocorrect("sus", ["sys", "sum"])
+
+    assert correction is not None
+    assert correction.corrected == "sys"
+
+
+def test_router_autocorrects_app_alias_and_project_name(tmp_path) -> None:
+    router = build_router()
+    result = router.execute("open vscod")
+
+    assert result.requires_confirmation is True
+    assert result.pending_command == "open vscode"
+    assert "open:vscode" in router.confirm_pending(True).message
+
+    router.project_manager.register("orion-desk", tmp_path)
+    result = router.execute("proj open orion-dsk")
+
+    assert result.pending_command == "proj open orion-desk"
+    assert "siap dibuka" in router.confirm_pending(True).message
+    assert router.execute("open vscode").message == "open:vscode"
@@ -1,3 +1,5 @@
+import pytest
+
 from core.storage import (
     CommandHistoryRepository,
     NoteRepository,
@@ -20,7 +22,7 @@ def test_sqlite_repositories_roundtrip(tmp_path) -> None:
     commands.add("open vscode", "success", "2026-02-18T10:01:00+00:00")
 
     assert preferences.get("theme") == "dark"
-    assert notes.recent(limit=1)[0]["tag"] == "dev"
+    assert notes.recent(limit=1)[0].tag == "dev"
     assert commands.top_commands(limit=1) == [("open vscode", 2)]
 
 
@@ -31,3 +33,224 @@ def test_sqlite_migrations_applied(tmp_path) -> None:
     applied = engine.fetch_all("SELECT version FROM schema_migrations ORDER BY version ASC")
 
     assert any(version == "0001_initial.sql" for version, in applied)
+
+
+def test_sqlite_pooled_engine_reuses_connections_with_wal(tmp_path) -> None:
+    engine = SQLiteStorageEngine(db_path=tmp_path / "pooled.db", pooled=True, pool_size=2)
+    commands = CommandHistoryRepository(engine)
+
+    for index in range(5):
+        commands.add("sys info", "success", f"2026-02-18T10:0{index}:00+00:00")
+
+    journal_mode = engine.fetch_one("PRAGMA journal_mode")[0]
+    stats = engine.pool_stats()
+
+    assert journal_mode == "wal"
+    assert stats["open"] == 1
+    assert stats["idle"] == 1
+    assert commands.top_commands(limit=1) == [("sys info", 5)]
+
+    engine.close()
+    assert engine.pool_stats()["open"] == 0
+    assert engine.table_count("commands") == 5
+
+
+def test_sqlite_pooled_engine_is_thread_safe(tmp_path) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    engine = SQLiteStorageEngine(db_path=tmp_path / "threads.db", pooled=True, pool_size=2)
+    notes = NoteRepository(engine)
+
+    def _write(index: int) -> None:
+        notes.add("worker", f"note-{index}", "2026-02-18T10:00:00+00:00")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_write, range(40)))
+
+    assert engine.table_count("notes") == 40
+    assert engine.pool_stats()["open"] <= 2
+    engine.close()
+
+
+def test_sqlite_repositories_add_many_in_single_transaction(tmp_path) -> None:
+    engine = SQLiteStorageEngine(db_path=tmp_path / "bulk.db")
+    notes = NoteRepository(engine)
+    commands = CommandHistoryRepository(engine)
+    preferences = PreferenceRepository(engine)
+
+    inserted = commands.add_many(
+        ("sys info", "success", f"2026-02-18T10:00:{index:02d}+00:00") for index in range(50)
+    )
+    notes.add_many([("dev", "bulk note", "2026-02-18T10:00:00+00:00")])
+    preferences.set_many([("theme", "dark"), ("persona", "calm")])
+
+    assert inserted == 50
+    assert commands.top_commands(limit=1) == [("sys info", 50)]
+    assert notes.recent(limit=1)[0].text == "bulk note"
+    assert preferences.all() == {"theme": "dark", "persona": "calm"}
+
+
+def test_sqlite_add_many_rolls_back_on_error(tmp_path) -> None:
+    import sqlite3
+
+    engine = SQLiteStorageEngine(db_path=tmp_path / "rollback.db")
+    commands = CommandHistoryRepository(engine)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        commands.add_many([("sys info", "success", "2026-02-18T10:00:00+00:00"), ("broken", None, "x")])
+
+    assert engine.table_count("commands") == 0
+
+
+def test_command_stats_table_tracks_inserts_and_purges(tmp_path) -> None:
+    engine = SQLiteStorageEngine(db_path=tmp_path / "stats.db")
+    commands = CommandHistoryRepository(engine)
+
+    commands.add("open vscode", "success", "2026-02-10T10:00:00+00:00")
+    commands.add("open vscode", "success", "2026-02-18T10:00:00+00:00")
+    commands.add("open vscode", "success", "2026-02-18T10:45:00+00:00")
+    commands.add("sys info", "success", "2026-02-18T11:00:00+00:00")
+
+    assert commands.top_commands(limit=5) == [("open vscode", 3), ("sys info", 1)]
+    # 10:00 shares the threshold's hourly bucket but falls outside the window.
+    assert commands.top_commands_since("2026-02-18T10:30:00+00:00", limit=5) == [
+        ("open vscode", 1),
+        ("sys info", 1),
+    ]
+
+    commands.purge_older_than("2026-02-15T00:00:00+00:00")
+
+    assert commands.top_commands(limit=5) == [("open vscode", 2), ("sys info", 1)]
+    assert engine.table_count("command_stats_hourly") == 2
+
+    commands.clear()
+    assert commands.top_commands(limit=5) == []
+    assert engine.table_count("command_stats") == 0
+
+
+def test_command_stats_migration_backfills_existing_history(tmp_path) -> None:
+    import sqlite3
+
+    db_path = tmp_path / "legacy.db"
+    initial_only = tmp_path / "migrations"
+    initial_only.mkdir()
+    source = SQLiteStorageEngine(db_path=tmp_path / "current.db").migrations_dir / "0001_initial.sql"
+    (initial_only / source.name).write_text(source.read_text(encoding="utf-8"), encoding="utf-8")
+    legacy = SQLiteStorageEngine(db_path=db_path, migrations_dir=initial_only)
+    legacy.execute(
+        "INSERT INTO commands(command, status, created_at) VALUES (?, ?, ?)",
+        ("net ip", "success", "2026-02-18T10:00:00+00:00"),
+    )
+
+    upgraded = SQLiteStorageEngine(db_path=db_path)
+
+    assert CommandHistoryRepository(upgraded).top_commands(limit=1) == [("net ip", 1)]
+    with sqlite3.connect(db_path) as connection:
+        versions = [row[0] for row in connection.execute("SELECT version FROM schema_migrations ORDER BY version")]
+    assert versions[:2] == ["0001_initial.sql", "0002_command_stats.sql"]
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_sqlite_chunked_purge_and_incremental_compaction(tmp_path, pooled: bool) -> None:
+    engine = SQLiteStorageEngine(db_path=tmp_path / "compact.db", pooled=pooled)
+    notes = NoteRepository(engine)
+    notes.add_many(("bulk", "x" * 512, "2020-01-01T00:00:00+00:00") for _ in range(400))
+    chunks: list[int] = []
+
+    removed = notes.purge_older_than("2021-01-01T00:00:00+00:00", chunk_size=150, on_chunk=chunks.append)
+    result = engine.compact()
+
+    assert removed == 400
+    assert chunks == [150, 150, 100]
+    assert engine.fetch_one("PRAGMA auto_vacuum")[0] == 2
+    assert result["reclaimed_pages"] > 10
+    assert result["freelist_after"] == 0
+    engine.close()
+
+
+def test_sqlite_existing_database_is_converted_to_incremental_auto_vacuum(tmp_path) -> None:
+    import sqlite3
+
+    db_path = tmp_path / "legacy_vacuum.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE legacy (value TEXT)")
+    connection.close()
+
+    engine = SQLiteStorageEngine(db_path=db_path, pooled=True)
+    assert engine.fetch_one("PRAGMA auto_vacuum")[0] == 0
+
+    assert engine.compact()["converted"] == 1
+    assert engine.fetch_one("PRAGMA auto_vacuum")[0] == 2
+    assert engine.compact()["converted"] == 0
+    assert engine.fetch_one("PRAGMA journal_mode")[0] == "wal"
+    assert engine.table_count("legacy") == 0
+    engine.close()
+
+
+def test_sqlite_schema_version_fast_path_skips_migration_scan(tmp_path) -> None:
+    import sqlite3
+
+    from core.storage import sqlite_engine
+
+    db_path = tmp_path / "fast.db"
+    first = SQLiteStorageEngine(db_path=db_path)
+    expected = len(list(first.migrations_dir.glob("*.sql")))
+    assert first.schema_version() == expected
+
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("PRAGMA user_version=0")
+    SQLiteStorageEngine(db_path=db_path)
+    assert first.schema_version() == 0
+
+    sqlite_engine._VERIFIED_SCHEMAS.clear()
+    SQLiteStorageEngine(db_path=db_path)
+    assert first.schema_version() == expected
+
+
+def test_sqlite_keyset_iteration_crosses_page_boundaries(tmp_path) -> None:
+    engine = SQLiteStorageEngine(db_path=tmp_path / "storage" / "keyset.db")
+    commands = CommandHistoryRepository(engine)
+    commands.add_many([(f"cmd-{index}", "success", "2026-02-18T10:00:00+00:00") for index in range(5)])
+
+    rows = list(commands.iter_all(page_size=2))
+
+    assert [row.command for row in rows] == [f"cmd-{index}" for index in range(5)]
+
+
+def test_sqlite_fulltext_search_ranks_and_tracks_deletes(tmp_path) -> None:
+    engine = SQLiteStorageEngine(db_path=tmp_path / "storage" / "fts.db")
+    notes = NoteRepository(engine)
+    notes.add_many(
+        [
+            ("work", "deploy report ke server staging", "2026-02-18T10:00:00+00:00"),
+            ("work", "report report report mingguan", "2026-02-18T10:01:00+00:00"),
+            ("home", "beli kopi", "2026-02-18T10:02:00+00:00"),
+        ]
+    )
+
+    hits = notes.search("repo")
+
+    assert [hit.text for hit in hits] == ["report report report mingguan", "deploy report ke server staging"]
+    assert "[report]" in hits[0].snippet
+    assert notes.search("\"-*") == []
+
+    notes.purge_older_than("2026-02-18T10:01:30+00:00")
+    assert notes.search("report") == []
+    assert notes.search("kopi")[0].tag == "home"
+
+
+def test_sqlite_repositories_return_compact_rows(tmp_path) -> None:
+    from core.storage import SessionLogRepository, SessionLogRow
+
+    engine = SQLiteStorageEngine(db_path=tmp_path / "storage" / "rows.db", pooled=True, statement_cache_size=16)
+    sessions = SessionLogRepository(engine)
+    sessions.add_many("rows", [("2026-02-18T10:00:00+00:00", "sys info", "ok", "success")])
+
+    row = sessions.recent("rows", limit=40)[0]
+
+    assert type(row) is SessionLogRow
+    assert row.command == "sys info"
+    assert row._asdict()["status"] == "success"
+    assert not hasattr(row, "__dict__")
+    engine.close()
@@ -0,0 +1,51 @@
+from core.suggestion_index import SuggestionIndex
+
+
+def _build_index(history=()) -> SuggestionIndex:
+    return SuggestionIndex.build(
+        usages=("open <app>", "search file <query>", "sys info"),
+        argument_map={"open": ["vscode", "chrome"], "sys": ["info"]},
+        history=history,
+        keywords={"open", "search", "sys"},
+    )
+
+
+def test_suggestion_index_matches_prefixes_in_usage_order() -> None:
+    index = _build_index()
+
+    assert index.suggest("", limit=3) == ["open <app>", "search file <query>", "sys info"]
+    assert index.suggest("se") == ["search file <query>"]
+    assert index.suggest("open v") == ["open vscode"]
+    assert index.suggest("xyz") == []
+
+
+def test_suggestion_index_incremental_queries_match_fresh_lookups() -> None:
+    index = _build_index()
+    fresh = _build_index()
+
+    for typed in ("o", "op", "open", "open ", "open c", "ope", "s", "sx", "sxy", "sy"):
+        assert index.suggest(typed) == fresh.suggest(typed) == _build_index().suggest(typed)
+
+
+def test_suggestion_index_ranks_by_history_frequency() -> None:
+    index = _build_index(history=[("open chrome", 4), ("sys info", 2), ("<confirm>", 9), ("rm -rf", 3)])
+
+    assert index.suggest("", limit=2) == ["open chrome", "open <app>"]
+    assert index.suggest("open") == ["open chrome", "open <app>", "open vscode"]
+    assert index.frequency("<confirm>") == 0
+    assert len(index) == 5
+
+    index.record("sys info", count=5)
+    assert index.suggest("", limit=1) == ["sys info"]
+    index.record("open notepad", keywords={"open", "search", "sys"})
+    assert "open notepad" in index.suggest("open n")
+
+
+def test_suggestion_index_finds_command_recorded_after_a_missed_query() -> None:
+    index = _build_index()
+
+    assert index.suggest("open vscodex") == []
+    index.record("open vscodex")
+
+    assert index.suggest("open vscodex") == ["open vscodex"]
+    assert index.suggest("open vscodex --new") == []
@@ -1,5 +1,6 @@
 from PySide6.QtWidgets import QApplication
 from pathlib import Path
+import time
 
 from core.router import CommandRouter
 from ui.main_window import MainWindow
@@ -12,6 +13,16 @@ def _app() -> QApplication:
     return app
 
 
+def _wait_until(app: QApplication, predicate, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
 def test_main_window_has_phase18_tabs() -> None:
     app = _app()
     window = MainWindow(router=CommandRouter())
@@ -64,14 +75,11 @@ def test_phase19_command_assist_updates() -> None:
     app.processEvents()
 
     window.command_input.setText("sys")
-    app.processEvents()
-
-    assert "sys info" in window.command_hint_label.text()
+    assert _wait_until(app, lambda: "sys info" in window.command_hint_label.text())
     assert "sys info" in window.command_suggestions.text()
 
     window.command_input.setText("tolong bukakan vscode")
-    app.processEvents()
-    assert "Did you mean" in window.intent_hint_label.text()
+    assert _wait_until(app, lambda: "Did you mean" in window.intent_hint_label.text())
 
     window.close()
 
@@ -99,12 +107,34 @@ def test_phase24_command_assist_argument_hints() -> None:
     app.processEvents()
 
     window.command_input.setText("capability")
+    assert _wait_until(app, lambda: "Args:" in window.command_hint_label.text())
+    assert "file list <path>" in window.command_hint_label.text()
+
+    window.close()
+
+
+def test_command_assist_debounces_and_drops_stale_results() -> None:
+    app = _app()
+    window = MainWindow(router=CommandRouter())
     app.processEvents()
+    calls: list[str] = []
+    original = window.router.command_assist
+    window.router.command_assist = lambda text, limit=5: (calls.append(text), original(text, limit))[1]
 
-    assert "Args:" in window.command_hint_label.text()
-    assert "file list <path>" in window.command_hint_label.text()
+    for text in ("s", "sy", "sys"):
+        window.command_input.setText(text)
+    assert window.command_hint_label.text() == "Usage: -"
+    assert _wait_until(app, lambda: "sys info" in window.command_hint_label.text())
+    assert calls == ["sys"]
+
+    stale_request = window.command_assist.request_id
+    window.command_input.setText("capability")
+    window.command_assist._handle_ready(stale_request, original("open"))
+    assert "open" not in window.command_hint_label.text()
+    assert _wait_until(app, lambda: "file list <path>" in window.command_hint_label.text())
 
     window.close()
+    assert window.command_assist._thread is None
 
 
 def test_search_command_runs_in_async_mode() -> None:
@@ -1,4 +1,8 @@
+import tempfile
+from pathlib import Path
+
 from core.executor import ErrorCode
+from core.observability import StructuredLogger
 from core.router import CommandRouter
 
 
@@ -19,6 +23,7 @@ class DummySystemTools:
 
 def build_router() -> CommandRouter:
     return CommandRouter(
+        logger=StructuredLogger(log_dir=Path(tempfile.mkdtemp(prefix="oriondesk-logs-"))),
         launcher=DummyLauncher(),
         file_manager=DummyFileManager(),
         system_tools=DummySystemTools(),
@@ -67,3 +72,22 @@ def test_logger_contains_execution_context_metadata() -> None:
     assert metadata["status"] == "success"
     assert context["session_id"] == router.session_id
     assert context["profile_policy"] in {"strict", "power"}
+
+
+def test_execution_context_base_is_built_once_per_session() -> None:
+    from datetime import datetime
+
+    router = build_router()
+    first = router.execute_enveloped("open vscode").context
+    second = router.execute_enveloped("sys info").context
+    base = router._execution_context_base
+    router.execution_profile_policy.set_profile("strict")
+    third = router.execute_enveloped("sys info").context
+
+    assert router._execution_context_base is not base
+    assert router._execution_context_base.user == base.user
+    assert first.user == second.user == base.user
+    assert second.monotonic >= first.monotonic
+    assert third.profile_policy == "strict"
+    assert datetime.fromisoformat(first.timestamp).tzinfo is not None
+    assert first.to_dict()["timestamp"] == first.timestamp
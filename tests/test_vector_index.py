@@ -0,0 +1,51 @@
+import pytest
+
+from core.vector_index import KIND_COMMAND, KIND_NOTE, VectorIndex
+
+
+def _index(use_numpy: bool) -> VectorIndex:
+    index = VectorIndex(use_numpy=use_numpy)
+    index.add_many(
+        [
+            (KIND_COMMAND, "open vscode", [1.0, 0.0, 0.0]),
+            (KIND_COMMAND, "sys info", [0.0, 1.0, 0.0]),
+            (KIND_NOTE, "vscode workspace ada di D:/proj", [0.9, 0.1, 0.0]),
+            (KIND_COMMAND, "search file laporan.pdf", [0.0, 0.2, 1.0]),
+        ]
+    )
+    return index
+
+
+def test_vector_index_ranks_by_cosine_and_filters_kinds() -> None:
+    index = _index(use_numpy=False)
+
+    hits = index.search([2.0, 0.1, 0.0], limit=2)
+    assert [hit.text for hit in hits] == ["open vscode", "vscode workspace ada di D:/proj"]
+    assert hits[0].score > hits[1].score > 0.9
+
+    notes = index.search([1.0, 0.0, 0.0], limit=3, kinds=[KIND_NOTE])
+    assert [hit.kind for hit in notes] == [KIND_NOTE]
+
+    assert [hit.text for hit in index.search([0.0, 0.0, 1.0], limit=4, min_score=0.5)] == ["search file laporan.pdf"]
+
+
+def test_vector_index_skips_duplicates_bad_dimensions_and_zero_vectors() -> None:
+    index = _index(use_numpy=False)
+
+    assert index.add(KIND_COMMAND, "open vscode", [0.0, 0.0, 1.0]) is False
+    assert index.add(KIND_COMMAND, "net ip", [1.0, 1.0]) is False
+    assert index.add(KIND_COMMAND, "kosong", [0.0, 0.0, 0.0]) is False
+    assert index.add(KIND_COMMAND, "net ip", [0.0, 1.0, 1.0]) is True
+    assert len(index) == 5
+    assert index.search([1.0, 1.0], limit=3) == []
+
+
+def test_vector_index_numpy_backend_matches_python_backend() -> None:
+    pytest.importorskip("numpy")
+    query = [0.7, 0.3, 0.2]
+
+    python_hits = _index(use_numpy=False).search(query, limit=4)
+    numpy_hits = _index(use_numpy=True).search(query, limit=4)
+
+    assert [hit.text for hit in numpy_hits] == [hit.text for hit in python_hits]
+    assert [hit.score for hit in numpy_hits] == pytest.approx([hit.score for hit in python_hits], abs=1e-3)
@@ -128,6 +128,8 @@ class ChatSurface(QScrollArea):
         self._max_messages = 200
         self._typing_dots = 0
         self._typing_bubble: ChatBubbleWidget | None = None
+        self._stream_bubble: ChatBubbleWidget | None = None
+        self._stream_chunks: list[str] = []
         self._typing_stage = "impact_assessment"
         self._typing_expected_ms = 150.0
         self._typing_timer = QTimer(self)
@@ -152,6 +154,9 @@ class ChatSurface(QScrollArea):
         self.add_message(text=text, is_user=False)
 
     def add_message(self, text: str, is_user: bool, subtitle: str | None = None) -> None:
+        if not is_user and self._stream_bubble is not None:
+            self.finish_stream(text)
+            return
         should_follow_tail = self._is_near_bottom()
         bubble = ChatBubbleWidget(text=text, is_user=is_user, theme=self._theme, subtitle=subtitle, parent=self.container)
         self.messages_layout.insertWidget(self.messages_layout.count() - 1, bubble)
@@ -165,8 +170,51 @@ class ChatSurface(QScrollArea):
         else:
             QTimer.singleShot(0, self._scroll_to_bottom)
 
+    def append_stream_token(self, token: str) -> None:
+        if not token:
+            return
+        should_follow_tail = self._is_near_bottom()
+        self._stream_chunks.append(token)
+        text = "".join(self._stream_chunks)
+        if self._stream_bubble is None:
+            self.hide_typing_indicator()
+            self._stream_bubble = ChatBubbleWidget(
+                text=text,
+                is_user=False,
+                theme=self._theme,
+                subtitle="streaming",
+                parent=self.container,
+            )
+            self._stream_bubble.setObjectName("chatStreamRow")
+            self.messages_layout.insertWidget(self.messages_layout.count() - 1, self._stream_bubble)
+        else:
+            self._stream_bubble.message_label.setText(text)
+        if should_follow_tail:
+            QTimer.singleShot(0, self._scroll_to_bottom)
+
+    def finish_stream(self, final_text: str | None = None) -> bool:
+        bubble = self._stream_bubble
+        if bubble is None:
+            return False
+        text = final_text if final_text is not None else "".join(self._stream_chunks)
+        self._stream_bubble = None
+        self._stream_chunks = []
+        bubble.setObjectName("chatBubbleRow")
+        bubble.message_label.setText(text)
+        if bubble.subtitle_label is not None:
+            bubble.subtitle_label.setVisible(False)
+        self._history.append((text, False, None))
+        self._prune_old_messages()
+        QTimer.singleShot(0, self._scroll_to_bottom)
+        return True
+
+    def is_streaming(self) -> bool:
+        return self._stream_bubble is not None
+
     def clear(self) -> None:
         self._history = []
+        self._stream_bubble = None
+        self._stream_chunks = []
         self.hide_typing_indicator()
         for index in reversed(range(self.messages_layout.count() - 1)):
             item = self.messages_layout.itemAt(index)
@@ -226,6 +274,9 @@ class ChatSurface(QScrollArea):
         self.scroll_to_latest()
 
     def update_typing_stage(self, stage: str, elapsed_ms: float) -> None:
+        if self._stream_bubble is not None:
+            # Tokens are already visible; late stage telemetry must not bring the indicator back.
+            return
         self._typing_stage = self._normalize_stage(stage)
         self._typing_expected_ms = max(1.0, float(elapsed_ms))
         if self.typing_indicator.isHidden():
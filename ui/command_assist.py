@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+
+from core.router import CommandAssist, CommandRouter
+
+ASSIST_DEBOUNCE_MS = 80
+
+
+class CommandAssistWorker(QObject):
+    assistReady = Signal(int, object)
+
+    def __init__(self, router: CommandRouter) -> None:
+        super().__init__()
+        self.router = router
+        self.latest_request = 0
+
+    def compute(self, request_id: int, text: str) -> None:
+        # Requests queued behind a newer keystroke are skipped without touching the router.
+        if request_id != self.latest_request:
+            return
+        assist = self.router.command_assist(text)
+        if request_id == self.latest_request:
+            self.assistReady.emit(request_id, assist)
+
+
+class CommandAssistController(QObject):
+    assistRequested = Signal(int, str)
+    assistReady = Signal(object)
+
+    def __init__(self, router: CommandRouter, debounce_ms: int = ASSIST_DEBOUNCE_MS, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.router = router
+        self.request_id = 0
+        self._pending_text = ""
+        self._thread: QThread | None = None
+        self._worker: CommandAssistWorker | None = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(0, debounce_ms))
+        self._timer.timeout.connect(self._dispatch)
+
+    def schedule(self, text: str) -> None:
+        self._next_request()
+        self._pending_text = text
+        self._timer.start()
+
+    def compute_now(self, text: str) -> CommandAssist:
+        self._next_request()
+        self._timer.stop()
+        return self.router.command_assist(text)
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._next_request()
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+            self._thread, self._worker = None, None
+
+    def _next_request(self) -> int:
+        self.request_id += 1
+        if self._worker is not None:
+            self._worker.latest_request = self.request_id
+        return self.request_id
+
+    def _dispatch(self) -> None:
+        if self._thread is None:
+            worker = CommandAssistWorker(self.router)
+            thread = QThread(self)
+            worker.moveToThread(thread)
+            self.assistRequested.connect(worker.compute)
+            worker.assistReady.connect(self._handle_ready)
+            thread.finished.connect(worker.deleteLater)
+            self._thread, self._worker = thread, worker
+            thread.start()
+        self._worker.latest_request = self.request_id
+        self.assistRequested.emit(self.request_id, self._pending_text)
+
+    def _handle_ready(self, request_id: int, assist: CommandAssist) -> None:
+        if request_id == self.request_id:
+            self.assistReady.emit(assist)
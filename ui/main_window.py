@@ -8,12 +8,13 @@ from PySide6.QtSvgWidgets import QSvgWidget
 from PySide6.QtWidgets import QHBoxLayout, QLabel, QMainWindow, QMenu, QStyle, QSystemTrayIcon, QTabWidget, QVBoxLayout, QWidget
 from core.app_metadata import APP_BUILD_FOCUS, APP_MODE, APP_NAME, APP_VERSION
 from core.hotkey_manager import GlobalHotkeyManager
-from core.router import CommandRouter
+from core.router import CommandAssist, CommandRouter
 from persona.persona_engine import PersonaEngine
+from ui.command_assist import CommandAssistController
 from ui.pages import AboutPage, CommandPage, DiagnosticsPage, MemoryPage, SettingsPage
 from ui.style_layers import build_main_window_stylesheet
 from ui.theme_tokens import default_dark_tokens, default_light_tokens
-from ui.window_helpers import CommandWorker, memory_insight_payload, show_confirmation_dialog
+from ui.window_helpers import CommandWorker, memory_insight_payload, show_confirmation_dialog, start_command_worker
 from ui.win11_effects import apply_mica_or_acrylic
 WM_HOTKEY, HOTKEY_ID = 0x0312, 1
 class MainWindow(QMainWindow):
@@ -31,6 +32,7 @@ class MainWindow(QMainWindow):
         self.tray_icon: QSystemTrayIcon | None = None
         self._active_thread: QThread | None = None
         self._active_worker: CommandWorker | None = None
+        self.command_assist = CommandAssistController(router, parent=self)
         self.message_count, self.command_count = 0, 0
         self.setWindowTitle("OrionDesk")
         self.resize(800, 480)
@@ -114,7 +116,7 @@ class MainWindow(QMainWindow):
     def _wire_signals(self) -> None:
         self.execute_button.clicked.connect(self._handle_execute)
         self.command_input.returnPressed.connect(self._handle_execute)
-        self.command_input.textChanged.connect(self._refresh_command_assist)
+        self.command_input.textChanged.connect(self.command_assist.schedule); self.command_assist.assistReady.connect(self._apply_command_assist)
         self.persona_selector.currentTextChanged.connect(self._handle_persona_change)
         self.theme_selector.currentTextChanged.connect(self._handle_theme_change)
         self.channel_selector.currentTextChanged.connect(self._handle_channel_change)
@@ -257,19 +259,16 @@ class MainWindow(QMainWindow):
         state = self.router.set_chat_model_enabled(enabled)
         self.settings_status.setText(f"Chat model: {'on' if state else 'off'}")
     def _refresh_command_assist(self, text: str) -> None:
-        suggestions = self.router.suggest_commands(text)
-        self.command_suggestions.setText(f"Suggestions: {' | '.join(suggestions)}" if suggestions else "Suggestions: -")
-        usage_hint = self.router.usage_hint(text)
-        argument_hint = self.router.argument_hint(text)
-        if usage_hint is None:
+        self._apply_command_assist(self.command_assist.compute_now(text))
+    def _apply_command_assist(self, assist: CommandAssist) -> None:
+        self.command_suggestions.setText(f"Suggestions: {' | '.join(assist.suggestions)}" if assist.suggestions else "Suggestions: -")
+        if assist.usage_hint is None:
             self.command_hint_label.setText("Usage: -")
+        elif assist.argument_hint:
+            self.command_hint_label.setText(f"Usage: {assist.usage_hint} | Args: {assist.argument_hint}")
         else:
-            if argument_hint:
-                self.command_hint_label.setText(f"Usage: {usage_hint} | Args: {argument_hint}")
-            else:
-                self.command_hint_label.setText(f"Usage: {usage_hint}")
-        intent_explanation = self.router.explain_intent(text)
-        self.intent_hint_label.setText("Intent: -" if not intent_explanation else f"Intent: {intent_explanation}")
+            self.command_hint_label.setText(f"Usage: {assist.usage_hint}")
+        self.intent_hint_label.setText("Intent: -" if not assist.intent_explanation else f"Intent: {assist.intent_explanation}")
     def _append_welcome_message(self) -> None:
         self._append_chat_bubble(
             "Halo! Saya OrionDesk AI Assistant. Saya siap membantu Anda mengelola sistem. Ketik command atau pilih quick action di samping.",
@@ -326,19 +325,13 @@ class MainWindow(QMainWindow):
         self.output_panel.show_typing_indicator(stage="impact_assessment", expected_ms=150.0)
         self.execute_button.setEnabled(False)
         self.command_input.setEnabled(False)
-        worker = CommandWorker(self.router, command)
-        thread = QThread(self)
-        worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.stageTelemetry.connect(self.output_panel.update_typing_stage)
-        worker.finished.connect(self._handle_async_result)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
-        thread.finished.connect(self._clear_async_state)
-        self._active_thread = thread
-        self._active_worker = worker
-        thread.start()
+        self._active_thread, self._active_worker = start_command_worker(self, command)
+        self._active_thread.start()
+    def _cancel_active_command(self) -> None:
+        if self._active_worker is None:
+            return
+        self._active_worker.cancel()
+        self.loading_label.setText("Membatalkan...")
     def _handle_async_result(self, command: str, result) -> None:
         self._render_execution_result(command, result)
     def _clear_async_state(self) -> None:
@@ -387,6 +380,8 @@ class MainWindow(QMainWindow):
         self.shortcut_clear.activated.connect(self._handle_clear_chat)
         self.shortcut_fast_surface = QShortcut(QKeySequence("Ctrl+K"), self)
         self.shortcut_fast_surface.activated.connect(self._activate_fast_command_surface)
+        self.shortcut_cancel = QShortcut(QKeySequence("Escape"), self)
+        self.shortcut_cancel.activated.connect(self._cancel_active_command)
     def _setup_output_animation(self) -> None:
         self.output_effect = None
         self.output_animation = QVariantAnimation(self)
@@ -446,6 +441,8 @@ class MainWindow(QMainWindow):
         self._explicit_quit = True
         self.close()
     def _cleanup_runtime_hooks(self) -> None:
+        self.command_assist.stop()
+        self._cancel_active_command()
         if self._hotkey_registered and hasattr(ctypes, "windll"):
             ctypes.windll.user32.UnregisterHotKey(None, HOTKEY_ID)
             self._hotkey_registered = False
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QThread, Signal
 from PySide6.QtWidgets import QMessageBox
 
+from core.http_pool import CancelEvent
 from core.router import CommandRouter
 from ui.theme_tokens import ThemeTokens
 
@@ -12,16 +13,23 @@ from ui.theme_tokens import ThemeTokens
 class CommandWorker(QObject):
     finished = Signal(str, object)
     stageTelemetry = Signal(str, float)
+    tokenReceived = Signal(str)
 
     def __init__(self, router: CommandRouter, command: str) -> None:
         super().__init__()
         self.router = router
         self.command = command
+        self.cancel_event = CancelEvent()
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
 
     def run(self) -> None:
         result, stage_trace = self.router.execute_with_enhanced_response_trace(
             self.command,
             stage_callback=lambda stage, elapsed: self.stageTelemetry.emit(stage, float(elapsed)),
+            token_callback=self.tokenReceived.emit,
+            cancel_event=self.cancel_event,
         )
         if not stage_trace:
             self.stageTelemetry.emit("impact_assessment", 0.0)
@@ -29,6 +37,21 @@ class CommandWorker(QObject):
         self.finished.emit(self.command, result)
 
 
+def start_command_worker(window, command: str) -> tuple[QThread, CommandWorker]:
+    worker = CommandWorker(window.router, command)
+    thread = QThread(window)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.stageTelemetry.connect(window.output_panel.update_typing_stage)
+    worker.tokenReceived.connect(window.output_panel.append_stream_token)
+    worker.finished.connect(window._handle_async_result)
+    worker.finished.connect(thread.quit)
+    worker.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.finished.connect(window._clear_async_state)
+    return thread, worker
+
+
 def with_status_badge(message: str) -> str:
     lowered = message.lower()
     if "warning" in lowered or "konfirmasi manual" in lowered:
@@ -69,8 +92,8 @@ def memory_insight_payload(router: CommandRouter) -> dict:
     summary = router.memory_summary()
     top_commands = summary.get("top_commands", [])
     total_commands = sum(count for _, count in top_commands)
-    session_entries = router.session_layer.entries
-    recent_entries = list(reversed(router.session_layer.recent(limit=5)))
+    session_stats = router.session_layer.stats(recent_limit=5)
+    recent_entries = list(reversed(session_stats.recent))
 
     lines = ["Top Commands:"]
     if not top_commands:
@@ -81,12 +104,12 @@ def memory_insight_payload(router: CommandRouter) -> dict:
             lines.append(f"- {command}: {count}")
         top_command_label = f"{top_commands[0][0]} ({top_commands[0][1]})"
 
-    blocked_count = sum(1 for entry in session_entries if entry.status in {"blocked", "invalid", "failed"})
-    pending_count = sum(1 for entry in session_entries if entry.status == "pending_confirmation")
-    warning_count = sum(1 for entry in session_entries if entry.status in {"pending_confirmation", "cancelled"})
+    blocked_count = session_stats.count("blocked", "invalid", "failed")
+    pending_count = session_stats.count("pending_confirmation")
+    warning_count = session_stats.count("pending_confirmation", "cancelled")
 
-    if session_entries:
-        session_start = datetime.fromisoformat(session_entries[0].timestamp).astimezone()
+    if session_stats.first_timestamp is not None:
+        session_start = datetime.fromisoformat(session_stats.first_timestamp).astimezone()
         now_local = datetime.now().astimezone()
         elapsed = now_local - session_start
         duration = f"{elapsed.seconds // 3600:02d}:{(elapsed.seconds % 3600) // 60:02d}:{elapsed.seconds % 60:02d}"